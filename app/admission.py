@@ -0,0 +1,210 @@
+"""Admission control for the API: rate limits, per-class concurrency, load shedding.
+
+Requests are sorted into classes:
+- "read": plain news reads, served from the hot index and caches
+- "translate": news reads for a non-Tamil language, which may call the
+  translation providers and sleep on retries
+- "images": /images thumbnails; a page load fetches dozens at once, so they
+  get their own slots and cost a fraction of a token
+- "admin": everything under /admin
+
+Per-client rate limits are opt-in: behind a proxy every request shares the
+proxy's address, so with ADMISSION_TRUST_PROXY=0 a single bucket would
+throttle all users together. When enabled (ADMISSION_PER_CLIENT=1, the
+default when ADMISSION_TRUST_PROXY=1) each client has a token bucket, and
+translating reads cost more tokens than cached ones; ADMISSION_RATE<=0
+disables them. The client is the peer address or, behind
+ADMISSION_PROXY_HOPS trusted proxies, the X-Forwarded-For entry the
+outermost one appended; entries left of it are whatever the client sent.
+
+The class limits always apply. Each class has its own concurrency limit
+and a bounded wait queue. When the queue is full, or a request waits
+longer than ADMISSION_QUEUE_TIMEOUT, it is shed with 503 and a Retry-After
+based on the class's recent service time. Slow translating reads can
+therefore only occupy their own few slots of the worker thread pool, and
+cheap reads keep flowing.
+"""
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+from app.utils.ratelimit import TokenBucket
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1") == "1"
+ADMISSION_TRUST_PROXY = os.getenv("ADMISSION_TRUST_PROXY", "0") == "1"
+# Trusted proxies in front of the app; the client is the N-th X-Forwarded-For entry from the right
+ADMISSION_PROXY_HOPS = max(1, int(os.getenv("ADMISSION_PROXY_HOPS", "1")))
+ADMISSION_PER_CLIENT = os.getenv("ADMISSION_PER_CLIENT", "1" if ADMISSION_TRUST_PROXY else "0") == "1"
+ADMISSION_RATE = float(os.getenv("ADMISSION_RATE", "20"))
+ADMISSION_BURST = float(os.getenv("ADMISSION_BURST", "60"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+_MAX_CLIENTS = 10000
+_MAX_RETRY_AFTER = 3600
+_RATE_LIMITING = ADMISSION_PER_CLIENT and ADMISSION_RATE > 0
+
+# class -> (max concurrent, max queued, token cost)
+CLASSES = {
+    "read": (int(os.getenv("ADMISSION_MAX_READ", "32")), int(os.getenv("ADMISSION_QUEUE_READ", "128")), 1.0),
+    "translate": (int(os.getenv("ADMISSION_MAX_TRANSLATE", "4")), int(os.getenv("ADMISSION_QUEUE_TRANSLATE", "8")), 5.0),
+    "images": (int(os.getenv("ADMISSION_MAX_IMAGES", "16")), int(os.getenv("ADMISSION_QUEUE_IMAGES", "256")), 0.1),
+    "admin": (int(os.getenv("ADMISSION_MAX_ADMIN", "4")), int(os.getenv("ADMISSION_QUEUE_ADMIN", "8")), 1.0),
+}
+
+
+def classify(path: str, query: bytes) -> str:
+    if path.startswith("/admin"):
+        return "admin"
+    if path.startswith("/images"):
+        return "images"
+    if path.rstrip("/") == "/news" and query:
+        params = parse_qs(query.decode("latin-1"))
+        lang = (params.get("lang") or ["ta"])[0].lower()
+        fields = (params.get("fields") or [""])[0]
+        if lang != "ta" and (not fields or "summary" in fields.split(",")):
+            return "translate"
+    return "read"
+
+
+class _Gate:
+    """Concurrency limit with a bounded queue for one request class (event-loop only)."""
+
+    def __init__(self, limit: int, queue: int):
+        self.limit = max(1, limit)
+        self.queue = max(0, queue)
+        self.active = 0
+        self.waiting = 0
+        self.shed = 0
+        self.admitted = 0
+        self.service_s = 0.1  # EWMA of request duration
+        self._sem: asyncio.Semaphore | None = None
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil((self.waiting + 1) * self.service_s / self.limit))
+
+    async def enter(self) -> bool:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.limit)
+        if self._sem.locked():
+            if self.waiting >= self.queue:
+                self.shed += 1
+                return False
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._sem.acquire(), ADMISSION_QUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._sem.acquire()
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def leave(self, elapsed: float) -> None:
+        self.active -= 1
+        self.service_s = 0.8 * self.service_s + 0.2 * elapsed
+        self._sem.release()
+
+
+_GATES = {name: _Gate(limit, queue) for name, (limit, queue, _) in CLASSES.items()}
+_CLIENTS: "OrderedDict[str, TokenBucket]" = OrderedDict()
+_CLIENTS_LOCK = threading.Lock()
+_RATE_LIMITED = 0
+
+
+def _client_key(scope) -> str:
+    if ADMISSION_TRUST_PROXY:
+        # Proxies append, so anything left of what they added is the client's own claim
+        hops = []
+        for name, value in scope.get("headers") or ():
+            if name == b"x-forwarded-for":
+                hops.extend(h.strip() for h in value.decode("latin-1").split(","))
+        if len(hops) >= ADMISSION_PROXY_HOPS and hops[-ADMISSION_PROXY_HOPS]:
+            return hops[-ADMISSION_PROXY_HOPS]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _bucket(key: str) -> TokenBucket:
+    with _CLIENTS_LOCK:
+        bucket = _CLIENTS.get(key)
+        if bucket is None:
+            bucket = TokenBucket(ADMISSION_RATE, ADMISSION_BURST)
+            _CLIENTS[key] = bucket
+            while len(_CLIENTS) > _MAX_CLIENTS:
+                _CLIENTS.popitem(last=False)
+        else:
+            _CLIENTS.move_to_end(key)
+        return bucket
+
+
+async def _reject(send, status: int, retry_after: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControl:
+    """ASGI middleware applying the limits above to HTTP requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_CONTROL or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        global _RATE_LIMITED
+        cls = classify(scope.get("path", ""), scope.get("query_string", b""))
+        if _RATE_LIMITING:
+            bucket = _bucket(_client_key(scope))
+            # A cost above the burst could never be paid; charge a full bucket instead
+            wait_s = bucket.try_acquire(min(CLASSES[cls][2], bucket.burst))
+            if wait_s:
+                _RATE_LIMITED += 1
+                await _reject(send, 429, max(1, min(_MAX_RETRY_AFTER, math.ceil(wait_s))), "Too many requests")
+                return
+        gate = _GATES[cls]
+        if not await gate.enter():
+            await _reject(send, 503, gate.retry_after(), "Server busy, retry later")
+            return
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.leave(time.monotonic() - started)
+
+
+def stats() -> dict:
+    return {
+        "enabled": ADMISSION_CONTROL,
+        "per_client_limits": _RATE_LIMITING,
+        "rate_limited": _RATE_LIMITED,
+        "clients": len(_CLIENTS),
+        "classes": {
+            name: {
+                "limit": g.limit,
+                "queue_limit": g.queue,
+                "active": g.active,
+                "waiting": g.waiting,
+                "admitted": g.admitted,
+                "shed": g.shed,
+                "avg_service_ms": round(g.service_s * 1000, 1),
+            }
+            for name, g in _GATES.items()
+        },
+    }
@@ -1,19 +1,28 @@
-from fastapi import APIRouter, Depends, Query
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.tamil_scraper import fetch_tamil_news_once, looks_tamil, translate_to_tamil, translate_text
+from app.database import get_db, get_read_db, backfill_summaries, drop_legacy_summary_columns, pool_stats
+from app.pretranslate import parse_langs, pretranslate as run_pretranslate
+from app.translation import get_router
 from app.models import News
-import time
+from app import admission, archive, content_store, export, profiling, stats, timing
 
 router = APIRouter()
+logger = logging.getLogger("app.admin")
 
 @router.post("/fetch", summary="Manually trigger Tamil news fetch")
 def fetch_news_now(db: Session = Depends(get_db)):
+    # The scraping stack (feedparser, bs4, Gemini SDK) is only loaded when used
+    from app.tamil_scraper import fetch_tamil_news_once
     count = fetch_tamil_news_once(db)
     return {"message": f"✅ {count} Tamil news articles fetched."}
 
 @router.post("/repair-summaries", summary="Translate any non-Tamil summaries to Tamil")
 def repair_summaries(db: Session = Depends(get_db)):
+    from app.parse_pool import ARTICLE_TEXT_LIMIT
+    from app.tamil_scraper import looks_tamil, translate_to_tamil
     fixed = 0
     checked = 0
     items = db.query(News).all()
@@ -22,8 +31,8 @@ def repair_summaries(db: Session = Depends(get_db)):
         current = (n.summary or "").strip()
         if current and looks_tamil(current):
             continue
-        # Prefer translating summary; else use description
-        source_text = current or (n.description or "")
+        # Prefer translating summary; else the stored article text; else description
+        source_text = current or (content_store.get_text(n.url) or "")[:ARTICLE_TEXT_LIMIT] or (n.description or "")
         if not source_text:
             continue
         tx = translate_to_tamil(source_text)
@@ -41,105 +50,123 @@ def pretranslate(
     limit: int = Query(30, ge=1, le=200),
     db: Session = Depends(get_db),
 ):
-    SUPPORTED = {"ta", "en", "hi", "kn", "ml", "te"}
-    targets = [l.strip().lower() for l in langs.split(",") if l.strip()]
-    targets = [l for l in targets if l in SUPPORTED and l != "ta"]
+    targets = parse_langs(langs)
     if not targets:
         return {"updated": 0, "message": "No valid target languages"}
+    return run_pretranslate(db, targets, limit=limit)
 
-    col_map = {
-        "ta": "summary_ta",
-        "en": "summary_en",
-        "hi": "summary_hi",
-        "kn": "summary_kn",
-        "ml": "summary_ml",
-        "te": "summary_te",
-    }
-
-    items = (
-        db.query(News)
-          .order_by(News.created_at.desc().nullslast(), News.id.desc())
-          .limit(limit)
-          .all()
-    )
-    updated = 0
-    for n in items:
-        src = (n.summary or n.description or n.title or "").strip()
-        if not src:
-            continue
-        s = n.summaries or {}
-        if not isinstance(s, dict):
-            s = {}
-        for lang in targets:
-            if s.get(lang):
-                continue
-            tx = translate_text(src, lang)
-            if not tx:
-                time.sleep(1.2)
-                tx = translate_text(src, lang)
-            if tx:
-                s[lang] = tx
-                # also persist in dedicated language column if present
-                try:
-                    col = col_map.get(lang)
-                    if col and getattr(n, col, None) != tx:
-                        setattr(n, col, tx)
-                except Exception:
-                    pass
-                updated += 1
-            else:
-                # hit rate limit; pause and continue to next item to spread load
-                time.sleep(2.0)
-        if s != (n.summaries or {}):
-            n.summaries = s
-            try:
-                db.commit()
-            except Exception:
-                db.rollback()
-                break
-    return {"updated": updated, "count": len(items), "langs": targets}
-
-
-@router.post("/backfill-columns", summary="Backfill per-language columns from existing summary and summaries JSON")
-def backfill_columns(
-    limit: int = Query(0, ge=0, description="0 means all"),
-    db: Session = Depends(get_db),
+
+@router.get("/stats", summary="Per-source totals, hourly ingest, translation coverage and last ingest times")
+def ingest_stats(
+    hours: int = Query(24, ge=1, le=168, description="Hourly buckets to include"),
+    db: Session = Depends(get_read_db),
 ):
-    col_map = {
-        "ta": "summary_ta",
-        "en": "summary_en",
-        "hi": "summary_hi",
-        "kn": "summary_kn",
-        "ml": "summary_ml",
-        "te": "summary_te",
-    }
-    q = db.query(News).order_by(News.id.asc())
-    if limit:
-        items = q.limit(limit).all()
-    else:
-        items = q.all()
-    updated = 0
-    for n in items:
-        changed = False
-        ta_val = getattr(n, col_map["ta"], None)
-        if (n.summary or "").strip() and not (ta_val or "").strip():
-            setattr(n, col_map["ta"], n.summary.strip())
-            changed = True
-        s = n.summaries or {}
-        if isinstance(s, dict):
-            for lang, col in col_map.items():
-                if lang == "ta":
-                    continue
-                val = s.get(lang)
-                if val and not getattr(n, col, None):
-                    setattr(n, col, val)
-                    changed = True
-        if changed:
-            updated += 1
-    if updated:
-        try:
-            db.commit()
-        except Exception:
-            db.rollback()
-            return {"updated": 0}
-    return {"updated": updated, "count": len(items)}
+    return stats.stats(db, hours=hours)
+
+
+@router.post("/stats/reconcile", summary="Recompute the statistics tables from news and news_summary")
+def reconcile_stats(db: Session = Depends(get_db)):
+    return stats.reconcile(db)
+
+
+@router.get("/timings", summary="Latency breakdown per path and phase over recent requests")
+def timings():
+    return timing.breakdown()
+
+
+@router.get("/admission", summary="Admission control: active, queued and shed requests per class")
+def admission_stats():
+    return admission.stats()
+
+
+@router.get("/content-store", summary="Size and layout of the compressed article content store")
+def content_store_stats():
+    return content_store.stats()
+
+
+@router.get("/db-pool", summary="Connection pool usage and checkout wait times")
+def db_pool():
+    return {"pools": pool_stats()}
+
+
+@router.get("/translation-providers", summary="Health scores of the translation providers")
+def translation_providers():
+    return {"providers": get_router().stats()}
+
+
+@router.post("/backfill-columns", summary="Move legacy per-language columns and summaries JSON into news_summary")
+def backfill_columns(batch_size: int = Query(5000, ge=100, le=100000, description="Rows per id-range batch")):
+    try:
+        inserted = backfill_summaries(batch_size=batch_size)
+    except Exception as e:
+        logger.exception("Summary backfill failed")
+        raise HTTPException(status_code=500, detail=f"Backfill failed: {e}")
+    return {"updated": inserted}
+
+
+@router.post("/drop-legacy-columns", summary="Drop the legacy summary columns once news_summary holds all their values")
+def drop_legacy_columns():
+    try:
+        return drop_legacy_summary_columns()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dropping legacy columns failed: {e}")
+
+
+@router.get("/feed-leases", summary="Scraper nodes and which feeds they hold")
+def feed_leases(db: Session = Depends(get_db)):
+    from app import sharding
+    return {"nodes": sharding.live_nodes(db), "leases": sharding.lease_table(db)}
+
+
+@router.get("/export", summary="Stream all news rows as NDJSON or CSV")
+def export_news(
+    since: str | None = Query(None, description="Only rows created at or after this ISO timestamp"),
+    format: str = Query("ndjson", description="ndjson | csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+):
+    if format not in export.FORMATS:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    try:
+        since_dt = export.parse_since(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since must be an ISO timestamp")
+    media = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    filename = f"news.{format}" + (".gz" if gzip else "")
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(export.stream_export(since_dt, format, gzip), media_type=media, headers=headers)
+
+
+@router.post("/archive", summary="Export months older than the retention window to compressed files and drop them")
+def archive_now(retention_months: int | None = Query(None, ge=1, description="Defaults to ARCHIVE_RETENTION_MONTHS")):
+    try:
+        return {"archived": archive.archive_old_months(retention_months)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Archival failed: {e}")
+
+
+@router.get("/profiles", summary="Armed profiling targets and stored profiles")
+def list_profiles():
+    return {"armed": profiling.armed(), "profiles": profiling.list_profiles()}
+
+
+@router.post("/profiles", summary="Profile the next scrape cycles or a sample of news requests")
+def arm_profiling(
+    target: str = Query("scrape", description="scrape | api"),
+    runs: int = Query(1, ge=0, le=100, description="Number of profiles to capture; 0 disarms"),
+    mode: str = Query("cprofile", description="cprofile (.pstats) | sample (speedscope JSON)"),
+    fraction: float = Query(1.0, gt=0, le=1, description="For api: fraction of requests to profile"),
+):
+    try:
+        return {"armed": profiling.arm(target, runs, mode, fraction)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/profiles/{name}", summary="Download a stored profile")
+def download_profile(name: str):
+    path = profiling.profile_path(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=name)
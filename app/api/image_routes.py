@@ -0,0 +1,35 @@
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.orm import Session
+from app.database import get_read_db
+from app.models import News
+from app import thumbnails
+
+router = APIRouter()
+
+# /images/{news_id} is keyed by article, and its image_url can be filled in or
+# replaced later (image resolver), so caches revalidate against the ETag
+_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+
+@router.get("/{news_id}", summary="Resized, cached copy of an article's image")
+def get_image(
+    news_id: int,
+    request: Request,
+    w: int = Query(640, ge=16, le=2048, description="Target width in pixels"),
+    db: Session = Depends(get_read_db),
+):
+    image_url = db.query(News.image_url).filter(News.id == news_id).scalar()
+    if not image_url:
+        raise HTTPException(status_code=404, detail="No image for this article")
+    webp = "image/webp" in (request.headers.get("accept") or "")
+    # Changes whenever the article's image does
+    etag = '"' + hashlib.sha1(f"{image_url}|{thumbnails.snap_width(w)}|{int(webp)}".encode("utf-8")).hexdigest()[:20] + '"'
+    headers = {"Cache-Control": _CACHE_CONTROL, "Vary": "Accept", "ETag": etag}
+    if etag in (request.headers.get("if-none-match") or ""):
+        return Response(status_code=304, headers=headers)
+    found = thumbnails.get_thumbnail(image_url, w, webp)
+    if not found:
+        raise HTTPException(status_code=502, detail="Could not fetch the original image")
+    path, media_type = found
+    return FileResponse(path, media_type=media_type, headers=headers)
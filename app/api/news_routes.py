@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.crud import get_news
+from app.database import SessionLocal, get_read_db
+from app.crud import SUPPORTED_LANGS, bulk_set_summaries, get_news_rows, get_summary_rows
+from app import archive, hot_index, profiling, timing, trending
 from app.schemas import NewsResponse
-from app.models import News
-from datetime import timezone
-from app.tamil_scraper import translate_text
+from app.serialization import NEWS_FIELDS, compact_response, dumps, fragment, json_array_response, parse_fields
+from app.translation import translate_text
 import time
 
 # Simple in-memory LRU-ish cache for translated summaries
@@ -39,138 +39,129 @@ def _cache_set(key: tuple[int, str], value: str) -> None:
 
 router = APIRouter()
 
+def _news_item(row, summary: str | None, language: str, fields=NEWS_FIELDS) -> dict:
+    item = dict(zip(NEWS_FIELDS, row[:len(NEWS_FIELDS)]))
+    item["summary"] = summary
+    item["language"] = language
+    if fields is not NEWS_FIELDS:
+        item = {f: item[f] for f in fields}
+    return item
+
+@router.get("/trending", summary="Most mentioned keywords in recent news")
+def trending_keywords(
+    window: str = Query("6h", pattern=r"^\d{1,3}h?$", description="Window in hours, e.g. 1h, 6h, 24h"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    return trending.trending(int(window.rstrip("h")), limit=limit)
+
+@router.get("/archive/months", summary="Months available in the archive")
+def archive_months():
+    return {"months": archive.archived_months()}
+
+@router.get("/archive", summary="Read archived news for one month")
+def archived_news(
+    month: str = Query(..., description="YYYY-MM"),
+    source: str | None = Query(None, description="Filter by source name"),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    try:
+        return archive.read_archive(month, source=source, limit=limit, offset=offset)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month must be YYYY-MM")
+
 @router.get("/", response_model=list[NewsResponse], summary="Get latest Tamil news")
 def fetch_news(
     limit: int = Query(50, ge=1, le=200),
     source: str | None = Query(None, description="Filter by source name"),
     lang: str = Query("ta", description="Response summary language: ta|en|hi|kn|ml|te"),
-    db: Session = Depends(get_db),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,title,source,image_url,published_at"),
+    format: str = Query("json", description="json (array of objects) | compact (field names once, then value arrays)"),
+    db: Session = Depends(get_read_db),
 ):
     try:
-        SUPPORTED = {"ta", "en", "hi", "kn", "ml", "te"}
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if format not in ("json", "compact"):
+        raise HTTPException(status_code=400, detail="format must be json or compact")
+    with profiling.maybe_profile("api"):
+        return _fetch_news(limit, source, lang, db, selected, format == "compact")
+
+def _fetch_news(limit: int, source: str | None, lang: str, db: Session,
+                fields: tuple[str, ...] | None = None, compact: bool = False):
+    try:
         lang = (lang or "ta").lower()
-        if lang not in SUPPORTED:
+        if lang not in SUPPORTED_LANGS:
             lang = "ta"
+        # Without the summary field nothing needs translating
+        if fields is not None and "summary" not in fields:
+            lang = "ta"
+        out_fields = fields or NEWS_FIELDS
 
-        # map language code to News column attribute
-        col_map = {
-            "ta": "summary_ta",
-            "en": "summary_en",
-            "hi": "summary_hi",
-            "kn": "summary_kn",
-            "ml": "summary_ml",
-            "te": "summary_te",
-        }
-
-        news_list = get_news(db, limit=limit, source=source) or []
-        # Ensure timezone-aware UTC datetimes so clients compute relative time correctly
+        with timing.span("db"):
+            hot = hot_index.latest(limit, source)
+            if hot is None:
+                rows = get_news_rows(db, lang, limit=limit, source=source,
+                                     fields=set(fields) if fields else None) or []
+            elif lang == "ta":
+                rows = [r + (None, None) for r in hot]
+            else:
+                stored_map = get_summary_rows(db, [r[0] for r in hot], lang)
+                rows = [r + stored_map.get(r[0], (None, None)) for r in hot]
         # Per-request translation cap to reduce 429s
         max_tx = 30
         tx_count = 0
-        dirty = False
-        for n in news_list:
-            if getattr(n, "published_at", None) and n.published_at.tzinfo is None:
-                n.published_at = n.published_at.replace(tzinfo=timezone.utc)
-            if getattr(n, "created_at", None) and n.created_at.tzinfo is None:
-                n.created_at = n.created_at.replace(tzinfo=timezone.utc)
-            # On-the-fly translation of summary for requested language
+        # New translations, written to the primary once the page is built
+        to_store = []
+        # (fragment cache key or None, marker, item)
+        items = []
+        for row in rows:
+            news_id, tamil, updated_at, stored, stored_at = row[0], row[5], row[10], row[11], row[12]
+            marker = (updated_at, stored_at)
             if lang == "ta":
-                # Prefer dedicated column if available
-                try:
-                    col = col_map.get("ta")
-                    if col:
-                        ta_val = getattr(n, col, None)
-                        if ta_val:
-                            n.summary = ta_val
-                            try:
-                                n.language = "ta"
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
-            else:
-                key = (getattr(n, "id", 0) or 0, lang)
-                cached = _cache_get(key)
-                if cached:
-                    n.summary = cached
-                    try:
-                        n.language = lang
-                    except Exception:
-                        pass
-                else:
-                    # 1) Check dedicated per-language column first
-                    try:
-                        col = col_map.get(lang)
-                        if col:
-                            col_val = getattr(n, col, None)
-                            if col_val:
-                                n.summary = col_val
-                                _cache_set(key, n.summary or "")
-                                try:
-                                    n.language = lang
-                                except Exception:
-                                    pass
-                                continue
-                    except Exception:
-                        pass
-                    # 2) Then check summaries JSON
-                    try:
-                        s = getattr(n, "summaries", None)
-                        if isinstance(s, dict) and s.get(lang):
-                            n.summary = s.get(lang) or n.summary
-                            _cache_set(key, n.summary or "")
-                            try:
-                                n.language = lang
-                            except Exception:
-                                pass
-                            continue
-                    except Exception:
-                        pass
-                    if tx_count >= max_tx:
-                        continue
-                    src = (n.summary or n.description or n.title or "").strip()
-                    if not src:
-                        continue
+                items.append(((news_id, lang, fields), marker, _news_item(row, tamil, "ta", out_fields)))
+                continue
+            key = (news_id or 0, lang)
+            text = stored or _cache_get(key)
+            if text:
+                timing.count("translate_hits")
+                _cache_set(key, text)
+                items.append((key + (fields,), marker, _news_item(row, text, lang, out_fields)))
+                continue
+            timing.count("translate_misses")
+            # On-the-fly translation of summary for requested language
+            src = (tamil or row[2] or row[1] or "").strip()
+            tx = ""
+            if tx_count < max_tx and src:
+                with timing.span("translate"):
                     # try translate once, then retry once after short backoff if empty (likely 429)
+                    timing.count("translate_calls")
                     tx = translate_text(src, lang)
                     if not tx:
                         time.sleep(1.2)
+                        timing.count("translate_calls")
                         tx = translate_text(src, lang)
-                    if tx:
-                        n.summary = tx
-                        _cache_set(key, tx)
-                        tx_count += 1
-                        # persist into DB summaries for caching
-                        try:
-                            s = getattr(n, "summaries", None) or {}
-                            if not isinstance(s, dict):
-                                s = {}
-                            if s.get(lang) != tx:
-                                s[lang] = tx
-                                n.summaries = s
-                                dirty = True
-                        except Exception:
-                            pass
-                        # persist into dedicated per-language column
-                        try:
-                            col = col_map.get(lang)
-                            if col and getattr(n, col, None) != tx:
-                                setattr(n, col, tx)
-                                dirty = True
-                        except Exception:
-                            pass
-                        try:
-                            n.language = lang
-                        except Exception:
-                            pass
-                    else:
-                        # Likely rate-limited for this item; continue with others
-                        continue
-        if dirty:
-            try:
-                db.commit()
-            except Exception:
-                pass
-        return news_list
+            if tx:
+                tx_count += 1
+                _cache_set(key, tx)
+                # persist into news_summary for caching
+                to_store.append({"news_id": news_id, "lang": lang, "text": tx, "backend": "translate"})
+                items.append((None, marker, _news_item(row, tx, lang, out_fields)))
+            else:
+                # Not translated (cap reached or likely rate-limited); serve the Tamil summary
+                items.append((None, marker, _news_item(row, tamil, row[7] or "ta", out_fields)))
+        if to_store:
+            with timing.span("commit"), SessionLocal() as wdb:
+                try:
+                    bulk_set_summaries(wdb, to_store)
+                    wdb.commit()
+                except Exception:
+                    wdb.rollback()
+        with timing.span("serialize"):
+            if compact:
+                return compact_response(out_fields, [item for _, _, item in items])
+            fragments = [fragment(key, marker, item) if key else dumps(item) for key, marker, item in items]
+            return json_array_response(fragments)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,296 @@
+"""Monthly partitioning of the news table and archival of old months.
+
+On PostgreSQL with NEWS_PARTITIONING=1, `news` is converted once to a
+table range-partitioned by created_at with one partition per month, and
+ensure_partitions() keeps partitions created a few months ahead.
+Partitioned tables cannot enforce a unique key that leaves out the
+partition key. So the url constraint becomes (url, created_at), and
+store_news_in_db's lookup by url remains the dedupe. The foreign key from
+news_summary is dropped for the same reason; archival removes those rows
+itself.
+
+archive_old_months() exports every month older than the retention window
+to ARCHIVE_DIR/news-YYYY-MM-<stamp>.ndjson.gz (one JSON object per
+article, translations included), then drops the partition (PostgreSQL) or
+deletes the rows (SQLite / unpartitioned). read_archive() is the explicit
+read path for archived months.
+"""
+import gzip
+import heapq
+import itertools
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from sqlalchemy import text
+from app.database import engine
+
+logger = logging.getLogger("app.archive")
+
+NEWS_PARTITIONING = os.getenv("NEWS_PARTITIONING", "0") == "1"
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+# Months kept in the live table, counting the current one; 0 disables archival
+ARCHIVE_RETENTION_MONTHS = int(os.getenv("ARCHIVE_RETENTION_MONTHS", "0"))
+PARTITION_MONTHS_AHEAD = 2
+
+_ARCHIVE_LOCK = threading.Lock()
+_EXPORT_COLUMNS = (
+    "id", "title", "description", "url", "source", "summary", "image_url",
+    "language", "published_at", "created_at", "updated_at",
+)
+
+
+def _month_start(dt: datetime) -> datetime:
+    return datetime(dt.year, dt.month, 1)
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    idx = dt.year * 12 + dt.month - 1 + months
+    return datetime(idx // 12, idx % 12 + 1, 1)
+
+
+def _partition_name(month: datetime) -> str:
+    return f"news_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(conn) -> bool:
+    if not conn.engine.url.get_backend_name().startswith("postgresql"):
+        return False
+    return bool(conn.exec_driver_sql(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'news' AND pg_table_is_visible(c.oid)"
+    ).first())
+
+
+def ensure_partitions(conn, start: datetime | None = None) -> int:
+    """Create missing monthly partitions from `start` (default: this month) to a few months ahead."""
+    if not is_partitioned(conn):
+        return 0
+    month = _month_start(start or datetime.utcnow())
+    end = _add_months(_month_start(datetime.utcnow()), PARTITION_MONTHS_AHEAD + 1)
+    created = 0
+    while month < end:
+        nxt = _add_months(month, 1)
+        name = _partition_name(month)
+        exists = conn.exec_driver_sql("SELECT to_regclass(%(n)s)", {"n": name}).scalar()
+        if not exists:
+            conn.exec_driver_sql(
+                f"CREATE TABLE {name} PARTITION OF news "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{nxt:%Y-%m-%d}')"
+            )
+            created += 1
+        month = nxt
+    return created
+
+
+def _index_defs(conn, table: str) -> list[tuple[str, bool, bool]]:
+    """(CREATE INDEX statement, unique, primary) for every index on `table`."""
+    return [
+        (d, bool(u), bool(pk)) for d, u, pk in conn.exec_driver_sql(
+            "SELECT pg_get_indexdef(x.indexrelid), x.indisunique, x.indisprimary FROM pg_index x "
+            "JOIN pg_class t ON t.oid = x.indrelid WHERE t.relname = %(t)s AND pg_table_is_visible(t.oid)",
+            {"t": table},
+        ).fetchall()
+    ]
+
+
+def _recreate_indexes(conn, defs: list[tuple[str, bool, bool]]) -> None:
+    """Re-create the old table's indexes on the partitioned news table.
+    Unique indexes other than url are kept as plain indexes: a partitioned
+    table can only enforce uniqueness together with created_at."""
+    for sql, unique, primary in defs:
+        if primary or (unique and re.search(r"\(url\)$", sql)):
+            continue  # replaced by (id, created_at) and (url, created_at)
+        sql = re.sub(r" ON (?:\w+\.)?news_unpartitioned ", " ON news ", sql)
+        sql = re.sub(r"^CREATE (?:UNIQUE )?INDEX ", "CREATE INDEX IF NOT EXISTS ", sql)
+        conn.exec_driver_sql(sql)
+
+
+def convert_to_partitioned(conn) -> None:
+    """One-time migration of a plain PostgreSQL news table to monthly partitions."""
+    logger.info("Converting news to a monthly-partitioned table...")
+    conn.exec_driver_sql("UPDATE news SET created_at = COALESCE(published_at, now()) WHERE created_at IS NULL")
+    first = conn.exec_driver_sql("SELECT min(created_at) FROM news").scalar()
+    # The rename takes the indexes along; they are rebuilt on the new table below
+    indexes = _index_defs(conn, "news")
+    conn.exec_driver_sql("ALTER TABLE news RENAME TO news_unpartitioned")
+    conn.exec_driver_sql(
+        "ALTER TABLE news_summary DROP CONSTRAINT IF EXISTS news_summary_news_id_fkey"
+    )
+    conn.exec_driver_sql(
+        "CREATE TABLE news (LIKE news_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+    )
+    conn.exec_driver_sql("ALTER TABLE news ALTER COLUMN created_at SET NOT NULL")
+    conn.exec_driver_sql("ALTER TABLE news ADD PRIMARY KEY (id, created_at)")
+    conn.exec_driver_sql("ALTER TABLE news ADD CONSTRAINT news_url_created_at_key UNIQUE (url, created_at)")
+    conn.exec_driver_sql("CREATE INDEX ix_news_source_created_at ON news (source, created_at DESC)")
+    ensure_partitions(conn, start=first)
+    conn.exec_driver_sql("INSERT INTO news SELECT * FROM news_unpartitioned")
+    conn.exec_driver_sql("ALTER SEQUENCE IF EXISTS news_id_seq OWNED BY news.id")
+    conn.exec_driver_sql("DROP TABLE news_unpartitioned")
+    # Built after the copy (faster than maintaining them row by row), under their old names
+    _recreate_indexes(conn, indexes)
+    logger.info("✅ news is now partitioned by month on created_at.")
+
+
+def ensure_partitioning() -> None:
+    """Called from ensure_schema: convert (once) and keep future partitions in place."""
+    if not NEWS_PARTITIONING or not engine.url.get_backend_name().startswith("postgresql"):
+        return
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            convert_to_partitioned(conn)
+        ensure_partitions(conn)
+
+
+def _partitions_before(conn, cutoff: datetime) -> list[tuple[str, datetime]]:
+    rows = conn.exec_driver_sql(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'news'"
+    ).fetchall()
+    out = []
+    for (name,) in rows:
+        try:
+            month = datetime.strptime(name, "news_y%Ym%m")
+        except ValueError:
+            continue
+        if _add_months(month, 1) <= cutoff:
+            out.append((name, month))
+    return sorted(out, key=lambda t: t[1])
+
+
+def _months_before(conn, cutoff: datetime) -> list[datetime]:
+    first = conn.execute(text("SELECT min(created_at) FROM news WHERE created_at < :c"), {"c": cutoff}).scalar()
+    if first is None:
+        return []
+    if isinstance(first, str):
+        first = datetime.fromisoformat(first)
+    months = []
+    month = _month_start(first)
+    while month < cutoff:
+        months.append(month)
+        month = _add_months(month, 1)
+    return months
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _export_month(table: str, month: datetime) -> tuple[str | None, list[int]]:
+    """Stream one month of articles (with their translations) to a gzip NDJSON file,
+    newest first so read_archive can stop reading once it has a page."""
+    nxt = _add_months(month, 1)
+    cols = ", ".join(f"n.{c}" for c in _EXPORT_COLUMNS)
+    stmt = text(
+        f"SELECT {cols}, s.lang, s.text FROM {table} n "
+        "LEFT JOIN news_summary s ON s.news_id = n.id "
+        "WHERE n.created_at >= :start AND n.created_at < :end ORDER BY n.created_at DESC, n.id DESC"
+    )
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    final = os.path.join(ARCHIVE_DIR, f"news-{month:%Y-%m}-{datetime.utcnow():%Y%m%dT%H%M%S}.ndjson.gz")
+    tmp = final + ".tmp"
+    ids: list[int] = []
+    with engine.connect() as conn, gzip.open(tmp, "wt", encoding="utf-8") as out:
+        result = conn.execution_options(stream_results=True, yield_per=1000).execute(
+            stmt, {"start": month, "end": nxt}
+        )
+        current = None
+        for row in result:
+            if current is None or current["id"] != row[0]:
+                if current is not None:
+                    out.write(json.dumps(current, ensure_ascii=False, default=_json_default) + "\n")
+                current = dict(zip(_EXPORT_COLUMNS, row[:len(_EXPORT_COLUMNS)]))
+                current["summaries"] = {}
+                ids.append(row[0])
+            if row[-2]:
+                current["summaries"][row[-2]] = row[-1]
+        if current is not None:
+            out.write(json.dumps(current, ensure_ascii=False, default=_json_default) + "\n")
+    if not ids:
+        os.remove(tmp)
+        return None, []
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, final)
+    return final, ids
+
+
+def archive_old_months(retention_months: int | None = None) -> list[dict]:
+    """Export and remove every month older than the retention window. Returns what was archived."""
+    retention = ARCHIVE_RETENTION_MONTHS if retention_months is None else retention_months
+    if retention <= 0:
+        return []
+    cutoff = _add_months(_month_start(datetime.utcnow()), -(retention - 1))
+    done = []
+    with _ARCHIVE_LOCK:
+        with engine.connect() as conn:
+            partitioned = is_partitioned(conn)
+            targets = _partitions_before(conn, cutoff) if partitioned else [("news", m) for m in _months_before(conn, cutoff)]
+        for table, month in targets:
+            path, ids = _export_month(table, month)
+            with engine.begin() as conn:
+                if ids:
+                    conn.execute(
+                        text(f"DELETE FROM news_summary WHERE news_id IN (SELECT id FROM {table} "
+                             "WHERE created_at >= :start AND created_at < :end)"),
+                        {"start": month, "end": _add_months(month, 1)},
+                    )
+                if partitioned:
+                    conn.exec_driver_sql(f"DROP TABLE {table}")
+                else:
+                    conn.execute(
+                        text("DELETE FROM news WHERE created_at >= :start AND created_at < :end"),
+                        {"start": month, "end": _add_months(month, 1)},
+                    )
+            logger.info(f"📦 Archived {len(ids)} articles from {month:%Y-%m} to {path}")
+            done.append({"month": f"{month:%Y-%m}", "articles": len(ids), "file": path})
+    if done:
+        from app import hot_index
+        hot_index.invalidate()
+    return done
+
+
+def archived_months() -> list[str]:
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    months = {name[5:12] for name in os.listdir(ARCHIVE_DIR) if name.startswith("news-") and name.endswith(".ndjson.gz")}
+    return sorted(months, reverse=True)
+
+
+def _newest_first(item: dict) -> tuple:
+    return (item.get("created_at") or "", item.get("id") or 0)
+
+
+def _iter_archive(path: str, source: str | None):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            item = json.loads(line)
+            if source and item.get("source") != source:
+                continue
+            yield item
+
+
+def read_archive(month: str, source: str | None = None, limit: int = 50, offset: int = 0) -> list[dict]:
+    """Articles archived for `month` (YYYY-MM), newest first, optionally for one source.
+    Files are written newest first, so they are merged as streams and reading
+    stops after offset + limit items."""
+    datetime.strptime(month, "%Y-%m")  # validates the format
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    files = sorted(
+        name for name in os.listdir(ARCHIVE_DIR)
+        if name.startswith(f"news-{month}-") and name.endswith(".ndjson.gz")
+    )
+    streams = [_iter_archive(os.path.join(ARCHIVE_DIR, name), source) for name in files]
+    merged = heapq.merge(*streams, key=_newest_first, reverse=True)
+    try:
+        return list(itertools.islice(merged, offset, offset + limit))
+    finally:
+        for stream in streams:
+            stream.close()
@@ -0,0 +1,315 @@
+"""Compressed store of fetched article text, canonical links and (optionally) raw HTML.
+
+Re-summarizing or repairing articles reads from here instead of downloading
+the pages again. Records are appended to segment files under
+CONTENT_STORE_DIR. Each process writes only to its own active segment, and
+a new segment starts once the active one reaches CONTENT_SEGMENT_BYTES.
+
+Each record is a fixed header followed by the compressed payload:
+
+    magic "NCS1" | codec u8 | kind u8 | reserved u16 | key 16 bytes | length u32 | crc32 u32
+
+The key is a 16-byte BLAKE2b digest of the canonical article URL. Headers
+can be scanned without decompressing anything, so the in-memory index
+(key, kind) -> (segment, offset, length) is rebuilt quickly at startup and
+picks up segments written by other processes on a miss. Sealed segments
+are read through mmap.
+
+Payloads are compressed with zstd when the zstandard package is installed,
+otherwise with zlib; the codec is recorded per record. When the store grows
+past CONTENT_STORE_MAX_BYTES, whole sealed segments are deleted oldest
+first. A writer holds an flock on its active segment, so segments other
+processes are still appending to are never deleted; without flock
+(non-POSIX), only full segments and this process's own are evicted.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from app.utils.urls import canonicalize
+
+try:
+    import zstandard  # type: ignore
+    _ZSTD_AVAILABLE = True
+except Exception:
+    zstandard = None  # type: ignore
+    _ZSTD_AVAILABLE = False
+
+try:
+    import fcntl  # type: ignore
+    _FLOCK_AVAILABLE = True
+except Exception:
+    fcntl = None  # type: ignore
+    _FLOCK_AVAILABLE = False
+
+logger = logging.getLogger("app.content_store")
+
+CONTENT_STORE_DIR = os.getenv("CONTENT_STORE_DIR", os.path.join(".cache", "content"))
+CONTENT_STORE_MAX_BYTES = int(os.getenv("CONTENT_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+CONTENT_SEGMENT_BYTES = int(os.getenv("CONTENT_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+# Keep the raw page HTML too (much larger than the text)
+CONTENT_STORE_HTML = os.getenv("CONTENT_STORE_HTML", "0") == "1"
+
+TEXT, HTML, CANONICAL = 0, 1, 2
+_CODEC_ZLIB, _CODEC_ZSTD = 0, 1
+_MAGIC = b"NCS1"
+_HEADER = struct.Struct("<4sBBH16sII")
+
+_LOCK = threading.Lock()
+_INDEX: dict[tuple[bytes, int], tuple[str, int, int]] = {}
+_SCANNED: dict[str, int] = {}  # segment name -> bytes indexed so far
+_MAPS: dict[str, mmap.mmap] = {}
+_ACTIVE: tuple[str, object] | None = None  # (segment name, file object)
+_SIZE = 0
+_LOADED = False
+
+
+def _key(url: str) -> bytes:
+    return hashlib.blake2b(canonicalize(url).encode("utf-8"), digest_size=16).digest()
+
+
+def _compress(data: bytes) -> tuple[int, bytes]:
+    if _ZSTD_AVAILABLE:
+        return _CODEC_ZSTD, zstandard.ZstdCompressor(level=6).compress(data)
+    return _CODEC_ZLIB, zlib.compress(data, 6)
+
+
+def _decompress(codec: int, data: bytes) -> bytes:
+    if codec == _CODEC_ZSTD:
+        if not _ZSTD_AVAILABLE:
+            raise ValueError("zstd record but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _path(name: str) -> str:
+    return os.path.join(CONTENT_STORE_DIR, name)
+
+
+def _segments() -> list[str]:
+    try:
+        return sorted(n for n in os.listdir(CONTENT_STORE_DIR) if n.endswith(".seg"))
+    except FileNotFoundError:
+        return []
+
+
+def _scan(name: str) -> None:
+    """Index records of `name` past what was already scanned. Caller holds _LOCK."""
+    global _SIZE
+    start = _SCANNED.get(name, 0)
+    try:
+        with open(_path(name), "rb") as f:
+            f.seek(start)
+            offset = start
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                magic, _codec, kind, _, key, length, _crc = _HEADER.unpack(header)
+                if magic != _MAGIC:
+                    logger.warning(f"Corrupt record in content segment {name} at {offset}; ignoring the rest")
+                    break
+                f.seek(length, os.SEEK_CUR)
+                if f.tell() > os.fstat(f.fileno()).st_size:
+                    break  # partially written tail
+                _INDEX[(key, kind)] = (name, offset, _HEADER.size + length)
+                offset += _HEADER.size + length
+    except FileNotFoundError:
+        return
+    _SIZE += offset - start
+    _SCANNED[name] = offset
+
+
+def _load() -> None:
+    global _LOADED
+    if _LOADED:
+        return
+    os.makedirs(CONTENT_STORE_DIR, exist_ok=True)
+    for name in _segments():
+        _scan(name)
+    _LOADED = True
+
+
+def _sealed(name: str) -> bool:
+    """True when no process can still append to segment `name`: it is full,
+    or no writer holds its lock. Caller holds _LOCK."""
+    path = _path(name)
+    try:
+        if os.stat(path).st_size >= CONTENT_SEGMENT_BYTES:
+            return True
+    except FileNotFoundError:
+        return True
+    if not _FLOCK_AVAILABLE:
+        # Only this process's own earlier segments are known to be finished
+        return name.endswith(f"-{os.getpid()}.seg")
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+
+def _evict() -> None:
+    """Delete the oldest sealed segments until the store fits its budget. Caller holds _LOCK."""
+    global _SIZE
+    active = _ACTIVE[0] if _ACTIVE else None
+    for name in _segments():
+        if _SIZE <= CONTENT_STORE_MAX_BYTES:
+            break
+        if name == active or not _sealed(name):
+            continue
+        size = _SCANNED.pop(name, 0)
+        m = _MAPS.pop(name, None)
+        if m is not None:
+            m.close()
+        try:
+            os.remove(_path(name))
+        except FileNotFoundError:
+            pass
+        for k in [k for k, v in _INDEX.items() if v[0] == name]:
+            del _INDEX[k]
+        _SIZE -= size
+        logger.info(f"🧹 Evicted content segment {name} ({size} bytes)")
+
+
+def _writer():
+    """Active segment of this process, rolling over when full. Caller holds _LOCK."""
+    global _ACTIVE
+    if _ACTIVE is not None and _SCANNED.get(_ACTIVE[0], 0) < CONTENT_SEGMENT_BYTES:
+        return _ACTIVE
+    if _ACTIVE is not None:
+        _ACTIVE[1].close()
+    name = f"{time.time_ns():020d}-{os.getpid()}.seg"
+    f = open(_path(name), "ab")
+    if _FLOCK_AVAILABLE:
+        # Held until rollover or exit; tells other processes not to evict this segment
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    _ACTIVE = (name, f)
+    _SCANNED[name] = 0
+    return _ACTIVE
+
+
+def _put(key: bytes, kind: int, data: bytes) -> None:
+    global _SIZE
+    codec, payload = _compress(data)
+    record = _HEADER.pack(_MAGIC, codec, kind, 0, key, len(payload), zlib.crc32(payload)) + payload
+    name, f = _writer()
+    offset = _SCANNED[name]
+    f.write(record)
+    f.flush()
+    _INDEX[(key, kind)] = (name, offset, len(record))
+    _SCANNED[name] = offset + len(record)
+    _SIZE += len(record)
+
+
+def _refresh() -> None:
+    """Index what other processes appended since the last look, scanning only
+    segments that grew (or are new). Caller holds _LOCK."""
+    for name in _segments():
+        try:
+            size = os.stat(_path(name)).st_size
+        except FileNotFoundError:
+            continue
+        if size > _SCANNED.get(name, 0):
+            _scan(name)
+
+
+def put(url: str, text: str, html: bytes | None = None, canonical: str | None = None) -> None:
+    """Store the extracted text for `url`, with the page's rel=canonical link
+    and (when CONTENT_STORE_HTML=1) the page HTML."""
+    if not url or not text:
+        return
+    key = _key(url)
+    try:
+        with _LOCK:
+            _load()
+            _put(key, TEXT, text.encode("utf-8"))
+            if canonical:
+                _put(key, CANONICAL, canonical.encode("utf-8"))
+            if html and CONTENT_STORE_HTML:
+                _put(key, HTML, html)
+            if _SIZE > CONTENT_STORE_MAX_BYTES:
+                _evict()
+    except Exception as e:
+        logger.warning(f"Content store write failed for {url}: {e}")
+
+
+def _read(name: str, offset: int, length: int) -> bytes:
+    """Raw record bytes; sealed segments via mmap, the growing active one via pread."""
+    active = _ACTIVE[0] if _ACTIVE else None
+    if name != active:
+        m = _MAPS.get(name)
+        if m is None or len(m) < offset + length:
+            with open(_path(name), "rb") as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            old = _MAPS.pop(name, None)
+            if old is not None:
+                old.close()
+            _MAPS[name] = m
+        return m[offset:offset + length]
+    fd = os.open(_path(name), os.O_RDONLY)
+    try:
+        return os.pread(fd, length, offset)
+    finally:
+        os.close(fd)
+
+
+def _get(url: str, kind: int) -> bytes | None:
+    key = _key(url)
+    try:
+        with _LOCK:
+            _load()
+            loc = _INDEX.get((key, kind))
+            if loc is None:
+                # Other processes may have written since we last looked
+                _refresh()
+                loc = _INDEX.get((key, kind))
+            if loc is None:
+                return None
+            record = _read(*loc)
+        _, codec, _, _, _, length, crc = _HEADER.unpack(record[:_HEADER.size])
+        payload = record[_HEADER.size:_HEADER.size + length]
+        if zlib.crc32(payload) != crc:
+            logger.warning(f"Checksum mismatch in content store for {url}")
+            return None
+        return _decompress(codec, payload)
+    except Exception as e:
+        logger.warning(f"Content store read failed for {url}: {e}")
+        return None
+
+
+def get_text(url: str) -> str | None:
+    data = _get(url, TEXT)
+    return data.decode("utf-8") if data is not None else None
+
+
+def get_html(url: str) -> bytes | None:
+    return _get(url, HTML)
+
+
+def get_canonical(url: str) -> str | None:
+    data = _get(url, CANONICAL)
+    return data.decode("utf-8") if data is not None else None
+
+
+def stats() -> dict:
+    with _LOCK:
+        _load()
+        return {
+            "dir": CONTENT_STORE_DIR,
+            "codec": "zstd" if _ZSTD_AVAILABLE else "zlib",
+            "segments": len(_SCANNED),
+            "records": sum(1 for _, kind in _INDEX if kind == TEXT),
+            "bytes": _SIZE,
+            "max_bytes": CONTENT_STORE_MAX_BYTES,
+        }
@@ -1,5 +1,11 @@
+from datetime import datetime
+from sqlalchemy import and_, literal, literal_column
 from sqlalchemy.orm import Session
-from app.models import News
+from app.models import News, NewsSummary
+from app import stats
+
+# Summary languages served by the API; "ta" is the article's own summary column
+SUPPORTED_LANGS = ("ta", "en", "hi", "kn", "ml", "te")
 
 def get_news(db: Session, limit: int = 20, source: str | None = None):
     """Fetch latest Tamil news from DB"""
@@ -11,3 +17,100 @@ def get_news(db: Session, limit: int = 20, source: str | None = None):
          .limit(limit)
          .all()
     )
+
+def get_news_rows(db: Session, lang: str, limit: int = 20, source: str | None = None,
+                  fields: set[str] | None = None):
+    """Fetch latest news as projected rows joined with the stored summary for `lang`.
+    Returns plain row tuples: the NewsResponse columns, then updated_at and the
+    stored translation text/created_at for `lang` (both None for "ta").
+    With `fields`, columns outside it are selected as NULL so the database
+    never reads or sends them; the tuple layout stays the same.
+    """
+    cols = [
+        News.id, News.title, News.description, News.url, News.source, News.summary,
+        News.image_url, News.language, News.published_at, News.created_at, News.updated_at,
+    ]
+    if fields is not None:
+        keep = set(fields) | {"id", "updated_at"}
+        if "summary" in keep and lang != "ta":
+            # Translation source text falls back to description, then title
+            keep |= {"description", "title", "language"}
+        cols = [c if c.key in keep else literal(None).label(c.key) for c in cols]
+    if lang == "ta" or (fields is not None and "summary" not in fields):
+        q = db.query(*cols, literal(None), literal(None))
+    else:
+        q = (
+            db.query(*cols, NewsSummary.text, NewsSummary.created_at)
+              .outerjoin(NewsSummary, and_(NewsSummary.news_id == News.id, NewsSummary.lang == lang))
+        )
+    if source:
+        q = q.filter(News.source == source)
+    return (
+        q.order_by(News.created_at.desc().nullslast(), News.id.desc())
+         .limit(limit)
+         .all()
+    )
+
+def get_summary_rows(db: Session, news_ids, lang: str) -> dict[int, tuple[str, datetime]]:
+    """Stored (text, created_at) for `lang`, keyed by news_id."""
+    news_ids = list(news_ids)
+    if not news_ids:
+        return {}
+    rows = (
+        db.query(NewsSummary.news_id, NewsSummary.text, NewsSummary.created_at)
+          .filter(NewsSummary.news_id.in_(news_ids), NewsSummary.lang == lang)
+          .all()
+    )
+    return {nid: (text, created) for nid, text, created in rows}
+
+def set_summary(db: Session, news_id: int, lang: str, text: str, backend: str | None = None) -> None:
+    """Insert or replace the summary for (news_id, lang). Caller commits."""
+    db.merge(NewsSummary(news_id=news_id, lang=lang, text=text, backend=backend, created_at=datetime.utcnow()))
+
+def _dialect_insert(db: Session):
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def _new_keys(db: Session, rows: list[dict]) -> list[dict]:
+    """The rows whose (news_id, lang) is not in news_summary yet."""
+    existing = set(
+        db.query(NewsSummary.news_id, NewsSummary.lang)
+          .filter(NewsSummary.news_id.in_({r["news_id"] for r in rows}))
+          .all()
+    )
+    return [r for r in rows if (r["news_id"], r["lang"]) not in existing]
+
+def bulk_set_summaries(db: Session, rows: list[dict]) -> int:
+    """Upsert many {news_id, lang, text, backend} rows in one statement. Caller commits.
+    Only inserted rows count towards the translation statistics; overwrites do not."""
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+    rows = [dict(r, created_at=now) for r in rows]
+    insert = _dialect_insert(db)
+    if insert is None:
+        new = _new_keys(db, rows)
+        for r in rows:
+            set_summary(db, r["news_id"], r["lang"], r["text"], r.get("backend"))
+        stats.record_translations(db, [r["lang"] for r in new])
+        return len(rows)
+    stmt = insert(NewsSummary)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NewsSummary.news_id, NewsSummary.lang],
+        set_={"text": stmt.excluded.text, "backend": stmt.excluded.backend, "created_at": stmt.excluded.created_at},
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        # xmax is 0 only on rows this statement inserted, not on conflict updates
+        result = db.execute(stmt.returning(NewsSummary.lang, literal_column("(xmax = 0)")), rows)
+        langs = [lang for lang, inserted in result if inserted]
+    else:
+        langs = [r["lang"] for r in _new_keys(db, rows)]
+        db.execute(stmt, rows)
+    stats.record_translations(db, langs)
+    return len(rows)
@@ -1,31 +1,109 @@
-from sqlalchemy import create_engine
+from sqlalchemy import DateTime, bindparam, create_engine, inspect, text
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from collections import deque
+from datetime import datetime
 import os
+import threading
+import time
 from dotenv import load_dotenv
 import logging
 
 load_dotenv()
 logger = logging.getLogger("app.database")
 
-DATABASE_URL = os.getenv("DATABASE_URL") or os.getenv("DATABASE_URI") or ""
-DATABASE_URL = DATABASE_URL.strip()
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+psycopg2://", 1)
-elif DATABASE_URL.startswith("postgresql://") and "+" not in DATABASE_URL.split("://",1)[0]:
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1)
-
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=1800,
-    connect_args=(
-        {"connect_timeout": 5} if DATABASE_URL.startswith("postgresql+") else (
-            {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+# Pool sizing; applies to server databases (SQLite keeps SQLAlchemy's defaults)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+def _normalize_url(url: str) -> str:
+    url = (url or "").strip()
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql+psycopg2://", 1)
+    elif url.startswith("postgresql://") and "+" not in url.split("://",1)[0]:
+        url = url.replace("postgresql://", "postgresql+psycopg2://", 1)
+    return url
+
+DATABASE_URL = _normalize_url(os.getenv("DATABASE_URL") or os.getenv("DATABASE_URI") or "")
+# Optional read replica for GET paths; defaults to the primary
+DATABASE_READ_URL = _normalize_url(os.getenv("DATABASE_READ_URL") or "")
+
+
+class _PoolWaits:
+    """Checkout wait statistics for one pool."""
+
+    def __init__(self, role: str):
+        self.role = role
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.recent = deque(maxlen=1000)
+        self.lock = threading.Lock()
+
+    def record(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.recent.append(wait_ms)
+
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+    waits: _PoolWaits | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except sa_exc.TimeoutError:
+            if self.waits:
+                self.waits.record(0.0, timed_out=True)
+            raise
+        if self.waits:
+            self.waits.record((time.perf_counter() - start) * 1000)
+        return conn
+
+    def recreate(self):
+        new = super().recreate()
+        new.waits = self.waits
+        return new
+
+
+def _make_engine(url: str, role: str):
+    kwargs = dict(
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE,
+        connect_args=(
+            {"connect_timeout": 5} if url.startswith("postgresql+") else (
+                {"check_same_thread": False} if url.startswith("sqlite") else {}
+            )
+        ),
+    )
+    if not url.startswith("sqlite"):
+        kwargs.update(
+            poolclass=_TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
         )
-    ),
-)
+    eng = create_engine(url, **kwargs)
+    if isinstance(eng.pool, _TimedQueuePool):
+        eng.pool.waits = _PoolWaits(role)
+    return eng
+
+engine = _make_engine(DATABASE_URL, "primary")
+read_engine = _make_engine(DATABASE_READ_URL, "read") if DATABASE_READ_URL else engine
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
 def get_db():
@@ -35,38 +113,240 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """Session on the read replica (or the primary when none is configured); for GET paths."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def pool_stats() -> list[dict]:
+    out = []
+    engines = [("primary", engine)] + ([("read", read_engine)] if read_engine is not engine else [])
+    for role, eng in engines:
+        pool = eng.pool
+        stats = {"role": role, "status": pool.status()}
+        waits = getattr(pool, "waits", None)
+        if waits:
+            with waits.lock:
+                recent = sorted(waits.recent)
+                stats.update(
+                    size=pool.size(),
+                    checked_out=pool.checkedout(),
+                    overflow=pool.overflow(),
+                    checkouts=waits.checkouts,
+                    timeouts=waits.timeouts,
+                    avg_wait_ms=round(waits.total_wait_ms / waits.checkouts, 3) if waits.checkouts else 0.0,
+                    p95_wait_ms=round(recent[int(0.95 * (len(recent) - 1))], 3) if recent else 0.0,
+                    max_wait_ms=round(waits.max_wait_ms, 3),
+                )
+        out.append(stats)
+    return out
+
+# Languages that older schemas stored as news.summary_xx columns and in news.summaries JSON
+LEGACY_SUMMARY_LANGS = ("ta", "en", "hi", "kn", "ml", "te")
+LEGACY_SUMMARY_COLUMNS = tuple(f"summary_{lang}" for lang in LEGACY_SUMMARY_LANGS) + ("summaries",)
+# Set to 1 to drop the legacy columns at startup once news_summary holds all their
+# values (see drop_legacy_summary_columns; also available as an admin command)
+DROP_LEGACY_SUMMARY_COLUMNS = os.getenv("DROP_LEGACY_SUMMARY_COLUMNS", "0") == "1"
+
 def ensure_schema():
-    """Ensure new columns exist without a full migration tool.
-    - Adds news.summaries if it does not exist.
-    - Adds per-language summary columns if they do not exist: summary_ta, summary_en, summary_hi, summary_kn, summary_ml, summary_te.
+    """Bring older databases up to the current layout without a full migration tool.
+    - Adds news.updated_at (and its index, used by the hot index check) if it does not exist.
+    - Moves per-language summaries from the legacy summary_xx columns and the
+      summaries JSON into the news_summary table. The columns are kept unless
+      DROP_LEGACY_SUMMARY_COLUMNS=1 and every legacy value was copied.
+    - Adds news.canonical_url (indexed) and fills it for existing rows.
+    - With NEWS_PARTITIONING=1 on PostgreSQL, partitions news by month (see app.archive).
     """
     try:
         backend = engine.url.get_backend_name()
         with engine.begin() as conn:
             if backend.startswith("postgresql"):
-                conn.exec_driver_sql(
-                    """
-                    ALTER TABLE news
-                    ADD COLUMN IF NOT EXISTS summaries JSONB;
-                    """
-                )
-                conn.exec_driver_sql("ALTER TABLE news ADD COLUMN IF NOT EXISTS summary_ta TEXT;")
-                conn.exec_driver_sql("ALTER TABLE news ADD COLUMN IF NOT EXISTS summary_en TEXT;")
-                conn.exec_driver_sql("ALTER TABLE news ADD COLUMN IF NOT EXISTS summary_hi TEXT;")
-                conn.exec_driver_sql("ALTER TABLE news ADD COLUMN IF NOT EXISTS summary_kn TEXT;")
-                conn.exec_driver_sql("ALTER TABLE news ADD COLUMN IF NOT EXISTS summary_ml TEXT;")
-                conn.exec_driver_sql("ALTER TABLE news ADD COLUMN IF NOT EXISTS summary_te TEXT;")
+                conn.exec_driver_sql("ALTER TABLE news ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;")
             elif backend.startswith("sqlite"):
                 # SQLite lacks IF NOT EXISTS for ADD COLUMN in older versions; try and ignore error
                 try:
-                    conn.exec_driver_sql("ALTER TABLE news ADD COLUMN summaries TEXT")
+                    conn.exec_driver_sql("ALTER TABLE news ADD COLUMN updated_at DATETIME")
                 except Exception:
                     pass
-                for col in ("summary_ta", "summary_en", "summary_hi", "summary_kn", "summary_ml", "summary_te"):
-                    try:
-                        conn.exec_driver_sql(f"ALTER TABLE news ADD COLUMN {col} TEXT")
-                    except Exception:
-                        pass
+            conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_news_updated_at ON news (updated_at)")
+        with engine.begin() as conn:
+            if backend.startswith("postgresql"):
+                conn.exec_driver_sql("ALTER TABLE news ADD COLUMN IF NOT EXISTS canonical_url VARCHAR(1000);")
+            else:
+                try:
+                    conn.exec_driver_sql("ALTER TABLE news ADD COLUMN canonical_url VARCHAR(1000)")
+                except Exception:
+                    pass
+            conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_news_canonical_url ON news (canonical_url)")
+        backfill_canonical_urls()
+        with engine.connect() as conn:
+            has_rows = conn.exec_driver_sql("SELECT 1 FROM news_summary LIMIT 1").first()
+            legacy = [c["name"] for c in inspect(conn).get_columns("news") if c["name"] in LEGACY_SUMMARY_COLUMNS]
+        if legacy or not has_rows:
+            # Safe to repeat: existing news_summary rows are never overwritten
+            moved = backfill_summaries()
+            if moved:
+                logger.info(f"Backfilled {moved} rows into news_summary from legacy columns")
+            if legacy and DROP_LEGACY_SUMMARY_COLUMNS:
+                drop_legacy_summary_columns()
+        from app.archive import ensure_partitioning
+        ensure_partitioning()
     except Exception as e:
-        logger = logging.getLogger("app.database")
         logger.warning(f"ensure_schema skipped or failed: {e}")
+
+# Rows per statement for set-based backfills; each batch commits on its own to keep locks short
+BACKFILL_BATCH = int(os.getenv("BACKFILL_BATCH", "5000"))
+
+def id_ranges(conn, batch_size: int = BACKFILL_BATCH, table: str = "news"):
+    """Yield inclusive (lo, hi) id ranges covering `table` in steps of `batch_size`;
+    gaps in the id sequence are skipped rather than scanned."""
+    lo = conn.exec_driver_sql(f"SELECT min(id) FROM {table}").scalar()
+    while lo is not None:
+        hi = lo + batch_size - 1
+        yield lo, hi
+        lo = conn.execute(text(f"SELECT min(id) FROM {table} WHERE id > :hi"), {"hi": hi}).scalar()
+
+def backfill_canonical_urls(batch_size: int = BACKFILL_BATCH) -> int:
+    """Set canonical_url on rows that predate it, one id range per transaction."""
+    from app.utils.urls import canonicalize
+    updated = 0
+    with engine.connect() as conn:
+        if conn.exec_driver_sql("SELECT 1 FROM news WHERE canonical_url IS NULL LIMIT 1").first() is None:
+            return 0
+        for lo, hi in id_ranges(conn, batch_size):
+            rows = conn.execute(
+                text("SELECT id, url FROM news WHERE id BETWEEN :lo AND :hi AND canonical_url IS NULL"),
+                {"lo": lo, "hi": hi},
+            ).fetchall()
+            if rows:
+                conn.execute(
+                    text("UPDATE news SET canonical_url = :c WHERE id = :id"),
+                    [{"id": i, "c": canonicalize(u)} for i, u in rows],
+                )
+                conn.commit()
+                updated += len(rows)
+    if updated:
+        logger.info(f"Filled canonical_url for {updated} rows")
+    return updated
+
+def _legacy_exprs(conn, columns) -> list[tuple[str, str]]:
+    """(lang, SQL expression) for every legacy summary source still on news."""
+    backend = conn.engine.url.get_backend_name()
+    exprs = []
+    for lang in LEGACY_SUMMARY_LANGS:
+        if f"summary_{lang}" in columns:
+            exprs.append((lang, f"summary_{lang}"))
+        if "summaries" in columns and lang != "ta":
+            if backend.startswith("postgresql"):
+                exprs.append((lang, f"summaries->>'{lang}'"))
+            else:
+                exprs.append((lang, f"json_extract(summaries, '$.{lang}')"))
+    return exprs
+
+def missing_legacy_summaries(conn, columns) -> int:
+    """Legacy values with no counterpart yet: Tamil ones where news.summary is
+    empty, others where news_summary has no row for that language."""
+    missing = 0
+    for lang, expr in _legacy_exprs(conn, columns):
+        if lang == "ta":
+            cond = "(summary IS NULL OR summary = '')"
+        else:
+            cond = (
+                "NOT EXISTS (SELECT 1 FROM news_summary s "
+                f"WHERE s.news_id = news.id AND s.lang = '{lang}')"
+            )
+        missing += conn.exec_driver_sql(
+            f"SELECT count(*) FROM news WHERE {expr} IS NOT NULL AND {expr} <> '' AND {cond}"
+        ).scalar() or 0
+    return missing
+
+def drop_legacy_summary_columns() -> dict:
+    """Drop the legacy summary columns, but only when news_summary (and
+    news.summary for Tamil) already holds every value they carry; otherwise
+    nothing is dropped. Irreversible: older builds that read the columns
+    cannot be rolled back to afterwards.
+    PostgreSQL only marks dropped columns; the space comes back as rows are
+    rewritten (or with VACUUM FULL). SQLite needs 3.35+ for DROP COLUMN."""
+    with engine.connect() as conn:
+        columns = [c["name"] for c in inspect(conn).get_columns("news") if c["name"] in LEGACY_SUMMARY_COLUMNS]
+        missing = missing_legacy_summaries(conn, columns) if columns else 0
+    if missing:
+        logger.warning(f"Keeping legacy summary columns: {missing} values are not in news_summary yet")
+        return {"dropped": [], "missing": missing}
+    dropped = []
+    for col in columns:
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f"ALTER TABLE news DROP COLUMN {col}")
+            dropped.append(col)
+            logger.info(f"Dropped legacy column news.{col}")
+        except Exception as e:
+            logger.warning(f"Could not drop legacy column news.{col}: {e}")
+    return {"dropped": dropped, "missing": 0}
+
+def backfill_summaries(bind=None, batch_size: int = BACKFILL_BATCH) -> int:
+    """Copy legacy per-language summaries into news_summary.
+    Dedicated summary_xx columns win over the summaries JSON; existing
+    news_summary rows are never overwritten. Tamil stays on news.summary.
+    Runs as INSERT ... SELECT / UPDATE statements over id ranges, committing
+    after each range. Rows that gained summaries get a new updated_at so the
+    hot index and fragment caches pick them up. Returns the number of rows inserted.
+    """
+    bind = bind if bind is not None else engine
+    backend = bind.engine.url.get_backend_name()
+    inserted = 0
+    with bind.engine.connect() as conn:
+        cols = {c["name"] for c in inspect(conn).get_columns("news")}
+        statements = []
+        if "summary_ta" in cols:
+            statements.append((
+                "UPDATE news SET summary = summary_ta, updated_at = :now "
+                "WHERE id BETWEEN :lo AND :hi "
+                "AND (summary IS NULL OR summary = '') AND summary_ta IS NOT NULL AND summary_ta <> ''",
+                False,
+            ))
+        for lang in LEGACY_SUMMARY_LANGS:
+            if lang == "ta":
+                continue
+            exprs = []
+            if f"summary_{lang}" in cols:
+                exprs.append(f"summary_{lang}")
+            if "summaries" in cols:
+                if backend.startswith("postgresql"):
+                    exprs.append(f"summaries->>'{lang}'")
+                else:
+                    exprs.append(f"json_extract(summaries, '$.{lang}')")
+            for expr in exprs:
+                statements.append((
+                    "INSERT INTO news_summary (news_id, lang, text, backend, created_at) "
+                    f"SELECT id, '{lang}', {expr}, 'legacy', CURRENT_TIMESTAMP FROM news "
+                    f"WHERE id BETWEEN :lo AND :hi AND {expr} IS NOT NULL AND {expr} <> '' "
+                    "ON CONFLICT (news_id, lang) DO NOTHING",
+                    True,
+                ))
+        if not statements:
+            return 0
+        touch = text(
+            "UPDATE news SET updated_at = :now WHERE id BETWEEN :lo AND :hi "
+            "AND id IN (SELECT news_id FROM news_summary WHERE backend = 'legacy' AND news_id BETWEEN :lo AND :hi)"
+        ).bindparams(bindparam("now", type_=DateTime))
+        for lo, hi in id_ranges(conn, batch_size):
+            now = datetime.utcnow()
+            range_inserted = 0
+            for sql, counts in statements:
+                stmt = text(sql)
+                params = {"lo": lo, "hi": hi}
+                if ":now" in sql:
+                    stmt = stmt.bindparams(bindparam("now", type_=DateTime))
+                    params["now"] = now
+                res = conn.execute(stmt, params)
+                if counts:
+                    range_inserted += max(res.rowcount or 0, 0)
+            if range_inserted:
+                conn.execute(touch, {"lo": lo, "hi": hi, "now": now})
+            inserted += range_inserted
+            conn.commit()
+    return inserted
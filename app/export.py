@@ -0,0 +1,74 @@
+"""Streaming bulk export of the news table.
+
+Rows are read through a server-side cursor (stream_results + yield_per) on
+a connection owned by the generator, so memory stays flat regardless of
+table size and the first chunk is sent as soon as the first batch arrives.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime, timezone
+from sqlalchemy import select
+from app.database import read_engine
+from app.models import News
+from app.serialization import dumps
+
+EXPORT_COLUMNS = (
+    "id", "title", "description", "url", "source", "summary", "image_url",
+    "language", "published_at", "created_at", "updated_at",
+)
+BATCH_ROWS = 1000
+FORMATS = ("ndjson", "csv")
+
+
+def parse_since(value: str | None) -> datetime | None:
+    """ISO-8601 timestamp as naive UTC (how created_at is stored); naive input is taken as UTC."""
+    if not value:
+        return None
+    since = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def _rows(since: datetime | None):
+    stmt = select(*(getattr(News, c) for c in EXPORT_COLUMNS)).order_by(News.id)
+    if since is not None:
+        stmt = stmt.where(News.created_at >= since)
+    with read_engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=BATCH_ROWS).execute(stmt)
+        for batch in result.partitions():
+            yield batch
+
+
+def _ndjson(since: datetime | None):
+    for batch in _rows(since):
+        yield b"".join(dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in batch)
+
+
+def _csv(since: datetime | None):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buf.getvalue().encode("utf-8")
+    for batch in _rows(since):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(
+            [v.isoformat() if isinstance(v, datetime) else v for v in row] for row in batch
+        )
+        yield buf.getvalue().encode("utf-8")
+
+
+def _gzipped(chunks):
+    comp = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        # Sync-flush per batch so clients receive data as it is produced
+        yield comp.compress(chunk) + comp.flush(zlib.Z_SYNC_FLUSH)
+    yield comp.flush()
+
+
+def stream_export(since: datetime | None, fmt: str = "ndjson", gzip: bool = False):
+    """Iterator of encoded chunks for StreamingResponse."""
+    chunks = _csv(since) if fmt == "csv" else _ndjson(since)
+    return _gzipped(chunks) if gzip else chunks
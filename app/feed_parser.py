@@ -0,0 +1,161 @@
+"""Streaming parser for well-formed RSS 2.0 / RSS 1.0 (RDF) / Atom feeds.
+
+Extracts only what the scraper uses (title, link, description, dates, GUID,
+media/enclosure, content:encoded) and returns plain dicts using feedparser's
+key names, so entries from either parser can be handled the same way.
+Parsing stops early once items fall at or below the feed watermark.
+Anything that is not well-formed XML raises FastParseError and the caller
+falls back to feedparser.
+"""
+import io
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+NS_ATOM = "{http://www.w3.org/2005/Atom}"
+NS_MEDIA = "{http://search.yahoo.com/mrss/}"
+NS_CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+NS_DC = "{http://purl.org/dc/elements/1.1/}"
+NS_RSS1 = "{http://purl.org/rss/1.0/}"
+
+_ITEM_TAGS = {"item", NS_ATOM + "entry", NS_RSS1 + "item"}
+_ROOT_TAGS = {"rss", NS_ATOM + "feed", "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}RDF"}
+# Items at/below the watermark in a row before we assume the rest of the feed is older
+_STALE_RUN = 3
+
+
+class FastParseError(Exception):
+    """Input is not a feed this parser handles; use feedparser instead."""
+
+
+def parse_date(value: str | None) -> datetime | None:
+    """RFC 822 (RSS) or ISO 8601 (Atom/dc:date) string to a datetime; naive if the string has no zone."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return parsedate_to_datetime(value)
+    except Exception:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+
+def _struct_utc(dt: datetime | None):
+    # Same convention as feedparser's *_parsed: a UTC struct_time, naive values taken as UTC
+    if dt is None:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.utctimetuple()
+
+
+def _text(el) -> str:
+    return (el.text or "").strip() if el is not None else ""
+
+
+def _entry(item) -> dict:
+    e: dict = {}
+    media = []
+    thumbs = []
+    enclosures = []
+    links = []
+    for child in item:
+        tag = child.tag
+        if tag in ("title", NS_ATOM + "title", NS_RSS1 + "title"):
+            e["title"] = _text(child)
+        elif tag in ("link", NS_RSS1 + "link"):
+            e["link"] = _text(child)
+        elif tag == NS_ATOM + "link":
+            href = child.get("href")
+            rel = child.get("rel", "alternate")
+            if href:
+                links.append({"href": href, "rel": rel, "type": child.get("type")})
+                if rel == "alternate" and "link" not in e:
+                    e["link"] = href
+                elif rel == "enclosure":
+                    enclosures.append({"href": href, "type": child.get("type")})
+        elif tag in ("description", NS_RSS1 + "description", NS_ATOM + "summary"):
+            e["description"] = e["summary"] = _text(child)
+        elif tag in (NS_CONTENT + "encoded", NS_ATOM + "content"):
+            e["content"] = [{"value": _text(child)}]
+        elif tag in ("pubDate", NS_ATOM + "published"):
+            e["published"] = _text(child)
+        elif tag in (NS_ATOM + "updated", NS_DC + "date"):
+            e.setdefault("updated", _text(child))
+        elif tag in ("guid", NS_ATOM + "id"):
+            e["id"] = _text(child)
+        elif tag == "enclosure":
+            url = child.get("url")
+            if url:
+                enclosures.append({"href": url, "type": child.get("type")})
+        elif tag == NS_MEDIA + "content":
+            if child.get("url"):
+                media.append({"url": child.get("url")})
+        elif tag == NS_MEDIA + "thumbnail":
+            if child.get("url"):
+                thumbs.append({"url": child.get("url")})
+        elif tag == NS_MEDIA + "group":
+            for m in child:
+                if m.tag == NS_MEDIA + "content" and m.get("url"):
+                    media.append({"url": m.get("url")})
+                elif m.tag == NS_MEDIA + "thumbnail" and m.get("url"):
+                    thumbs.append({"url": m.get("url")})
+    if "link" not in e and item.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about"):
+        e["link"] = item.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about")
+    if "description" not in e and "content" in e:
+        e["description"] = e["summary"] = e["content"][0]["value"]
+    if media:
+        e["media_content"] = media
+    if thumbs:
+        e["media_thumbnail"] = thumbs
+    if enclosures:
+        e["enclosures"] = enclosures
+    if links:
+        e["links"] = links
+    if "published" not in e and "updated" in e:
+        e["published"] = e["updated"]
+    parsed = _struct_utc(parse_date(e.get("published")))
+    if parsed:
+        e["published_parsed"] = parsed
+    if e.get("updated"):
+        e["updated_parsed"] = _struct_utc(parse_date(e["updated"]))
+    return e
+
+
+def parse_feed(data: bytes, since: float | None = None) -> list[dict]:
+    """Parse feed bytes into entry dicts (feed order).
+    With `since` (epoch seconds, compared the way the scraper tracks LAST_PUBDATE),
+    stop reading once several consecutive items are at or below it.
+    """
+    if not data or not data.lstrip().startswith(b"<"):
+        raise FastParseError("not XML")
+    entries = []
+    stale = 0
+    root_seen = False
+    try:
+        for event, el in ET.iterparse(io.BytesIO(data), events=("start", "end")):
+            if event == "start":
+                if not root_seen:
+                    if el.tag not in _ROOT_TAGS:
+                        raise FastParseError(f"unexpected root element {el.tag}")
+                    root_seen = True
+                continue
+            if el.tag not in _ITEM_TAGS:
+                continue
+            entry = _entry(el)
+            el.clear()
+            entries.append(entry)
+            if since is not None and entry.get("published_parsed"):
+                if time.mktime(entry["published_parsed"]) <= since:
+                    stale += 1
+                    if stale >= _STALE_RUN:
+                        break
+                else:
+                    stale = 0
+    except ET.ParseError as e:
+        raise FastParseError(str(e))
+    return entries
@@ -0,0 +1,201 @@
+"""In-process index of the newest news rows, globally and per source.
+
+Serves the common `GET /news/` reads without a full query. Each worker keeps
+its own copy; before serving, the index compares a marker of the news table
+with what it has seen (at most every HOT_INDEX_CHECK_SECONDS) and pulls only
+the rows that changed, so rows written by other processes show up on the
+next check.
+
+Ids and updated_at values are assigned before commit, so concurrent writers
+can make rows visible out of order (id N before N-1). The marker therefore
+also counts the rows among the last HOT_INDEX_OVERLAP_IDS ids, and a sync
+re-reads that id window; every check also re-reads rows whose updated_at
+falls in the last HOT_INDEX_OVERLAP_SECONDS, so updates committed late are
+picked up too.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_, select
+from app.database import read_engine
+from app.models import News
+from app import trending
+
+logger = logging.getLogger("app.hot_index")
+
+ENABLE_HOT_INDEX = os.getenv("ENABLE_HOT_INDEX", "1") == "1"
+HOT_INDEX_SIZE = int(os.getenv("HOT_INDEX_SIZE", "200"))
+HOT_INDEX_CHECK_SECONDS = float(os.getenv("HOT_INDEX_CHECK_SECONDS", "2"))
+# Trailing windows re-checked for rows committed out of order
+HOT_INDEX_OVERLAP_IDS = int(os.getenv("HOT_INDEX_OVERLAP_IDS", "500"))
+HOT_INDEX_OVERLAP_SECONDS = float(os.getenv("HOT_INDEX_OVERLAP_SECONDS", "30"))
+
+# Same leading columns as crud.get_news_rows
+COLUMNS = (
+    News.id, News.title, News.description, News.url, News.source, News.summary,
+    News.image_url, News.language, News.published_at, News.created_at, News.updated_at,
+)
+_ID, _SOURCE, _CREATED, _UPDATED = 0, 4, 9, 10
+
+_LOCK = threading.Lock()
+_SYNC_LOCK = threading.Lock()
+_GLOBAL: deque = deque(maxlen=HOT_INDEX_SIZE)
+_BY_SOURCE: dict[str, deque] = {}
+# Buckets holding every row the table has for them (fewer than HOT_INDEX_SIZE); None is the global bucket
+_COMPLETE: set = set()
+_READY = False
+# Table marker at the last sync (see _marker) and the id floor it was counted with
+_SEEN: tuple = (0, None, 0)
+_ID_FLOOR = 0
+_LAST_CHECK = 0.0
+
+
+def _sort_key(row):
+    created = row[_CREATED]
+    return (created is not None, created or datetime.min, row[_ID])
+
+
+def _rebuild(bucket: deque | None, rows) -> deque:
+    merged = {r[_ID]: r for r in (bucket or ())}
+    for r in rows:
+        merged[r[_ID]] = r
+    newest = sorted(merged.values(), key=_sort_key, reverse=True)[:HOT_INDEX_SIZE]
+    return deque(newest, maxlen=HOT_INDEX_SIZE)
+
+
+def _apply(rows) -> None:
+    global _GLOBAL
+    by_source: dict[str, list] = {}
+    for r in rows:
+        by_source.setdefault(r[_SOURCE], []).append(r)
+    with _LOCK:
+        _GLOBAL = _rebuild(_GLOBAL, rows)
+        if len(_GLOBAL) >= HOT_INDEX_SIZE:
+            _COMPLETE.discard(None)
+        for source, items in by_source.items():
+            bucket = _rebuild(_BY_SOURCE.get(source), items)
+            _BY_SOURCE[source] = bucket
+            if len(bucket) >= HOT_INDEX_SIZE:
+                _COMPLETE.discard(source)
+
+
+def _id_floor(max_id) -> int:
+    return max((max_id or 0) - HOT_INDEX_OVERLAP_IDS, 0)
+
+
+def _marker(conn, id_floor: int) -> tuple:
+    """(max id, max updated_at, rows with id above the floor). The count is an
+    index range scan; it changes when a lower id commits late."""
+    recent = select(func.count()).select_from(News).where(News.id > id_floor).scalar_subquery()
+    row = conn.execute(select(func.max(News.id), func.max(News.updated_at), recent)).one()
+    return (row[0] or 0, row[1], row[2])
+
+
+def load() -> None:
+    """(Re)build the index from the database: the newest rows globally and per source."""
+    global _GLOBAL, _BY_SOURCE, _READY, _SEEN, _ID_FLOOR, _LAST_CHECK
+    if not ENABLE_HOT_INDEX:
+        return
+    order = (News.created_at.desc().nullslast(), News.id.desc())
+    rn = func.row_number().over(partition_by=News.source, order_by=order).label("rn")
+    ranked = select(*COLUMNS, rn).subquery()
+    with _SYNC_LOCK, read_engine.connect() as conn:
+        id_floor = _id_floor(conn.execute(select(func.max(News.id))).scalar())
+        seen = _marker(conn, id_floor)
+        top = [tuple(r) for r in conn.execute(select(*COLUMNS).order_by(*order).limit(HOT_INDEX_SIZE))]
+        per_source = [tuple(r)[:-1] for r in conn.execute(select(ranked).where(ranked.c.rn <= HOT_INDEX_SIZE))]
+        by_source: dict[str, list] = {}
+        for r in per_source:
+            by_source.setdefault(r[_SOURCE], []).append(r)
+        with _LOCK:
+            _GLOBAL = _rebuild(None, top)
+            _BY_SOURCE = {s: _rebuild(None, items) for s, items in by_source.items()}
+            _COMPLETE.clear()
+            if len(_GLOBAL) < HOT_INDEX_SIZE:
+                _COMPLETE.add(None)
+            _COMPLETE.update(s for s, b in _BY_SOURCE.items() if len(b) < HOT_INDEX_SIZE)
+            _SEEN, _ID_FLOOR = seen, id_floor
+            _LAST_CHECK = time.monotonic()
+            _READY = True
+    logger.info(f"Hot index loaded: {len(_GLOBAL)} latest rows, {len(_BY_SOURCE)} sources")
+
+
+def _sync() -> None:
+    """Pull rows inserted or updated since the last check, if the table moved."""
+    global _SEEN, _ID_FLOOR, _LAST_CHECK
+    if time.monotonic() - _LAST_CHECK < HOT_INDEX_CHECK_SECONDS:
+        return
+    if not _SYNC_LOCK.acquire(blocking=False):
+        # Another thread is syncing; serve what we have
+        return
+    try:
+        with read_engine.connect() as conn:
+            id_floor, seen = _ID_FLOOR, _SEEN
+            current = _marker(conn, id_floor)
+            # Recent updates are always re-read: one committed late with an older
+            # updated_at does not move the marker
+            cond = News.updated_at >= datetime.utcnow() - timedelta(seconds=HOT_INDEX_OVERLAP_SECONDS)
+            next_floor, next_seen = id_floor, current
+            if current != seen:
+                # Take the next marker before reading rows: anything committed in
+                # between is read now and changes the marker again, never lost
+                next_floor = _id_floor(current[0])
+                if next_floor != id_floor:
+                    next_seen = _marker(conn, next_floor)
+                cond = or_(cond, News.id > id_floor)
+                if seen[1] is not None:
+                    cond = or_(cond, News.updated_at > seen[1])
+            changed = [tuple(r) for r in conn.execute(select(*COLUMNS).where(cond))]
+            if changed:
+                _apply(changed)
+                # Rows stored by other processes also feed the trending counters
+                trending.observe(changed)
+            _SEEN, _ID_FLOOR = next_seen, next_floor
+        _LAST_CHECK = time.monotonic()
+    finally:
+        _SYNC_LOCK.release()
+
+
+def push(rows) -> None:
+    """Make freshly committed rows (tuples in COLUMNS order) visible immediately.
+    The consistency marker is left alone, so the next check still picks up
+    anything other writers committed in between."""
+    if not _READY or not rows:
+        return
+    _apply([tuple(r) for r in rows])
+
+
+def invalidate() -> None:
+    """Drop the index after deletes; it is rebuilt on the next read."""
+    global _READY
+    with _LOCK:
+        _READY = False
+
+
+def latest(limit: int, source: str | None = None) -> list[tuple] | None:
+    """Newest `limit` rows (optionally for one source) in COLUMNS order,
+    or None when the request falls outside the window and must go to the DB."""
+    if not ENABLE_HOT_INDEX or limit > HOT_INDEX_SIZE:
+        return None
+    try:
+        if not _READY:
+            load()
+        else:
+            _sync()
+    except Exception as e:
+        logger.warning(f"Hot index refresh failed, falling back to DB: {e}")
+        return None
+    with _LOCK:
+        bucket = _GLOBAL if source is None else _BY_SOURCE.get(source)
+        if bucket is None:
+            return None
+        if len(bucket) < limit and source not in _COMPLETE:
+            return None
+        return list(bucket)[:limit]
+
+
+def row_of(n: News) -> tuple:
+    return tuple(getattr(n, c.key) for c in COLUMNS)
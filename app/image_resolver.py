@@ -0,0 +1,210 @@
+"""Background resolution of article images (og:image / twitter:image).
+
+Articles whose RSS item carries no media are queued here after they are
+stored. Worker threads read only the head of the article page (a ranged,
+streamed request that stops as soon as an image meta tag is seen), cache the
+answer per article URL (including misses), respect a per-host request budget
+and backfill news.image_url in the database.
+"""
+import heapq
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+import requests
+from sqlalchemy import or_, update
+from app.database import engine
+from app.models import News
+from app.utils.http import referer_headers
+from app.utils.urls import canonicalize
+
+logger = logging.getLogger("app.image_resolver")
+
+IMAGE_RESOLVE_WORKERS = int(os.getenv("IMAGE_RESOLVE_WORKERS", "2"))
+IMAGE_RESOLVE_MAX_BYTES = int(os.getenv("IMAGE_RESOLVE_MAX_BYTES", "131072"))
+IMAGE_RESOLVE_PER_HOST_PER_MIN = int(os.getenv("IMAGE_RESOLVE_PER_HOST_PER_MIN", "20"))
+_HIT_TTL = 24 * 3600
+_MISS_TTL = 6 * 3600
+_CACHE_MAX = 20000
+
+_META_RE = re.compile(rb"<meta\b[^>]*>", re.I)
+_ATTR_RE = re.compile(rb"""([a-zA-Z:_-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+_IMG_RE = re.compile(rb"""<img\b[^>]*?\bsrc\s*=\s*["']([^"']+)["']""", re.I)
+_HEAD_END_RE = re.compile(rb"</head\s*>", re.I)
+_IMAGE_META = (b"og:image", b"og:image:url", b"og:image:secure_url", b"twitter:image", b"twitter:image:src")
+
+# article URL -> (image URL or None, expires at epoch seconds)
+_CACHE: "OrderedDict[str, tuple[str | None, float]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+# host -> request timestamps within the last minute
+_HOST_CALLS: dict[str, deque] = {}
+_HOST_LOCK = threading.Lock()
+_QUEUE: "queue.Queue[str]" = queue.Queue()
+_QUEUED: set[str] = set()
+# (due at monotonic seconds, article URL) waiting for their host budget; one thread re-queues them
+_DEFERRED: list[tuple[float, str]] = []
+_DEFERRED_COND = threading.Condition()
+_HOST_RETRY_SECONDS = 5.0
+_WORKERS: list[threading.Thread] = []
+_WORKERS_LOCK = threading.Lock()
+
+
+def cached(article_url: str) -> str | None:
+    """Cached image URL for an article, or None when unknown or a cached miss."""
+    with _CACHE_LOCK:
+        hit = _CACHE.get(article_url)
+    if hit and hit[1] > time.time():
+        return hit[0]
+    return None
+
+
+def _is_cached(article_url: str) -> bool:
+    with _CACHE_LOCK:
+        hit = _CACHE.get(article_url)
+    return bool(hit and hit[1] > time.time())
+
+
+def _remember(article_url: str, image_url: str | None) -> None:
+    ttl = _HIT_TTL if image_url else _MISS_TTL
+    with _CACHE_LOCK:
+        _CACHE[article_url] = (image_url, time.time() + ttl)
+        _CACHE.move_to_end(article_url)
+        while len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+
+
+def _take_host_budget(host: str) -> bool:
+    now = time.time()
+    with _HOST_LOCK:
+        calls = _HOST_CALLS.setdefault(host, deque())
+        while calls and now - calls[0] > 60:
+            calls.popleft()
+        if len(calls) >= IMAGE_RESOLVE_PER_HOST_PER_MIN:
+            return False
+        calls.append(now)
+        return True
+
+
+def _find_image(head: bytes, page_url: str) -> str | None:
+    fallback = None
+    for tag in _META_RE.findall(head):
+        attrs = {}
+        for name, v1, v2, v3 in _ATTR_RE.findall(tag):
+            attrs[name.lower()] = v1 or v2 or v3
+        key = (attrs.get(b"property") or attrs.get(b"name") or b"").lower()
+        content = attrs.get(b"content")
+        if key in _IMAGE_META and content:
+            url = content.decode("utf-8", "ignore").strip()
+            if key.startswith(b"og:"):
+                return urljoin(page_url, url)
+            fallback = fallback or urljoin(page_url, url)
+    return fallback
+
+
+def resolve(article_url: str) -> str | None:
+    """Read the head of the article page and return its preview image URL.
+    Stops downloading once the image meta tag (or </head>) has been seen."""
+    headers = referer_headers(article_url)
+    headers["Range"] = f"bytes=0-{IMAGE_RESOLVE_MAX_BYTES - 1}"
+    buf = b""
+    try:
+        with requests.get(article_url, headers=headers, timeout=10, stream=True) as resp:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(chunk_size=8192):
+                buf += chunk
+                found = _find_image(buf, article_url)
+                if found:
+                    return found
+                if _HEAD_END_RE.search(buf) or len(buf) >= IMAGE_RESOLVE_MAX_BYTES:
+                    break
+    except Exception as e:
+        logger.debug(f"Image resolve failed for {article_url}: {e}")
+        return None
+    # No meta image in the head; fall back to the first <img> we read
+    m = _IMG_RE.search(buf)
+    return urljoin(article_url, m.group(1).decode("utf-8", "ignore")) if m else None
+
+
+def _backfill(article_url: str, image_url: str) -> None:
+    stmt = (
+        update(News)
+        .where(
+            or_(News.canonical_url == canonicalize(article_url), News.url == article_url),
+            or_(News.image_url.is_(None), News.image_url == ""),
+        )
+        .values(image_url=image_url, updated_at=datetime.utcnow())
+    )
+    with engine.begin() as conn:
+        conn.execute(stmt)
+
+
+def _defer(article_url: str) -> None:
+    with _DEFERRED_COND:
+        heapq.heappush(_DEFERRED, (time.monotonic() + _HOST_RETRY_SECONDS, article_url))
+        _DEFERRED_COND.notify()
+
+
+def _requeue_deferred() -> None:
+    while True:
+        with _DEFERRED_COND:
+            while not _DEFERRED or _DEFERRED[0][0] > time.monotonic():
+                _DEFERRED_COND.wait(_DEFERRED[0][0] - time.monotonic() if _DEFERRED else None)
+            _, article_url = heapq.heappop(_DEFERRED)
+        _QUEUE.put(article_url)
+
+
+def _worker() -> None:
+    while True:
+        article_url = _QUEUE.get()
+        try:
+            if _is_cached(article_url):
+                image_url = cached(article_url)
+            elif not _take_host_budget(urlparse(article_url).netloc):
+                # Host budget spent; retry this one later without blocking other hosts
+                _defer(article_url)
+                continue
+            else:
+                image_url = resolve(article_url)
+                _remember(article_url, image_url)
+            if image_url:
+                _backfill(article_url, image_url)
+            with _CACHE_LOCK:
+                _QUEUED.discard(article_url)
+        except Exception as e:
+            logger.warning(f"Image backfill failed for {article_url}: {e}")
+            with _CACHE_LOCK:
+                _QUEUED.discard(article_url)
+        finally:
+            _QUEUE.task_done()
+
+
+def _ensure_workers() -> None:
+    with _WORKERS_LOCK:
+        if _WORKERS:
+            return
+        for i in range(max(1, IMAGE_RESOLVE_WORKERS)):
+            t = threading.Thread(target=_worker, name=f"image-resolver-{i}", daemon=True)
+            t.start()
+            _WORKERS.append(t)
+        t = threading.Thread(target=_requeue_deferred, name="image-resolver-deferred", daemon=True)
+        t.start()
+        _WORKERS.append(t)
+
+
+def enqueue(article_urls) -> int:
+    """Queue stored articles for background image resolution. Returns how many were queued."""
+    added = 0
+    with _CACHE_LOCK:
+        for url in article_urls:
+            if url and url not in _QUEUED:
+                _QUEUED.add(url)
+                _QUEUE.put(url)
+                added += 1
+    if added:
+        _ensure_workers()
+    return added
@@ -1,8 +1,9 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import Base, engine, ensure_schema
+from app.database import Base, SessionLocal, engine, ensure_schema
 from app import models  # Ensure models are registered before create_all
-from app.api import news_routes, admin_routes
+from app import admission, hot_index, stats, timing, trending
+from app.api import news_routes, admin_routes, image_routes
 from app.scheduler import start_scheduler
 import logging
 
@@ -15,6 +16,9 @@ app = FastAPI(
     description="Aggregates and summarizes Tamil news from multiple sources.",
 )
 
+# Rate limits, per-class concurrency and load shedding (added first so CORS headers still wrap 429/503)
+app.add_middleware(admission.AdmissionControl)
+
 # CORS for local file and any origin during development
 app.add_middleware(
     CORSMiddleware,
@@ -24,9 +28,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    record = timing.begin()
+    response = await call_next(request)
+    response.headers["Server-Timing"] = timing.finish(record, timing.route_key(request.scope))
+    return response
+
 # Include routers
 app.include_router(news_routes.router, prefix="/news", tags=["News"])
 app.include_router(admin_routes.router, prefix="/admin", tags=["Admin"])
+app.include_router(image_routes.router, prefix="/images", tags=["Images"])
 
 @app.get("/")
 def root():
@@ -36,9 +48,25 @@ def root():
 def startup_event():
     logger.info("🚀 Tamil News Aggregator starting... Initializing DB and scheduler.")
     try:
-        ensure_schema()
         Base.metadata.create_all(bind=engine)
+        ensure_schema()
         logger.info("✅ Database tables created or verified.")
     except Exception as e:
         logger.error(f"⚠️ Failed to create/verify DB tables at startup: {e}")
+    try:
+        hot_index.load()
+    except Exception as e:
+        logger.warning(f"⚠️ Hot index not loaded at startup, will retry on first read: {e}")
+    try:
+        trending.warm()
+    except Exception as e:
+        logger.warning(f"⚠️ Trending counters not warmed at startup, will retry on first read: {e}")
+    db = SessionLocal()
+    try:
+        stats.seed_if_empty(db)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠️ Could not seed statistics tables: {e}")
+    finally:
+        db.close()
     start_scheduler()
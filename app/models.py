@@ -1,5 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
-from sqlalchemy import JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
 from datetime import datetime
 from app.database import Base
 
@@ -10,17 +9,79 @@ class News(Base):
     title = Column(String(500), nullable=False)
     description = Column(Text, nullable=True)
     url = Column(String(1000), unique=True, nullable=False)
+    # app.utils.urls.canonicalize(url), or the page's rel=canonical; dedupes URL variants
+    canonical_url = Column(String(1000), nullable=True, index=True)
     source = Column(String(100), nullable=False)
+    # Tamil summary of the article; translations live in news_summary
     summary = Column(Text, nullable=True)
-    summaries = Column(JSON, nullable=True)
-    summary_ta = Column(Text, nullable=True)
-    summary_en = Column(Text, nullable=True)
-    summary_hi = Column(Text, nullable=True)
-    summary_kn = Column(Text, nullable=True)
-    summary_ml = Column(Text, nullable=True)
-    summary_te = Column(Text, nullable=True)
     image_url = Column(String(1000), nullable=True)
     language = Column(String(10), nullable=False, default="ta")
     published_at = Column(DateTime, nullable=True)
     scraped = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+
+class NewsSummary(Base):
+    """One translated summary per (article, language)."""
+    __tablename__ = "news_summary"
+
+    news_id = Column(Integer, ForeignKey("news.id", ondelete="CASCADE"), primary_key=True)
+    lang = Column(String(10), primary_key=True)
+    text = Column(Text, nullable=False)
+    backend = Column(String(50), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ScraperNode(Base):
+    """A scraper process taking part in sharded scraping; alive while heartbeat_at is recent."""
+    __tablename__ = "scraper_node"
+
+    node_id = Column(String(200), primary_key=True)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    heartbeat_at = Column(DateTime, nullable=False, index=True)
+
+
+class FeedLease(Base):
+    """Which node is polling a source (an RSS_FEEDS key) and when it was last polled."""
+    __tablename__ = "feed_lease"
+
+    source = Column(String(100), primary_key=True)
+    node_id = Column(String(200), nullable=True)
+    leased_until = Column(DateTime, nullable=True)
+    last_polled_at = Column(DateTime, nullable=True)
+
+
+class SourceStats(Base):
+    """Running article count and last ingest time per source (see app.stats)."""
+    __tablename__ = "stats_source"
+
+    source = Column(String(100), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    last_ingest_at = Column(DateTime, nullable=True)
+
+
+class IngestHourly(Base):
+    """Articles ingested per source per hour (created_at truncated to the hour)."""
+    __tablename__ = "stats_ingest_hourly"
+
+    hour = Column(DateTime, primary_key=True)
+    source = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class TranslationStats(Base):
+    """Number of stored translated summaries per language."""
+    __tablename__ = "stats_translation"
+
+    lang = Column(String(10), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+
+class SummaryCache(Base):
+    """Gemini summaries keyed by a hash of the normalized article text."""
+    __tablename__ = "summary_cache"
+
+    content_hash = Column(String(64), primary_key=True)
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
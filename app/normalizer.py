@@ -0,0 +1,283 @@
+"""Per-source entry normalization.
+
+The first entries seen for a source are run through the generic extractors,
+and the fields that produced the link, image and date (plus the date format
+and whether it carries a zone) are recorded as that source's profile. The
+profile is compiled into a direct extractor and cached, so later entries cost
+a few dict lookups. When the compiled extractor misses a field, that entry
+falls back to the generic path; _MAX_MISSES misses in a row drop the profile
+so it is learned again. A source whose entries carry no usable date is
+profiled that way, and a missing date is not a miss for it.
+"""
+import calendar
+import logging
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+try:
+    from zoneinfo import ZoneInfo  # Python 3.9+
+    IST = ZoneInfo("Asia/Kolkata")
+except Exception:
+    # Fallback: treat zone-less dates as UTC if zoneinfo unavailable
+    IST = timezone.utc
+
+logger = logging.getLogger("app.normalizer")
+
+_DATE_FIELDS = ("published", "updated", "dc:date", "pubDate")
+_LINK_FIELDS = ("link", "id", "guid", "url", "href")
+_IMG_RE = re.compile(r"""<img\b[^>]*?\bsrc\s*=\s*["']([^"']+)["']""", re.I)
+# Misses in a row before a profile is thrown away and learned again
+_MAX_MISSES = 5
+
+
+def extract_image_from_entry(entry):
+    try:
+        media = entry.get('media_content') or entry.get('media_thumbnail')
+        if isinstance(media, list) and media:
+            url = media[0].get('url') or media[0].get('href')
+            if url:
+                return url
+        if isinstance(media, dict):
+            url = media.get('url') or media.get('href')
+            if url:
+                return url
+    except Exception:
+        pass
+    enclosure = entry.get('enclosures') or entry.get('enclosure')
+    if isinstance(enclosure, list) and enclosure:
+        href = enclosure[0].get('href') or enclosure[0].get('url')
+        if href:
+            return href
+    if isinstance(enclosure, dict):
+        href = enclosure.get('href') or enclosure.get('url')
+        if href:
+            return href
+    html_source = None
+    if entry.get('content') and isinstance(entry['content'], list) and entry['content']:
+        html_source = entry['content'][0].get('value')
+    elif entry.get('summary_detail') and entry['summary_detail'].get('value'):
+        html_source = entry['summary_detail']['value']
+    elif entry.get('summary'):
+        html_source = entry.get('summary')
+    if html_source:
+        try:
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(html_source, 'html.parser')
+            img = soup.find('img')
+            if img and img.get('src'):
+                return img.get('src')
+        except Exception:
+            pass
+    return None
+
+
+def extract_entry_link(entry):
+    # Prefer standard 'link'
+    link = entry.get("link")
+    if link:
+        return str(link).strip()
+    # Some feeds provide a list of link objects
+    links = entry.get("links")
+    if isinstance(links, list) and links:
+        first = links[0]
+        if isinstance(first, dict):
+            href = first.get("href") or first.get("url")
+            if href:
+                return str(href).strip()
+        elif isinstance(first, str) and first:
+            return first.strip()
+    # Fallbacks commonly used in RSS/Atom
+    for k in ("id", "guid", "url", "href"):
+        v = entry.get(k)
+        if isinstance(v, str) and v.strip():
+            return v.strip()
+        if isinstance(v, dict):
+            href = v.get("href") or v.get("url")
+            if href:
+                return str(href).strip()
+    return ""
+
+
+def _to_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        # No timezone in string. Assume IST to match Tamil sites.
+        dt = dt.replace(tzinfo=IST)
+    return dt.astimezone(timezone.utc)
+
+
+def parse_published(entry) -> datetime | None:
+    """Generic published time in UTC: date strings first, then the parsed struct_time."""
+    for field in _DATE_FIELDS:
+        date_str = entry.get(field)
+        if isinstance(date_str, str) and date_str.strip():
+            try:
+                return _to_utc(parsedate_to_datetime(date_str.strip()))
+            except Exception:
+                break
+    published_parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if published_parsed:
+        try:
+            # treat as UTC epoch
+            return datetime.fromtimestamp(calendar.timegm(published_parsed), tz=timezone.utc)
+        except Exception:
+            pass
+    return None
+
+
+def _quick_image(entry) -> str | None:
+    """Image lookup without building a soup: media fields, then the first <img> in the HTML."""
+    for f in ("media_content", "media_thumbnail", "enclosures"):
+        v = entry.get(f)
+        if isinstance(v, list) and v and isinstance(v[0], dict):
+            url = v[0].get("url") or v[0].get("href")
+            if url:
+                return url
+    content = entry.get("content")
+    html_source = content[0].get("value") if isinstance(content, list) and content else None
+    m = _IMG_RE.search(html_source or entry.get("summary") or entry.get("description") or "")
+    return m.group(1) if m else None
+
+
+def _learn(entry) -> dict | None:
+    """Record which fields of this entry hold the link, image and date."""
+    link = extract_entry_link(entry)
+    link_field = next((f for f in _LINK_FIELDS if isinstance(entry.get(f), str) and entry.get(f).strip() == link), None)
+    if not link or not link_field:
+        return None
+    image_field = None
+    for f in ("media_content", "media_thumbnail", "enclosures"):
+        v = entry.get(f)
+        if isinstance(v, list) and v and isinstance(v[0], dict) and (v[0].get("url") or v[0].get("href")):
+            image_field = f
+            break
+    if image_field is None and _IMG_RE.search(entry.get("summary") or entry.get("description") or ""):
+        image_field = "summary_img"
+    date_field = date_format = None
+    for f in _DATE_FIELDS:
+        v = entry.get(f)
+        if isinstance(v, str) and v.strip():
+            date_field = f
+            try:
+                parsedate_to_datetime(v.strip())
+                date_format = "rfc822"
+            except Exception:
+                try:
+                    datetime.fromisoformat(v.strip().replace("Z", "+00:00"))
+                    date_format = "iso"
+                except Exception:
+                    date_format = None
+            break
+    return {"link": link_field, "image": image_field, "date": date_field, "date_format": date_format}
+
+
+def _compile(profile: dict):
+    """Build a direct extractor: entry -> (link, image_url, published_at); None where it misses."""
+    link_field = profile["link"]
+    image_field = profile["image"]
+    date_field = profile["date"]
+    parse = {
+        "rfc822": parsedate_to_datetime,
+        "iso": lambda s: datetime.fromisoformat(s.replace("Z", "+00:00")),
+    }.get(profile["date_format"])
+
+    def extract(entry):
+        link = entry.get(link_field)
+        link = link.strip() if isinstance(link, str) else None
+        image = None
+        if image_field == "summary_img":
+            m = _IMG_RE.search(entry.get("summary") or entry.get("description") or "")
+            image = m.group(1) if m else None
+        elif image_field:
+            v = entry.get(image_field)
+            if v:
+                image = v[0].get("url") or v[0].get("href")
+        published = None
+        if parse:
+            try:
+                published = _to_utc(parse(entry[date_field].strip()))
+            except Exception:
+                published = None
+        return link, image, published
+
+    return extract
+
+
+class EntryNormalizer:
+    """Caches one compiled extractor per source."""
+
+    def __init__(self):
+        self._profiles: dict[str, tuple[dict, object]] = {}
+        self._misses: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def profile(self, source: str) -> dict | None:
+        found = self._profiles.get(source)
+        return found[0] if found else None
+
+    def _extractor(self, source: str, entry) -> tuple[dict, object] | None:
+        found = self._profiles.get(source)
+        if found:
+            return found
+        profile = _learn(entry)
+        if not profile:
+            return None
+        found = (profile, _compile(profile))
+        with self._lock:
+            self._profiles[source] = found
+            self._misses[source] = 0
+        logger.debug(f"Learned entry profile for {source}: {profile}")
+        return found
+
+    def _missed(self, source: str) -> None:
+        with self._lock:
+            self._misses[source] = self._misses.get(source, 0) + 1
+            if self._misses[source] >= _MAX_MISSES:
+                self._profiles.pop(source, None)
+                self._misses[source] = 0
+
+    def _hit(self, source: str) -> None:
+        if self._misses.get(source):
+            with self._lock:
+                self._misses[source] = 0
+
+    def normalize(self, source: str, entry, cutoff: datetime | None = None) -> dict | None:
+        """Link, title, description, image_url and UTC published_at of an entry.
+        Returns None if the entry has no link or was published before `cutoff`."""
+        found = self._extractor(source, entry)
+        extractor = found[1] if found else None
+        link = image = published = None
+        if extractor is not None:
+            link, image, published = extractor(entry)
+            # Only a profile with a parseable date field promises a date
+            if link and (published is not None or not found[0]["date_format"]):
+                self._hit(source)
+            else:
+                self._missed(source)
+        if not link or published is None:
+            link = link or extract_entry_link(entry)
+            if published is None:
+                published = parse_published(entry)
+        if not link:
+            return None
+        if image is None:
+            image = extract_image_from_entry(entry) if extractor is None else _quick_image(entry)
+        if published is None:
+            published = datetime.now(timezone.utc)
+        if cutoff is not None and published < cutoff:
+            return None
+        return {
+            "url": link,
+            "title": entry.get("title", ""),
+            "description": entry.get("description", ""),
+            "image_url": image,
+            "published_at": published,
+        }
+
+
+def age_cutoff(max_age_hours: int) -> datetime:
+    """Oldest published time still ingested; computed once per cycle."""
+    return datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+
+
+normalizer = EntryNormalizer()
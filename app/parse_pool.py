@@ -0,0 +1,138 @@
+"""CPU-bound parsing stage of a scrape cycle, run in worker processes.
+
+The scraper fetches feed and article bytes on threads and hands them here:
+feed parsing (fast parser or feedparser), entry normalization, article text
+extraction with BeautifulSoup and the draft summary all run in a
+ProcessPoolExecutor, off the GIL shared with the API. Workers return plain
+dicts/lists so results pickle cheaply; no FeedParserDict crosses the
+process boundary.
+
+SCRAPE_PARSE_WORKERS sets the number of processes (default: CPU count);
+0 runs everything inline in the calling thread. Workers are started with
+forkserver (spawn where that is unavailable) rather than fork, since the
+parent is multi-threaded. A pool broken by a dead worker is replaced on the
+next submit.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+logger = logging.getLogger("app.parse_pool")
+
+SCRAPE_PARSE_WORKERS = int(os.getenv("SCRAPE_PARSE_WORKERS", str(os.cpu_count() or 1)))
+# Same cap fetch_article_text always applied, to bound summarizer/LLM input
+ARTICLE_TEXT_LIMIT = 6000
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def _pool() -> ProcessPoolExecutor | None:
+    global _POOL
+    if SCRAPE_PARSE_WORKERS <= 0:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _POOL = ProcessPoolExecutor(max_workers=SCRAPE_PARSE_WORKERS, mp_context=ctx)
+        return _POOL
+
+
+def _discard(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next submit starts a fresh one."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not pool:
+            return
+        _POOL = None
+    logger.warning("Parse pool broken (a worker died); starting a new one on next use")
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def submit(fn, *args) -> Future:
+    """Run `fn(*args)` in the pool, or inline when the pool is disabled."""
+    pool = _pool()
+    if pool is not None:
+        try:
+            fut = pool.submit(fn, *args)
+            fut.add_done_callback(
+                lambda f: _discard(pool) if isinstance(f.exception(), BrokenProcessPool) else None
+            )
+            return fut
+        except Exception as e:
+            # A broken pool (e.g. a worker killed by the OOM killer) should not stop the cycle
+            if isinstance(e, BrokenProcessPool):
+                _discard(pool)
+            logger.warning(f"Parse pool unavailable, parsing inline: {e}")
+    fut: Future = Future()
+    try:
+        fut.set_result(fn(*args))
+    except Exception as e:
+        fut.set_exception(e)
+    return fut
+
+
+# --- Worker functions (module-level so they pickle) ---
+
+def _entries(data: bytes, since: float | None, fast: bool) -> list:
+    from app import feed_parser
+    if fast:
+        try:
+            return feed_parser.parse_feed(data, since=since)
+        except feed_parser.FastParseError:
+            pass
+    import feedparser
+    return feedparser.parse(data).entries or []
+
+
+def parse_feed(data: bytes, source: str, since: float | None, cutoff: datetime, fast: bool = True) -> dict:
+    """Parse and normalize one feed.
+    Returns {"entries": raw entry count, "items": normalized dicts newer than
+    `since`, "newest": newest published timestamp seen}."""
+    from app.normalizer import normalizer
+    if not data:
+        return {"entries": 0, "items": [], "newest": None}
+    entries = _entries(data, since, fast)
+    newest = since or 0.0
+    items = []
+    for entry in entries:
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        ts = float(time.mktime(parsed)) if parsed else None
+        if since is not None and ts is not None and ts <= since:
+            continue
+        if ts is not None and ts > newest:
+            newest = ts
+        item = normalizer.normalize(source, entry, cutoff)
+        if item:
+            items.append(item)
+    return {"entries": len(entries), "items": items, "newest": newest or None}
+
+
+def article_text(content: bytes, encoding: str | None = None, limit: int | None = ARTICLE_TEXT_LIMIT) -> str:
+    """Paragraph text of an article page, capped at `limit` chars (None keeps it all)."""
+    from bs4 import BeautifulSoup
+    if not content:
+        return ""
+    soup = BeautifulSoup(content, "html.parser", from_encoding=encoding)
+    text = "\n".join(p.get_text(separator=" ", strip=True) for p in soup.find_all("p")).strip()
+    return text[:limit] if limit else text
+
+
+def extract_article(content: bytes, encoding: str | None, fallback: str) -> dict:
+    """Full article text (uncapped, for the content store), the page's
+    rel=canonical link and the local draft summary, in one worker round trip."""
+    from app import summarizer
+    from app.utils.urls import canonical_link
+    try:
+        text = article_text(content, encoding, limit=None)
+    except Exception:
+        text = ""
+    canonical = canonical_link(content) if content else None
+    summary = summarizer.summarize_text(text[:ARTICLE_TEXT_LIMIT] or fallback)
+    return {"text": text, "canonical": canonical, "summary": summary}
@@ -0,0 +1,95 @@
+"""Bulk pre-translation of recent summaries into the other supported languages.
+
+Missing (article, language) pairs are found with one query, translated in
+per-language batches (languages run concurrently and share one rate
+limiter) and written back with one upsert per language.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from app.crud import SUPPORTED_LANGS, bulk_set_summaries
+from app.models import News, NewsSummary
+from app.translation import translate_many
+from app.utils.ratelimit import TokenBucket
+
+logger = logging.getLogger("app.pretranslate")
+
+PRETRANSLATE_BATCH = int(os.getenv("PRETRANSLATE_BATCH", "32"))
+# Texts per second across all languages, shared so concurrent languages do not trip provider quotas
+PRETRANSLATE_RATE = float(os.getenv("PRETRANSLATE_RATE", "5"))
+PRETRANSLATE_BURST = float(os.getenv("PRETRANSLATE_BURST", "32"))
+
+_LIMITER = TokenBucket(PRETRANSLATE_RATE, PRETRANSLATE_BURST)
+
+
+def parse_langs(langs: str) -> list[str]:
+    targets = [l.strip().lower() for l in (langs or "").split(",") if l.strip()]
+    return [l for l in dict.fromkeys(targets) if l in SUPPORTED_LANGS and l != "ta"]
+
+
+def find_missing(db: Session, targets: list[str], limit: int) -> tuple[int, dict[str, list[tuple[int, str]]]]:
+    """Return (items considered, {lang: [(news_id, source text)]}) for the latest `limit` items."""
+    recent = (
+        db.query(News.id, News.summary, News.description, News.title)
+          .order_by(News.created_at.desc().nullslast(), News.id.desc())
+          .limit(limit)
+          .subquery()
+    )
+    rows = (
+        db.query(recent.c.id, recent.c.summary, recent.c.description, recent.c.title, NewsSummary.lang)
+          .outerjoin(NewsSummary, and_(NewsSummary.news_id == recent.c.id, NewsSummary.lang.in_(targets)))
+          .all()
+    )
+    sources: dict[int, str] = {}
+    have: dict[int, set] = {}
+    for nid, summary, description, title, lang in rows:
+        sources[nid] = (summary or description or title or "").strip()
+        if lang:
+            have.setdefault(nid, set()).add(lang)
+    missing: dict[str, list[tuple[int, str]]] = {lang: [] for lang in targets}
+    for nid, src in sources.items():
+        if not src:
+            continue
+        for lang in targets:
+            if lang not in have.get(nid, ()):
+                missing[lang].append((nid, src))
+    return len(sources), missing
+
+
+def _translate_lang(lang: str, pairs: list[tuple[int, str]]) -> list[dict]:
+    out = []
+    for start in range(0, len(pairs), PRETRANSLATE_BATCH):
+        batch = pairs[start:start + PRETRANSLATE_BATCH]
+        _LIMITER.acquire(len(batch))
+        results = translate_many([src for _, src in batch], lang)
+        out.extend(
+            {"news_id": nid, "lang": lang, "text": tx, "backend": "translate"}
+            for (nid, _), tx in zip(batch, results) if tx
+        )
+    return out
+
+
+def pretranslate(db: Session, targets: list[str], limit: int = 30) -> dict:
+    """Translate every missing (item, lang) pair among the latest `limit` items."""
+    if not targets:
+        return {"updated": 0, "count": 0, "langs": targets}
+    count, missing = find_missing(db, targets, limit)
+    work = {lang: pairs for lang, pairs in missing.items() if pairs}
+    updated = 0
+    if work:
+        with ThreadPoolExecutor(max_workers=len(work), thread_name_prefix="pretranslate") as pool:
+            futures = {pool.submit(_translate_lang, lang, pairs): lang for lang, pairs in work.items()}
+            # Write each language back as soon as it is done; the session stays on this thread
+            for f in as_completed(futures):
+                lang = futures[f]
+                try:
+                    rows = f.result()
+                    updated += bulk_set_summaries(db, rows)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Pretranslation into {lang} failed: {e}")
+    logger.info(f"Pretranslated {updated} summaries across {len(work)} language(s).")
+    return {"updated": updated, "count": count, "langs": targets}
@@ -0,0 +1,186 @@
+"""On-demand profiling of scrape cycles and API requests.
+
+Nothing is recorded until an admin arms a target through /admin/profiles:
+    scrape - the next N fetch_tamil_news_once runs
+    api    - a sampled fraction of GET /news/ requests, up to N profiles
+Two modes are available: "cprofile" (deterministic, saved as .pstats) and
+"sample" (a stack sampler thread, saved as speedscope JSON). When no target
+is armed, the hooks cost one dict lookup.
+"""
+import cProfile
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger("app.profiling")
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(".cache", "profiles"))
+SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+MODES = ("cprofile", "sample")
+TARGETS = ("scrape", "api")
+
+# target -> {"remaining": int, "mode": str, "fraction": float}
+_ARMED: dict[str, dict] = {}
+_LOCK = threading.Lock()
+
+
+def arm(target: str, runs: int, mode: str = "cprofile", fraction: float = 1.0) -> dict:
+    if target not in TARGETS:
+        raise ValueError(f"target must be one of {TARGETS}")
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    with _LOCK:
+        if runs <= 0:
+            _ARMED.pop(target, None)
+            return {}
+        _ARMED[target] = {"remaining": runs, "mode": mode, "fraction": max(0.0, min(1.0, fraction))}
+        return dict(_ARMED[target])
+
+
+def armed() -> dict:
+    with _LOCK:
+        return {k: dict(v) for k, v in _ARMED.items()}
+
+
+def _claim(target: str) -> str | None:
+    """Take one run from the target's budget; returns the mode or None if not profiling this run."""
+    cfg = _ARMED.get(target)
+    if not cfg:
+        return None
+    if cfg["fraction"] < 1.0 and random.random() >= cfg["fraction"]:
+        return None
+    with _LOCK:
+        cfg = _ARMED.get(target)
+        if not cfg:
+            return None
+        cfg["remaining"] -= 1
+        if cfg["remaining"] <= 0:
+            _ARMED.pop(target, None)
+        return cfg["mode"]
+
+
+class _StackSampler:
+    """Samples one thread's Python stack every SAMPLE_INTERVAL_MS."""
+
+    def __init__(self, thread_id: int):
+        self.thread_id = thread_id
+        self.samples: list[tuple] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        interval = SAMPLE_INTERVAL_MS / 1000.0
+        while not self._stop.wait(interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.samples.append(tuple(reversed(stack)))
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def speedscope(self, name: str) -> dict:
+        frames: list[dict] = []
+        index: dict[tuple, int] = {}
+        samples = []
+        for stack in self.samples:
+            ids = []
+            for fr in stack:
+                if fr not in index:
+                    index[fr] = len(frames)
+                    frames.append({"name": fr[0], "file": fr[1], "line": fr[2]})
+                ids.append(index[fr])
+            samples.append(ids)
+        weight = SAMPLE_INTERVAL_MS
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": weight * len(samples),
+                "samples": samples,
+                "weights": [weight] * len(samples),
+            }],
+            "name": name,
+            "exporter": "tamil-news-aggregator",
+        }
+
+
+def _save(target: str, mode: str, writer) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S.%f")
+    ext = "pstats" if mode == "cprofile" else "speedscope.json"
+    path = os.path.join(PROFILE_DIR, f"{target}-{stamp}.{ext}")
+    writer(path)
+    logger.info(f"Saved {mode} profile {path}")
+    return path
+
+
+@contextmanager
+def maybe_profile(target: str):
+    """Profile the enclosed block if `target` is armed; otherwise a no-op."""
+    mode = _claim(target) if _ARMED else None
+    if mode is None:
+        yield
+        return
+    started = time.perf_counter()
+    if mode == "cprofile":
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            _save(target, mode, prof.dump_stats)
+    else:
+        sampler = _StackSampler(threading.get_ident())
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            name = f"{target} ({(time.perf_counter() - started) * 1000:.0f} ms)"
+
+            def write(path):
+                with open(path, "w") as f:
+                    json.dump(sampler.speedscope(name), f)
+            _save(target, mode, write)
+
+
+def list_profiles() -> list[dict]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    out = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        st = os.stat(os.path.join(PROFILE_DIR, name))
+        out.append({
+            "name": name,
+            "bytes": st.st_size,
+            "created_at": datetime.utcfromtimestamp(st.st_mtime).isoformat() + "Z",
+        })
+    return out
+
+
+def profile_path(name: str) -> str | None:
+    """Path of a stored profile, refusing anything outside PROFILE_DIR."""
+    if os.path.basename(name) != name:
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
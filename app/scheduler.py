@@ -1,15 +1,58 @@
-from apscheduler.schedulers.background import BackgroundScheduler
 from app.database import SessionLocal
-from app.tamil_scraper import fetch_tamil_news_once
+from app.pretranslate import parse_langs, pretranslate
 import logging
 import os
 
 logger = logging.getLogger("tamil_news_scheduler")
 
+# Languages to pre-translate new articles into right after each ingest, e.g. "en,hi"; empty disables
+PRETRANSLATE_LANGS = os.getenv("PRETRANSLATE_LANGS", "")
+PRETRANSLATE_LIMIT = int(os.getenv("PRETRANSLATE_LIMIT", "50"))
+
+def _schedule_minutes() -> int:
+    try:
+        return max(1, int(os.getenv("SCHEDULE_MINUTES", "1")))
+    except Exception:
+        return 1
+
 def job():
+    # Imported here so API-only workers never load the scraping/LLM stack
+    from app.tamil_scraper import RSS_FEEDS, fetch_tamil_news_once
+    from app import sharding
+    db = SessionLocal()
+    try:
+        if sharding.SCRAPER_SHARDING:
+            # Only poll the feeds this node owns and could lease for this interval
+            sources = sharding.claim_feeds(db, list(RSS_FEEDS), _schedule_minutes() * 60)
+            try:
+                if sources:
+                    fetch_tamil_news_once(db, sources)
+            finally:
+                sharding.release(db, sources)
+        else:
+            fetch_tamil_news_once(db)
+        targets = parse_langs(PRETRANSLATE_LANGS)
+        if targets:
+            pretranslate(db, targets, limit=PRETRANSLATE_LIMIT)
+    finally:
+        db.close()
+
+def archive_job():
+    from app.archive import archive_old_months, ensure_partitioning
+    try:
+        ensure_partitioning()
+        archive_old_months()
+    except Exception as e:
+        logger.error(f"❌ Archival failed: {e}")
+
+def stats_job():
+    from app import stats
     db = SessionLocal()
     try:
-        fetch_tamil_news_once(db)
+        stats.reconcile(db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Stats reconcile failed: {e}")
     finally:
         db.close()
 
@@ -18,12 +61,8 @@ def start_scheduler():
     if not enable:
         logger.info("⏸️ Scheduler disabled via ENABLE_SCHEDULER=0")
         return
-    try:
-        minutes = int(os.getenv("SCHEDULE_MINUTES", "1"))
-        if minutes < 1:
-            minutes = 1
-    except Exception:
-        minutes = 1
+    minutes = _schedule_minutes()
+    from apscheduler.schedulers.background import BackgroundScheduler
     scheduler = BackgroundScheduler()
     scheduler.add_job(
         job,
@@ -33,5 +72,32 @@ def start_scheduler():
         max_instances=1,
         coalesce=True,
     )
+    scheduler.add_job(
+        archive_job,
+        "interval",
+        hours=24,
+        id="archive_old_months",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        stats_job,
+        "interval",
+        minutes=int(os.getenv("STATS_RECONCILE_MINUTES", "60")),
+        id="reconcile_stats",
+        max_instances=1,
+        coalesce=True,
+    )
+    from app import sharding
+    if sharding.SCRAPER_SHARDING:
+        # Liveness on its own timer; a long scrape cycle or interval must not expire the node
+        scheduler.add_job(
+            sharding.heartbeat_job,
+            "interval",
+            seconds=sharding.HEARTBEAT_SECONDS,
+            id="scraper_heartbeat",
+            max_instances=1,
+            coalesce=True,
+        )
     scheduler.start()
     logger.info(f"✅ Tamil News Scheduler started — running every {minutes} minute(s).")
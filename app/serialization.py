@@ -0,0 +1,82 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from fastapi import Response
+
+# orjson is optional; fall back to the stdlib encoder when it is not installed
+try:
+    import orjson  # type: ignore
+    _ORJSON_AVAILABLE = True
+except Exception as _e:
+    logging.getLogger("app.serialization").info(f"orjson not available, using stdlib json: {_e}")
+    orjson = None  # type: ignore
+    _ORJSON_AVAILABLE = False
+
+# Field order of a news item as returned by the list endpoint (matches NewsResponse)
+NEWS_FIELDS = (
+    "id", "title", "description", "url", "source", "summary",
+    "image_url", "language", "published_at", "created_at",
+)
+
+# Encoded JSON object per (news_id, lang); each entry remembers the marker it was built from
+_FRAGMENTS: "OrderedDict[tuple, tuple[object, bytes]]" = OrderedDict()
+_FRAGMENTS_MAX = 5000
+_LOCK = threading.Lock()
+
+
+def _stdlib_default(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat().replace("+00:00", "Z")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """Encode to UTF-8 JSON bytes; naive datetimes are treated as UTC."""
+    if _ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_stdlib_default).encode("utf-8")
+
+
+def fragment(key: tuple, marker, item: dict) -> bytes:
+    """Return the encoded JSON object for `item`, reusing the cached bytes while
+    `marker` (the row's update markers) is unchanged."""
+    with _LOCK:
+        hit = _FRAGMENTS.get(key)
+        if hit is not None and hit[0] == marker:
+            _FRAGMENTS.move_to_end(key)
+            return hit[1]
+    data = dumps(item)
+    with _LOCK:
+        _FRAGMENTS[key] = (marker, data)
+        _FRAGMENTS.move_to_end(key)
+        while len(_FRAGMENTS) > _FRAGMENTS_MAX:
+            _FRAGMENTS.popitem(last=False)
+    return data
+
+
+def parse_fields(value: str | None) -> tuple[str, ...] | None:
+    """Validated `fields=` selection in NEWS_FIELDS order (id always included);
+    None means every field. Raises ValueError on unknown names."""
+    if not value:
+        return None
+    wanted = {f.strip() for f in value.split(",") if f.strip()}
+    unknown = wanted - set(NEWS_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    wanted.add("id")
+    return tuple(f for f in NEWS_FIELDS if f in wanted)
+
+
+def compact_response(fields, items) -> Response:
+    """Columnar encoding: field names once, then one value array per item."""
+    body = {"fields": list(fields), "items": [[item.get(f) for f in fields] for item in items]}
+    return Response(content=dumps(body), media_type="application/json")
+
+
+def json_array_response(fragments) -> Response:
+    """Join pre-encoded JSON objects into a JSON array response."""
+    return Response(content=b"[" + b",".join(fragments) + b"]", media_type="application/json")
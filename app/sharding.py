@@ -0,0 +1,174 @@
+"""Sharded scraping: several scraper nodes split RSS_FEEDS between them.
+
+Each node heartbeats into scraper_node. Sources are mapped to the live nodes
+with a consistent-hash ring (virtual nodes), so a join or a death only moves
+the sources adjacent to that node. The ring only decides who *tries*; the
+actual guarantee comes from feed_lease: a node polls a source only after a
+conditional UPDATE that succeeds when the source is unleased (or its lease
+expired) and was not polled within the current interval. Two nodes with a
+momentarily different view of the ring can therefore never poll the same
+feed twice in one interval.
+
+Heartbeats run on their own timer (every SCRAPER_HEARTBEAT_SECONDS), not
+once per scrape cycle, so node liveness does not depend on the scrape
+interval or on how long a cycle takes.
+
+Timestamps come from each node's clock (UTC); keep nodes NTP-synced.
+"""
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from app.crud import _dialect_insert
+from app.models import FeedLease, ScraperNode
+
+logger = logging.getLogger("app.sharding")
+
+SCRAPER_SHARDING = os.getenv("SCRAPER_SHARDING", "0") == "1"
+NODE_ID = os.getenv("SCRAPER_NODE_ID") or f"{socket.gethostname()}-{os.getpid()}"
+HEARTBEAT_SECONDS = int(os.getenv("SCRAPER_HEARTBEAT_SECONDS", "30"))
+# A node whose last heartbeat is older than this is considered dead
+NODE_TTL_SECONDS = int(os.getenv("SCRAPER_NODE_TTL_SECONDS", str(3 * HEARTBEAT_SECONDS)))
+# Upper bound on one poll; a crashed node's lease frees up after this
+LEASE_SECONDS = int(os.getenv("SCRAPER_LEASE_SECONDS", "300"))
+VIRTUAL_NODES = 64
+# Tolerance so a poll that finished a little late does not push the next one a whole interval
+CLOCK_SLACK_SECONDS = 5
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    def __init__(self, nodes: list[str], replicas: int = VIRTUAL_NODES):
+        points = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self._keys = [p for p, _ in points]
+        self._nodes = [n for _, n in points]
+
+    def owner(self, key: str) -> str | None:
+        if not self._keys:
+            return None
+        i = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[i]
+
+
+def heartbeat(db: Session, node_id: str = NODE_ID) -> None:
+    now = datetime.utcnow()
+    node = db.get(ScraperNode, node_id)
+    if node is None:
+        db.add(ScraperNode(node_id=node_id, started_at=now, heartbeat_at=now))
+    else:
+        node.heartbeat_at = now
+    db.commit()
+
+
+def heartbeat_job(node_id: str = NODE_ID) -> None:
+    """One heartbeat on a session of its own (scheduler job / heartbeat thread)."""
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        heartbeat(db, node_id)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Heartbeat for node {node_id} failed: {e}")
+    finally:
+        db.close()
+
+
+def start_heartbeats(node_id: str = NODE_ID) -> threading.Event:
+    """Heartbeat every HEARTBEAT_SECONDS on a daemon thread, for processes
+    without the APScheduler scheduler. Set the returned event to stop."""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(HEARTBEAT_SECONDS):
+            heartbeat_job(node_id)
+
+    threading.Thread(target=run, name="scraper-heartbeat", daemon=True).start()
+    return stop
+
+
+def leave(db: Session, node_id: str = NODE_ID) -> None:
+    """Drop out of the ring and free this node's leases (clean shutdown)."""
+    db.query(ScraperNode).filter(ScraperNode.node_id == node_id).delete(synchronize_session=False)
+    db.execute(
+        update(FeedLease).where(FeedLease.node_id == node_id).values(leased_until=None)
+    )
+    db.commit()
+
+
+def live_nodes(db: Session) -> list[str]:
+    since = datetime.utcnow() - timedelta(seconds=NODE_TTL_SECONDS)
+    return [n for (n,) in db.query(ScraperNode.node_id).filter(ScraperNode.heartbeat_at >= since)]
+
+
+def _ensure_leases(db: Session, sources: list[str]) -> None:
+    insert = _dialect_insert(db)
+    if insert is not None:
+        db.execute(insert(FeedLease).values([{"source": s} for s in sources]).on_conflict_do_nothing())
+    else:
+        known = {s for (s,) in db.query(FeedLease.source).filter(FeedLease.source.in_(sources))}
+        db.add_all(FeedLease(source=s) for s in sources if s not in known)
+    db.commit()
+
+
+def claim(db: Session, source: str, interval_seconds: int, node_id: str = NODE_ID) -> bool:
+    """Take the lease on `source` unless another node holds it or it was polled this interval."""
+    now = datetime.utcnow()
+    result = db.execute(
+        update(FeedLease)
+        .where(
+            FeedLease.source == source,
+            or_(FeedLease.leased_until.is_(None), FeedLease.leased_until < now),
+            or_(
+                FeedLease.last_polled_at.is_(None),
+                FeedLease.last_polled_at <= now - timedelta(seconds=max(0, interval_seconds - CLOCK_SLACK_SECONDS)),
+            ),
+        )
+        .values(node_id=node_id, leased_until=now + timedelta(seconds=LEASE_SECONDS), last_polled_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def claim_feeds(db: Session, sources: list[str], interval_seconds: int, node_id: str = NODE_ID) -> list[str]:
+    """Heartbeat, then claim the sources this node owns on the ring of live nodes."""
+    heartbeat(db, node_id)
+    _ensure_leases(db, sources)
+    ring = HashRing(live_nodes(db) or [node_id])
+    owned = [s for s in sources if ring.owner(s) == node_id]
+    claimed = [s for s in owned if claim(db, s, interval_seconds, node_id)]
+    logger.info(f"🔀 Node {node_id}: owns {len(owned)}/{len(sources)} feeds, claimed {len(claimed)}")
+    return claimed
+
+
+def release(db: Session, sources: list[str], node_id: str = NODE_ID) -> None:
+    """End the leases after polling; last_polled_at keeps the interval guard in place."""
+    if not sources:
+        return
+    db.execute(
+        update(FeedLease)
+        .where(FeedLease.source.in_(sources), FeedLease.node_id == node_id)
+        .values(leased_until=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def lease_table(db: Session) -> list[dict]:
+    return [
+        {
+            "source": l.source,
+            "node_id": l.node_id,
+            "leased_until": l.leased_until,
+            "last_polled_at": l.last_polled_at,
+        }
+        for l in db.query(FeedLease).order_by(FeedLease.source)
+    ]
@@ -0,0 +1,135 @@
+"""Incrementally maintained ingest and translation statistics.
+
+store_news_in_db and bulk_set_summaries bump small aggregate tables in the
+same transaction as the rows they write, so /admin/stats reads a handful of
+rows instead of scanning news. Translation counts are bumped only for
+summaries that were inserted, not for overwrites; reconcile() recomputes
+everything from the base tables to correct any drift and runs periodically
+from the scheduler.
+"""
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+from app.models import IngestHourly, News, NewsSummary, SourceStats, TranslationStats
+
+logger = logging.getLogger("app.stats")
+
+# Hourly ingest buckets kept (and reported); older ones are dropped on reconcile
+STATS_HOURLY_RETENTION_HOURS = int(os.getenv("STATS_HOURLY_RETENTION_HOURS", "168"))
+
+
+def _hour(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert_add(db: Session, model, keys: list[str], rows: list[dict], add: str, latest: str | None = None) -> None:
+    """Insert rows or add their `add` column onto existing ones (and keep the max of `latest`)."""
+    from app.crud import _dialect_insert
+    insert = _dialect_insert(db)
+    if insert is None:
+        for r in rows:
+            obj = db.get(model, tuple(r[k] for k in keys))
+            if obj is None:
+                db.add(model(**r))
+                continue
+            setattr(obj, add, (getattr(obj, add) or 0) + r[add])
+            if latest and r.get(latest) and (getattr(obj, latest) is None or r[latest] > getattr(obj, latest)):
+                setattr(obj, latest, r[latest])
+        return
+    stmt = insert(model)
+    col = getattr(model, add)
+    set_ = {add: col + stmt.excluded[add]}
+    if latest:
+        lcol = getattr(model, latest)
+        set_[latest] = func.coalesce(
+            func.max(lcol, stmt.excluded[latest]) if db.get_bind().dialect.name == "sqlite"
+            else func.greatest(lcol, stmt.excluded[latest]),
+            stmt.excluded[latest],
+        )
+    db.execute(stmt.on_conflict_do_update(index_elements=[getattr(model, k) for k in keys], set_=set_), rows)
+
+
+def record_ingest(db: Session, articles: list[tuple[str, datetime]]) -> None:
+    """Count newly inserted (source, created_at) pairs. Caller commits."""
+    if not articles:
+        return
+    per_source = Counter(src for src, _ in articles)
+    last = {}
+    per_hour = Counter()
+    for src, created in articles:
+        created = created or datetime.utcnow()
+        last[src] = max(last.get(src, created), created)
+        per_hour[(_hour(created), src)] += 1
+    _upsert_add(
+        db, SourceStats, ["source"],
+        [{"source": s, "total": n, "last_ingest_at": last[s]} for s, n in per_source.items()],
+        "total", latest="last_ingest_at",
+    )
+    _upsert_add(
+        db, IngestHourly, ["hour", "source"],
+        [{"hour": h, "source": s, "count": n} for (h, s), n in per_hour.items()],
+        "count",
+    )
+
+
+def record_translations(db: Session, langs: list[str]) -> None:
+    """Count stored translations by language. Caller commits."""
+    if not langs:
+        return
+    _upsert_add(
+        db, TranslationStats, ["lang"],
+        [{"lang": l, "total": n} for l, n in Counter(langs).items()],
+        "total",
+    )
+
+
+def stats(db: Session, hours: int = 24) -> dict:
+    sources = db.query(SourceStats).order_by(SourceStats.total.desc()).all()
+    total = sum(s.total for s in sources)
+    since = _hour(datetime.utcnow()) - timedelta(hours=max(0, hours - 1))
+    hourly: dict[datetime, dict[str, int]] = {}
+    for row in db.query(IngestHourly).filter(IngestHourly.hour >= since).order_by(IngestHourly.hour):
+        hourly.setdefault(row.hour, {})[row.source] = row.count
+    translations = db.query(TranslationStats).order_by(TranslationStats.lang).all()
+    return {
+        "total": total,
+        "last_ingest_at": max((s.last_ingest_at for s in sources if s.last_ingest_at), default=None),
+        "sources": [
+            {"source": s.source, "total": s.total, "last_ingest_at": s.last_ingest_at} for s in sources
+        ],
+        "hourly": [
+            {"hour": h, "total": sum(by_src.values()), "sources": by_src} for h, by_src in hourly.items()
+        ],
+        "translations": [
+            {"lang": t.lang, "total": t.total, "coverage": round(t.total / total, 4) if total else 0.0}
+            for t in translations
+        ],
+    }
+
+
+def reconcile(db: Session) -> dict:
+    """Recompute all aggregates from news and news_summary (one GROUP BY each)."""
+    sources = db.query(News.source, func.count(News.id), func.max(News.created_at)).group_by(News.source).all()
+    since = _hour(datetime.utcnow()) - timedelta(hours=STATS_HOURLY_RETENTION_HOURS)
+    per_hour = Counter()
+    for src, created in db.query(News.source, News.created_at).filter(News.created_at >= since):
+        per_hour[(_hour(created), src)] += 1
+    langs = db.query(NewsSummary.lang, func.count()).group_by(NewsSummary.lang).all()
+    db.execute(delete(SourceStats))
+    db.execute(delete(IngestHourly))
+    db.execute(delete(TranslationStats))
+    db.add_all(SourceStats(source=s, total=n, last_ingest_at=last) for s, n, last in sources)
+    db.add_all(IngestHourly(hour=h, source=s, count=n) for (h, s), n in per_hour.items())
+    db.add_all(TranslationStats(lang=l, total=n) for l, n in langs)
+    db.commit()
+    logger.info(f"📊 Stats reconciled: {len(sources)} sources, {len(per_hour)} hourly buckets, {len(langs)} languages")
+    return {"sources": len(sources), "hourly_buckets": len(per_hour), "languages": len(langs)}
+
+
+def seed_if_empty(db: Session) -> None:
+    """Build the aggregates once for databases that predate them."""
+    if db.query(SourceStats.source).first() is None and db.query(News.id).first() is not None:
+        reconcile(db)
@@ -1,20 +1,20 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import feedparser
-from datetime import datetime, timedelta
+from datetime import datetime
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.models import News
+from app.models import News, SummaryCache
+from app import content_store, feed_parser, hot_index, image_resolver, parse_pool, profiling, stats, summarizer, translation, trending
+from app.normalizer import age_cutoff, extract_entry_link, extract_image_from_entry, normalizer
+from app.utils.http import DEFAULT_HEADERS, referer_headers
+from app.utils.urls import canonicalize
 import logging
 import os
 import time
+from urllib.parse import urljoin
 import requests
-from bs4 import BeautifulSoup
-from email.utils import parsedate_to_datetime
-import html as _html
-try:
-    from zoneinfo import ZoneInfo  # Python 3.9+
-except Exception:
-    ZoneInfo = None  # type: ignore
 # Gemini SDK is optional; handle import issues gracefully
 try:
     from google import genai  # type: ignore
@@ -26,13 +26,6 @@ except Exception as _e:
     types = None  # type: ignore
     _GENAI_AVAILABLE = False
 
-try:
-    from deep_translator import GoogleTranslator as _DTGoogleTranslator  # type: ignore
-    _DEEP_AVAILABLE = True
-except Exception:
-    _DTGoogleTranslator = None  # type: ignore
-    _DEEP_AVAILABLE = False
-
 # ✅ Set up logging
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s: %(message)s")
 logger = logging.getLogger("tamil_scraper")
@@ -43,11 +36,17 @@ GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 ENABLE_URL_CONTEXT = os.getenv("ENABLE_URL_CONTEXT", "0") == "1"
 ENABLE_GOOGLE_SEARCH = os.getenv("ENABLE_GOOGLE_SEARCH", "0") == "1"
 MAX_ENTRY_AGE_HOURS = int(os.getenv("MAX_ENTRY_AGE_HOURS", "48"))
+# Parse well-formed feeds with the streaming parser; feedparser remains the fallback
+FAST_FEED_PARSER = os.getenv("FAST_FEED_PARSER", "1") == "1"
+# Threads for feed/article downloads; parsing itself runs in app.parse_pool
+SCRAPE_FETCH_THREADS = int(os.getenv("SCRAPE_FETCH_THREADS", "8"))
 # If GEMINI_API_KEY is provided but GOOGLE_API_KEY is not, set it for the SDK
 if os.getenv("GEMINI_API_KEY") and not os.getenv("GOOGLE_API_KEY"):
     os.environ["GOOGLE_API_KEY"] = os.getenv("GEMINI_API_KEY") or ""
 # Track temporary quota lockout (epoch seconds); skip summarization until this time
 _QUOTA_EXHAUSTED_UNTIL = 0.0
+# Consecutive articles without a Gemini summary before upgrade_summaries stops asking
+UPGRADE_MAX_MISSES = int(os.getenv("UPGRADE_MAX_MISSES", "3"))
 
 # ✅ All RSS Feeds (Tamil News)
 RSS_FEEDS_ALL = {
@@ -121,11 +120,6 @@ RSS_FEEDS = {
 # In-memory tracker for last seen published time per feed URL (epoch seconds)
 LAST_PUBDATE: dict[str, float] = {}
 
-DEFAULT_HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
-    "Accept-Language": "ta,en;q=0.8",
-}
-
 # Some sites aggressively block scraping; use RSS description only
 SOURCE_FETCH_POLICY = {
     "OneIndia Tamil": {"rss_only": True},
@@ -147,73 +141,6 @@ SOURCE_FETCH_POLICY = {
 ALLOW_ENGLISH_SOURCES = set()
 
 
-def extract_image_from_entry(entry):
-    try:
-        media = entry.get('media_content') or entry.get('media_thumbnail')
-        if isinstance(media, list) and media:
-            url = media[0].get('url') or media[0].get('href')
-            if url:
-                return url
-        if isinstance(media, dict):
-            url = media.get('url') or media.get('href')
-            if url:
-                return url
-    except Exception:
-        pass
-    enclosure = entry.get('enclosures') or entry.get('enclosure')
-    if isinstance(enclosure, list) and enclosure:
-        href = enclosure[0].get('href') or enclosure[0].get('url')
-        if href:
-            return href
-    if isinstance(enclosure, dict):
-        href = enclosure.get('href') or enclosure.get('url')
-        if href:
-            return href
-    html_source = None
-    if entry.get('content') and isinstance(entry['content'], list) and entry['content']:
-        html_source = entry['content'][0].get('value')
-    elif entry.get('summary_detail') and entry['summary_detail'].get('value'):
-        html_source = entry['summary_detail']['value']
-    elif entry.get('summary'):
-        html_source = entry.get('summary')
-    if html_source:
-        try:
-            soup = BeautifulSoup(html_source, 'html.parser')
-            img = soup.find('img')
-            if img and img.get('src'):
-                return img.get('src')
-        except Exception:
-            pass
-    return None
-
-
-def extract_entry_link(entry):
-    # Prefer standard 'link'
-    link = entry.get("link")
-    if link:
-        return str(link).strip()
-    # Some feeds provide a list of link objects
-    links = entry.get("links")
-    if isinstance(links, list) and links:
-        first = links[0]
-        if isinstance(first, dict):
-            href = first.get("href") or first.get("url")
-            if href:
-                return str(href).strip()
-        elif isinstance(first, str) and first:
-            return first.strip()
-    # Fallbacks commonly used in RSS/Atom
-    for k in ("id", "guid", "url", "href"):
-        v = entry.get(k)
-        if isinstance(v, str) and v.strip():
-            return v.strip()
-        if isinstance(v, dict):
-            href = v.get("href") or v.get("url")
-            if href:
-                return str(href).strip()
-    return ""
-
-
 def looks_tamil(text: str) -> bool:
     try:
         # Heuristic: ensure sufficient Tamil chars and low Latin ratio
@@ -246,62 +173,10 @@ def translate_to_tamil(text: str) -> str:
 
 
 def translate_text(text: str, target_lang: str) -> str:
-    """Translate arbitrary text to the target language code.
-    Supported: ta (Tamil), en (English), hi (Hindi), kn (Kannada), ml (Malayalam), te (Telugu)
+    """Translate arbitrary text to the target language code via the provider router.
     Returns empty string on failure.
     """
-    target_lang = (target_lang or "").lower().strip()
-    lang_map = {
-        "ta": "Tamil",
-        "en": "English",
-        "hi": "Hindi",
-        "kn": "Kannada",
-        "ml": "Malayalam",
-        "te": "Telugu",
-    }
-    if target_lang not in lang_map:
-        return ""
-    if _DEEP_AVAILABLE:
-        try:
-            out = _DTGoogleTranslator(source='auto', target=target_lang).translate(text)
-            if isinstance(out, str) and out.strip():
-                return out.strip()
-        except Exception:
-            pass
-    api_key = os.getenv("GOOGLE_TRANSLATE_API_KEY", "").strip()
-    if api_key:
-        try:
-            url = "https://translation.googleapis.com/language/translate/v2"
-            payload = {
-                "q": text,
-                "target": target_lang,
-                "format": "text",
-                "model": "nmt",
-                "key": api_key,
-            }
-            r = requests.post(url, data=payload, timeout=10)
-            if r.ok:
-                j = r.json()
-                tr_list = ((j or {}).get("data") or {}).get("translations") or []
-                if tr_list:
-                    out = tr_list[0].get("translatedText") or ""
-                    return _html.unescape(out).strip()
-        except Exception:
-            pass
-    if not _GENAI_AVAILABLE:
-        return ""
-    try:
-        client = genai.Client()
-        prompt = (
-            f"Translate the following text into {lang_map[target_lang]} only. "
-            f"Return strictly plain {lang_map[target_lang]} with no extra notes, labels, or explanations.\n\n"
-            f"Text:\n{text}"
-        )
-        resp = client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-        out = resp.text.strip() if resp and hasattr(resp, 'text') else ""
-        return out
-    except Exception:
-        return ""
+    return translation.translate_text(text, target_lang)
 
 def filter_to_tamil(text: str) -> str:
     """Best-effort: keep Tamil letters, whitespace, digits and common punctuation.
@@ -318,42 +193,31 @@ def filter_to_tamil(text: str) -> str:
 
 
 def extract_image_from_article(url):
-    try:
-        headers = dict(DEFAULT_HEADERS)
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        headers["Referer"] = f"{parsed.scheme}://{parsed.netloc}/"
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        # Prefer OpenGraph image
-        og = soup.find('meta', attrs={'property': 'og:image'})
-        if og and og.get('content'):
-            return og.get('content')
-        tw = soup.find('meta', attrs={'name': 'twitter:image'})
-        if tw and tw.get('content'):
-            return tw.get('content')
-        # Fallback first <img>
-        img = soup.find('img')
-        if img and img.get('src'):
-            return img.get('src')
-    except Exception as e:
-        logger.debug(f"Image extract failed for {url}: {e}")
-    return None
+    """Preview image of an article page, read from the page head only."""
+    return image_resolver.resolve(url)
 
 
-def fetch_rss_feed(url):
-    """Fetch RSS feed and return parsed entries"""
+def fetch_rss_feed(url, since: float | None = None):
+    """Fetch RSS feed and return parsed entries.
+    Well-formed feeds go through the fast streaming parser, which stops at
+    items older than `since`; anything else falls back to feedparser."""
     try:
         resp = requests.get(url, headers=DEFAULT_HEADERS, timeout=10)
         ct = resp.headers.get("Content-Type", "")
         if not resp.ok:
             logger.warning(f"⚠️ RSS HTTP {resp.status_code} for {url} ({ct})")
         data = resp.content if resp.ok else b""
-        feed = feedparser.parse(data or url)
-        if not feed.entries:
+        entries = None
+        if data and FAST_FEED_PARSER:
+            try:
+                entries = feed_parser.parse_feed(data, since=since)
+            except feed_parser.FastParseError as e:
+                logger.debug(f"Fast parser declined {url}, using feedparser: {e}")
+        if entries is None:
+            entries = feedparser.parse(data or url).entries or []
+        if not entries:
             logger.warning(f"⚠️ No entries found for {url} (content-type: {ct})")
-        return feed.entries or []
+        return entries
     except Exception as e:
         logger.error(f"❌ Error fetching {url}: {e}")
         return []
@@ -362,39 +226,29 @@ def fetch_rss_feed(url):
 def store_news_in_db(news_items, db: Session):
     """Insert/update Tamil news items into PostgreSQL database"""
     upserted_count = 0
+    touched = []
+    created = []
     try:
         for item in news_items:
-            existing = db.query(News).filter(News.url == item["url"]).first()
+            canonical = item.get("canonical_url") or canonicalize(item["url"])
+            existing = (
+                db.query(News)
+                  .filter(or_(News.canonical_url == canonical, News.url == item["url"]))
+                  .first()
+            )
             if existing:
                 changed = False
+                if not existing.canonical_url:
+                    existing.canonical_url = canonical
                 # Refresh summary if a new non-empty one is provided OR
                 # if the existing summary is non-Tamil (allow clearing to empty)
                 new_sum = item.get("summary", "")
                 old_sum = existing.summary or ""
-                if (new_sum != old_sum) and (new_sum or (old_sum and not looks_tamil(old_sum))):
+                # A local draft never replaces a Tamil summary already stored (it may be Gemini's)
+                keep_old = item.get("summary_draft") and old_sum and looks_tamil(old_sum)
+                if not keep_old and (new_sum != old_sum) and (new_sum or (old_sum and not looks_tamil(old_sum))):
                     existing.summary = new_sum
-                    try:
-                        # Keep dedicated Tamil column in sync
-                        existing.summary_ta = new_sum or existing.summary_ta
-                    except Exception:
-                        pass
                     changed = True
-                # Ensure summaries JSON has Tamil copy
-                try:
-                    if new_sum:
-                        s = existing.summaries or {}
-                        if not isinstance(s, dict):
-                            s = {}
-                        if s.get("ta") != new_sum:
-                            s["ta"] = new_sum
-                            existing.summaries = s
-                            try:
-                                existing.summary_ta = new_sum
-                            except Exception:
-                                pass
-                            changed = True
-                except Exception:
-                    pass
                 if not existing.description and item.get("description"):
                     existing.description = item.get("description")
                     changed = True
@@ -406,24 +260,32 @@ def store_news_in_db(news_items, db: Session):
                     changed = True
                 if changed:
                     upserted_count += 1
+                    touched.append(existing)
                 continue
 
-                
-            db.add(News(
+            news = News(
                 title=item["title"],
                 description=item["description"],
                 url=item["url"],
+                canonical_url=canonical,
                 source=item["source"],
                 summary=item.get("summary", ""),
-                summaries={"ta": item.get("summary", "")} if item.get("summary") else None,
-                summary_ta=item.get("summary", "") or None,
                 image_url=item.get("image_url"),
                 language="ta",
                 published_at=item.get("published_at", datetime.utcnow()),
-            ))
+            )
+            db.add(news)
+            touched.append(news)
+            created.append(news)
             upserted_count += 1
 
+        # Flush first so ids and defaults are known, then hand the rows to the hot index
+        db.flush()
+        rows = [hot_index.row_of(n) for n in touched]
+        stats.record_ingest(db, [(n.source, n.created_at) for n in created])
         db.commit()
+        hot_index.push(rows)
+        trending.observe(rows)
         logger.info(f"✅ Upserted {upserted_count} Tamil news articles (new or updated).")
         return upserted_count
     except Exception as e:
@@ -436,23 +298,17 @@ def store_news_in_db(news_items, db: Session):
 
 
 def fetch_article_text(url):
+    stored = content_store.get_text(url)
+    if stored:
+        return stored[:parse_pool.ARTICLE_TEXT_LIMIT]
     try:
         # Add Referer header to reduce 403s
-        headers = dict(DEFAULT_HEADERS)
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            headers["Referer"] = f"{parsed.scheme}://{parsed.netloc}/"
-        except Exception:
-            pass
-        resp = requests.get(url, timeout=12, headers=headers)
+        resp = requests.get(url, timeout=12, headers=referer_headers(url))
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        paragraphs = soup.find_all('p')
-        article_text = "\n".join([p.get_text(separator=' ', strip=True) for p in paragraphs])
-        # Trim and cap length to control token usage
-        article_text = article_text.strip()[:6000]
-        return article_text
+        text = parse_pool.article_text(resp.content, resp.encoding, limit=None)
+        content_store.put(url, text, html=resp.content)
+        # Trimmed and capped to control token usage
+        return text[:parse_pool.ARTICLE_TEXT_LIMIT]
     except Exception as e:
         logger.warning(f"Failed to fetch article from {url}: {e}")
         return ""
@@ -499,7 +355,8 @@ def summarize_with_gemini(text: str, article_url: str | None = None) -> str:
 
     config = types.GenerateContentConfig(tools=tools) if tools else None
 
-    delays = [1, 3, 7]
+    # Pause after each failed attempt; none after the last
+    delays = [1, 3, 0]
     last_error = None
     for i, delay in enumerate(delays):
         try:
@@ -508,28 +365,17 @@ def summarize_with_gemini(text: str, article_url: str | None = None) -> str:
                 contents=make_prompt(text, article_url),
                 **({"config": config} if config else {})
             )
-            summary = response.text.strip() if response and hasattr(response, 'text') else ""
-            # If model returns non-Tamil, try translating summary; if still not, translate original content
+            summary = response.text.strip() if response is not None and getattr(response, "text", None) else ""
+            # If the model answered in another language, translate its summary; failing that keep the Tamil part
             if summary and not looks_tamil(summary):
                 tx = translate_to_tamil(summary)
                 if tx and looks_tamil(tx):
                     summary = tx
                 else:
-                    src_txt = (article_text or (entry.get("description") or "")).strip()
-                    if src_txt:
-                        tx2 = translate_to_tamil(src_txt)
-                        if tx2 and looks_tamil(tx2):
-                            summary = tx2
-                        else:
-                            filtered = filter_to_tamil(summary or src_txt)
-                            if filtered:
-                                summary = filtered
-                            elif source in FORCE_TRANSLATE_SOURCES:
-                                fb = (entry.get("description") or "").strip()
-                                if fb:
-                                    summary = (fb[:400] + ("…" if len(fb) > 400 else ""))
-                            else:
-                                summary = ""
+                    filtered = filter_to_tamil(summary)
+                    summary = filtered if looks_tamil(filtered) else ""
+            # An answer ends the attempts, even an unusable one; asking again would not change it
+            return summary
         except Exception as e:
             last_error = e
             msg = str(e)
@@ -547,133 +393,192 @@ def summarize_with_gemini(text: str, article_url: str | None = None) -> str:
     return ""
 
 
-def fetch_tamil_news_once(db):
-    """Fetch Tamil news from multiple sources"""
-    all_news = []
-    seen_urls = set()
-    for source, url_list in RSS_FEEDS.items():
-        logger.info(f"📰 Fetching from {source}")
-        entries = []
-        for candidate_url in url_list:
-            entries = fetch_rss_feed(candidate_url)
-            if entries:
-                break
-        logger.info(f"✅ Found {len(entries)} entries in {source}")
-        policy = SOURCE_FETCH_POLICY.get(source, {"rss_only": False})
-        # Optional: skip entries already seen for this feed URL using published timestamp
-        filtered = []
-        try:
-            last_seen = None
-            # Use the specific URL we fetched from for tracking if available
-            track_url = candidate_url if entries else None
-            if track_url:
-                last_seen = LAST_PUBDATE.get(track_url)
-            newest_ts = last_seen or 0.0
-            for entry in entries:
-                ts = None
-                parsed = entry.get("published_parsed") or entry.get("updated_parsed")
-                if parsed:
-                    import time as _time
-                    ts = float(_time.mktime(parsed))
-                if last_seen is not None and ts is not None and ts <= last_seen:
-                    continue
-                if ts is not None and ts > newest_ts:
-                    newest_ts = ts
-                filtered.append(entry)
-            if track_url and newest_ts and newest_ts != (last_seen or 0.0):
-                LAST_PUBDATE[track_url] = newest_ts
-        except Exception:
-            filtered = entries
-        for entry in (filtered or entries):
-            article_url = extract_entry_link(entry)
-            if not article_url or article_url in seen_urls:
+def upgrade_summaries(pending, db: Session) -> int:
+    """Replace the local draft summaries of freshly stored articles with Gemini summaries.
+    Summaries are cached by a hash of the article text, so identical content
+    is only sent once. While Gemini is disabled or quota-locked only cache
+    hits are applied; the other drafts simply stay. After a few articles in a
+    row get no Gemini summary, the rest of the pass uses the cache only, so a
+    failing API does not hold up the scrape cycle."""
+    upgraded = 0
+    touched = []
+    misses = 0
+    # Summaries produced in this pass; not visible to db.get until flushed
+    fresh: dict[str, str] = {}
+    try:
+        for article_url, article_text, canonical in pending:
+            key = summarizer.content_hash(article_text) if (article_text or "").strip() else None
+            cached = db.get(SummaryCache, key) if key and key not in fresh else None
+            if key in fresh:
+                summary = fresh[key]
+            elif cached is not None:
+                summary = cached.summary
+            elif (os.getenv("SKIP_SUMMARY", "0") == "1" or not _GENAI_AVAILABLE
+                  or time.time() < _QUOTA_EXHAUSTED_UNTIL or misses >= UPGRADE_MAX_MISSES):
                 continue
-            seen_urls.add(article_url)
-
-            if policy.get("rss_only"):
-                article_text = (entry.get("description") or "").strip()
             else:
-                article_text = fetch_article_text(article_url) or (entry.get("description") or "").strip()
+                summary = summarize_with_gemini(article_text, article_url)
+                misses = 0 if summary else misses + 1
+                if summary and key:
+                    fresh[key] = summary
+                    db.merge(SummaryCache(content_hash=key, summary=summary))
+            if not summary:
+                continue
+            news = db.query(News).filter(or_(News.canonical_url == canonical, News.url == article_url)).first()
+            if news and news.summary != summary:
+                news.summary = summary
+                touched.append(news)
+                upgraded += 1
+        db.flush()
+        rows = [hot_index.row_of(n) for n in touched]
+        db.commit()
+        if touched:
+            hot_index.push(rows)
+            logger.info(f"✨ Upgraded {upgraded} summaries with Gemini.")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Summary upgrade failed: {e}")
+    return upgraded
 
-            # Image selection: RSS first, then article
-            image_url = extract_image_from_entry(entry) or extract_image_from_article(article_url)
 
-            summary = summarize_with_gemini(article_text, article_url) if (article_text or article_url) else ""
-            if not summary:
-                fallback = (entry.get("description") or "").strip()
-                if fallback:
-                    summary = (fallback[:400] + ("…" if len(fallback) > 400 else ""))
-            # For sources where English is acceptable, skip Tamil-only coercion
-            enforce_tamil = source not in ALLOW_ENGLISH_SOURCES
+def fetch_tamil_news_once(db, sources: list[str] | None = None):
+    """Fetch Tamil news from multiple sources (all of RSS_FEEDS unless `sources` is given)"""
+    with profiling.maybe_profile("scrape"):
+        return _fetch_tamil_news_once(db, sources)
 
-            # Determine published_at with proper timezone handling to match source site
-            try:
-                from datetime import timezone as _tz
-                pub_dt = None
-
-                # 1) Try parsing RFC822/ISO-like date strings with timezone
-                date_str = (
-                    entry.get("published")
-                    or entry.get("updated")
-                    or entry.get("dc:date")
-                    or entry.get("pubDate")
-                )
-                if isinstance(date_str, str) and date_str.strip():
-                    try:
-                        dt = parsedate_to_datetime(date_str.strip())
-                        if dt is not None:
-                            if dt.tzinfo is None:
-                                # No timezone in string. Assume IST to match Tamil sites.
-                                if ZoneInfo is not None:
-                                    dt = dt.replace(tzinfo=ZoneInfo("Asia/Kolkata"))
-                                else:
-                                    # Fallback: treat as UTC if zoneinfo unavailable
-                                    dt = dt.replace(tzinfo=_tz.utc)
-                            # Convert to UTC for storage
-                            pub_dt = dt.astimezone(_tz.utc)
-                    except Exception:
-                        pass
-
-                # 2) Fallback to feedparser's struct_time
-                if pub_dt is None:
-                    published_parsed = entry.get("published_parsed") or entry.get("updated_parsed")
-                    if published_parsed:
-                        try:
-                            import calendar as _cal
-                            ts = _cal.timegm(published_parsed)  # treat as UTC epoch
-                            pub_dt = datetime.fromtimestamp(ts, tz=_tz.utc)
-                        except Exception:
-                            pass
-
-                # 3) Ultimate fallback: current UTC
-                if pub_dt is None:
-                    pub_dt = datetime.now(_tz.utc)
-            except Exception:
-                from datetime import timezone as _tz
-                pub_dt = datetime.now(_tz.utc)
 
-            # Skip very old entries based on MAX_ENTRY_AGE_HOURS
-            try:
-                from datetime import timezone as _tz
-                cutoff = datetime.now(_tz.utc) - timedelta(hours=MAX_ENTRY_AGE_HOURS)
-                if pub_dt < cutoff:
+def _download(url: str, headers: dict, timeout: int) -> tuple[bytes, str | None]:
+    """Raw body and declared charset (None lets the parser sniff it)."""
+    try:
+        resp = requests.get(url, headers=headers, timeout=timeout)
+        ct = resp.headers.get("Content-Type", "")
+        if not resp.ok:
+            logger.warning(f"⚠️ HTTP {resp.status_code} for {url} ({ct})")
+            return b"", None
+        return resp.content, (resp.encoding if "charset" in ct.lower() else None)
+    except Exception as e:
+        logger.warning(f"Failed to fetch {url}: {e}")
+        return b"", None
+
+
+def _fetch_and_parse_feed(source: str, url: str, cutoff: datetime) -> dict:
+    data, _ = _download(url, DEFAULT_HEADERS, 10)
+    try:
+        return parse_pool.submit(parse_pool.parse_feed, data, source, LAST_PUBDATE.get(url), cutoff, FAST_FEED_PARSER).result()
+    except Exception as e:
+        logger.error(f"❌ Error parsing {url}: {e}")
+        return {"entries": 0, "items": [], "newest": None}
+
+
+def _parse_sources(cutoff: datetime, sources: list[str] | None = None) -> dict[str, list[dict]]:
+    """Fetch every source's feed on threads and parse it in the process pool.
+    A source moves on to its next candidate URL when a feed yields no entries."""
+    feeds = {s: urls for s, urls in RSS_FEEDS.items() if sources is None or s in sources}
+    candidates = {source: list(urls) for source, urls in feeds.items()}
+    items: dict[str, list[dict]] = {source: [] for source in feeds}
+    with ThreadPoolExecutor(max_workers=SCRAPE_FETCH_THREADS) as io:
+        while candidates:
+            futures = {
+                source: (urls[0], io.submit(_fetch_and_parse_feed, source, urls[0], cutoff))
+                for source, urls in candidates.items()
+            }
+            retry = {}
+            for source, (url, fut) in futures.items():
+                result = fut.result()
+                if result["entries"]:
+                    logger.info(f"✅ Found {result['entries']} entries in {source}")
+                    if result["newest"] and result["newest"] != LAST_PUBDATE.get(url):
+                        LAST_PUBDATE[url] = result["newest"]
+                    items[source] = result["items"]
+                elif len(candidates[source]) > 1:
+                    retry[source] = candidates[source][1:]
+                else:
+                    logger.warning(f"⚠️ No entries found for {source}")
+            candidates = retry
+    return items
+
+
+def _fetch_and_extract_article(url: str, fallback: str) -> dict:
+    stored = content_store.get_text(url)
+    if stored:
+        # Seen before (e.g. another URL variant or a re-run): no download needed
+        text = stored[:parse_pool.ARTICLE_TEXT_LIMIT]
+        canonical = content_store.get_canonical(url)
+        return {"text": text, "canonical": canonical, "summary": summarizer.summarize_text(text)}
+    content, encoding = _download(url, referer_headers(url), 12)
+    try:
+        result = parse_pool.submit(parse_pool.extract_article, content, encoding, fallback).result()
+    except Exception as e:
+        logger.warning(f"Failed to extract article from {url}: {e}")
+        return {"text": "", "summary": summarizer.summarize_text(fallback)}
+    content_store.put(url, result["text"], html=content, canonical=result.get("canonical"))
+    result["text"] = result["text"][:parse_pool.ARTICLE_TEXT_LIMIT]
+    return result
+
+
+def _fetch_tamil_news_once(db, sources: list[str] | None = None):
+    all_news = []
+    # Canonical URLs already taken this cycle (tracking params, http/https, AMP variants collapse)
+    seen_urls = set()
+    # Articles without an RSS image; resolved in the background once stored
+    image_pending = []
+    # (url, article text, canonical url) to upgrade with an LLM summary once stored
+    summary_pending = []
+    cutoff = age_cutoff(MAX_ENTRY_AGE_HOURS)
+    # Feeds: fetched on threads, parsed/normalized in worker processes
+    parsed = _parse_sources(cutoff, sources)
+    # Article pages: fetched on threads, text extraction and draft summary in worker processes
+    articles = {}
+    with ThreadPoolExecutor(max_workers=SCRAPE_FETCH_THREADS) as io:
+        for source, items in parsed.items():
+            policy = SOURCE_FETCH_POLICY.get(source, {"rss_only": False})
+            for item in items:
+                item["canonical_url"] = canonicalize(item["url"])
+                if item["canonical_url"] in seen_urls:
                     continue
-            except Exception:
-                pass
-
-            all_news.append({
-                "title": entry.get("title", ""),
-                "description": entry.get("description", ""),
-                "url": article_url,
-                "source": source,
-                "published_at": pub_dt,
-                "summary": summary,
-                "image_url": image_url,
-            })
+                seen_urls.add(item["canonical_url"])
+                fallback = (item.get("description") or "").strip()
+                if policy.get("rss_only"):
+                    articles[item["canonical_url"]] = parse_pool.submit(parse_pool.extract_article, b"", None, fallback)
+                else:
+                    articles[item["canonical_url"]] = io.submit(_fetch_and_extract_article, item["url"], fallback)
+        # Canonical URLs after the pages' own rel=canonical links are applied
+        page_canonicals = set()
+        for source, items in parsed.items():
+            for item in items:
+                article_url = item["url"]
+                fut = articles.pop(item["canonical_url"], None)
+                if fut is None:
+                    continue
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    # e.g. the parse pool broke under this rss_only item; keep the RSS text
+                    logger.warning(f"Article extraction failed for {article_url}: {e}")
+                    fallback = (item.get("description") or "").strip()
+                    result = {"text": "", "canonical": None, "summary": summarizer.summarize_text(fallback)}
+                if result.get("canonical"):
+                    item["canonical_url"] = canonicalize(urljoin(article_url, result["canonical"]))
+                if item["canonical_url"] in page_canonicals:
+                    continue
+                page_canonicals.add(item["canonical_url"])
+                article_text = result["text"] or (item.get("description") or "").strip()
+
+                # Image selection: RSS first, then the resolver cache; misses are resolved after insert
+                image_url = item["image_url"] or image_resolver.cached(article_url)
+                if article_text or article_url:
+                    summary_pending.append((article_url, article_text, item["canonical_url"]))
+                if not image_url:
+                    image_pending.append(article_url)
+                # Local extractive summary first; Gemini upgrades it after the items are stored
+                item.update(source=source, summary=result["summary"], summary_draft=True, image_url=image_url)
+                all_news.append(item)
 
     logger.info(f"✅ Scraped {len(all_news)} Tamil news items total.")
     if all_news:
         inserted = store_news_in_db(all_news, db)
+        image_resolver.enqueue(image_pending)
+        upgrade_summaries(summary_pending, db)
         return inserted
     else:
         logger.warning("⚠️ No Tamil news items to insert.")
@@ -719,6 +624,7 @@ def purge_goodreturns(db: Session) -> int:
         if count:
             q.delete(synchronize_session=False)
             db.commit()
+            hot_index.invalidate()
         return count
     except Exception:
         db.rollback()
@@ -0,0 +1,252 @@
+"""On-disk, content-addressed cache of resized article images.
+
+Layout under IMAGE_CACHE_DIR:
+    urls/<sha1(image url)>      -> sha256 of the original bytes
+    orig/<sha256>               -> original image as downloaded
+    thumbs/<sha256>-<w>.<ext>   -> resized WebP/JPEG thumbnail
+
+Resizing runs in a process pool so it does not hold the API worker's GIL.
+Files are touched on every hit and the least recently used are evicted
+once the cache grows past IMAGE_CACHE_MAX_BYTES.
+"""
+import hashlib
+import importlib.util
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin
+from app.utils.http import check_public_url, referer_headers
+
+logger = logging.getLogger("app.thumbnails")
+
+# Pillow is optional; without it the proxy serves the original image.
+# Only its presence is checked here; it is imported inside the resize workers.
+_PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+if not _PIL_AVAILABLE:
+    logger.info("Pillow not available, image proxy will serve originals")
+
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(".cache", "images"))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+IMAGE_FETCH_MAX_BYTES = int(os.getenv("IMAGE_FETCH_MAX_BYTES", str(10 * 1024 * 1024)))
+_MAX_REDIRECTS = 5
+THUMB_WORKERS = int(os.getenv("THUMB_WORKERS", "2"))
+THUMB_WIDTHS = (160, 320, 640, 960)
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+_KEY_LOCKS: dict[str, threading.Lock] = {}
+_KEY_LOCKS_LOCK = threading.Lock()
+_SIZE_LOCK = threading.Lock()
+_CACHE_BYTES: int | None = None
+
+_CONTENT_TYPES = {"webp": "image/webp", "jpg": "image/jpeg"}
+
+
+def content_type(ext: str) -> str:
+    return _CONTENT_TYPES.get(ext, "application/octet-stream")
+
+
+def _sniff(path: str) -> str:
+    """Content type of an original image from its magic bytes."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(12)
+    except OSError:
+        return "application/octet-stream"
+    if head.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG"):
+        return "image/png"
+    if head.startswith(b"GIF8"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def snap_width(width: int) -> int:
+    """Nearest supported thumbnail width, so the cache holds few variants per image."""
+    return min(THUMB_WIDTHS, key=lambda w: abs(w - width))
+
+
+def _path(*parts: str) -> str:
+    return os.path.join(IMAGE_CACHE_DIR, *parts)
+
+
+def _key_lock(key: str) -> threading.Lock:
+    with _KEY_LOCKS_LOCK:
+        lock = _KEY_LOCKS.get(key)
+        if lock is None:
+            lock = _KEY_LOCKS[key] = threading.Lock()
+        return lock
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # Never fork the threaded API process (inherited locks can deadlock), as in parse_pool
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _POOL = ProcessPoolExecutor(max_workers=max(1, THUMB_WORKERS), mp_context=ctx)
+        return _POOL
+
+
+def _write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    _account(len(data))
+
+
+def _touch(path: str) -> None:
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def _scan() -> list[tuple[float, int, str]]:
+    files = []
+    for sub in ("orig", "thumbs"):
+        root = _path(sub)
+        if not os.path.isdir(root):
+            continue
+        for name in os.listdir(root):
+            p = os.path.join(root, name)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+    return files
+
+
+def _account(added: int) -> None:
+    """Track the cache size and evict least recently used files past the limit."""
+    global _CACHE_BYTES
+    with _SIZE_LOCK:
+        if _CACHE_BYTES is None:
+            _CACHE_BYTES = sum(size for _, size, _ in _scan())
+        else:
+            _CACHE_BYTES += added
+        if _CACHE_BYTES <= IMAGE_CACHE_MAX_BYTES:
+            return
+        # Evict down to 90% so we do not rescan on every write
+        target = int(IMAGE_CACHE_MAX_BYTES * 0.9)
+        files = sorted(_scan())
+        total = sum(size for _, size, _ in files)
+        for _, size, p in files:
+            if total <= target:
+                break
+            try:
+                os.remove(p)
+                total -= size
+            except OSError:
+                pass
+        _CACHE_BYTES = total
+
+
+def _make_thumbnail(data: bytes, width: int, fmt: str) -> bytes:
+    """Runs in a worker process: resize to `width` (never upscale) and encode."""
+    from PIL import Image
+    img = Image.open(io.BytesIO(data))
+    img.draft("RGB", (width, width * 4))
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+    if img.width > width:
+        height = max(1, round(img.height * width / img.width))
+        img = img.resize((width, height), Image.LANCZOS)
+    out = io.BytesIO()
+    if fmt == "webp":
+        img.save(out, "WEBP", quality=78, method=4)
+    else:
+        if img.mode == "RGBA":
+            img = img.convert("RGB")
+        img.save(out, "JPEG", quality=80, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def _download(image_url: str) -> bytes:
+    """GET an image URL taken from scraped feeds or pages. Every hop (redirects
+    are followed by hand) must be a public http(s) address, and the response
+    must be an image no larger than IMAGE_FETCH_MAX_BYTES."""
+    import requests
+    url = image_url
+    for _ in range(_MAX_REDIRECTS + 1):
+        check_public_url(url)
+        with requests.get(url, headers=referer_headers(url), timeout=10, stream=True, allow_redirects=False) as resp:
+            if resp.is_redirect:
+                url = urljoin(url, resp.headers["location"])
+                continue
+            resp.raise_for_status()
+            ctype = resp.headers.get("content-type", "").split(";")[0].strip().lower()
+            if not ctype.startswith("image/"):
+                raise ValueError(f"not an image ({ctype or 'no content type'})")
+            buf = io.BytesIO()
+            for chunk in resp.iter_content(chunk_size=65536):
+                buf.write(chunk)
+                if buf.tell() > IMAGE_FETCH_MAX_BYTES:
+                    raise ValueError("image too large")
+            return buf.getvalue()
+    raise ValueError("too many redirects")
+
+
+def _fetch_original(image_url: str) -> str | None:
+    """Return the sha256 of the original image, downloading it on first use."""
+    url_key = hashlib.sha1(image_url.encode("utf-8")).hexdigest()
+    ref = _path("urls", url_key)
+    with _key_lock(url_key):
+        try:
+            with open(ref, "r") as f:
+                digest = f.read().strip()
+            if digest and os.path.exists(_path("orig", digest)):
+                return digest
+        except OSError:
+            pass
+        try:
+            data = _download(image_url)
+        except Exception as e:
+            logger.warning(f"Image fetch failed for {image_url}: {e}")
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        orig = _path("orig", digest)
+        if not os.path.exists(orig):
+            _write(orig, data)
+        os.makedirs(os.path.dirname(ref), exist_ok=True)
+        with open(ref, "w") as f:
+            f.write(digest)
+        return digest
+
+
+def get_thumbnail(image_url: str, width: int, webp: bool) -> tuple[str, str] | None:
+    """Path and content type of a cached thumbnail for `image_url`, creating it if needed.
+    Falls back to the original file when Pillow is missing or the image cannot be decoded."""
+    digest = _fetch_original(image_url)
+    if not digest:
+        return None
+    orig = _path("orig", digest)
+    if not _PIL_AVAILABLE:
+        _touch(orig)
+        return orig, _sniff(orig)
+    fmt = "webp" if webp else "jpg"
+    width = snap_width(width)
+    thumb = _path("thumbs", f"{digest}-{width}.{fmt}")
+    with _key_lock(thumb):
+        if os.path.exists(thumb):
+            _touch(thumb)
+            return thumb, content_type(fmt)
+        try:
+            with open(orig, "rb") as f:
+                data = f.read()
+            _write(thumb, _pool().submit(_make_thumbnail, data, width, fmt).result(timeout=30))
+        except Exception as e:
+            logger.warning(f"Thumbnail failed for {image_url}: {e}")
+            _touch(orig)
+            return orig, _sniff(orig)
+    return thumb, content_type(fmt)
@@ -0,0 +1,125 @@
+"""Per-request phase timing.
+
+The HTTP middleware opens a timing record for each request. Code on the
+request path adds durations with `span("db")` and counters with
+`count("translate_hits")`. The middleware then reports them in a
+Server-Timing header and adds them to a rolling per-route aggregate served
+by /admin/timings. Aggregates are keyed by the route template
+("/news/{news_id}"), so ids and unmatched probe paths do not each get one.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Samples kept per route for the aggregate
+TIMING_WINDOW = 500
+# Most distinct keys kept; further ones are pooled under "other"
+TIMING_MAX_KEYS = 200
+
+_CURRENT: ContextVar[dict | None] = ContextVar("request_timing", default=None)
+_SAMPLES: dict[str, deque] = {}
+_LOCK = threading.Lock()
+
+
+def begin() -> dict:
+    record = {"phases": {}, "counters": {}, "started": time.perf_counter()}
+    _CURRENT.set(record)
+    return record
+
+
+@contextmanager
+def span(name: str):
+    """Add the enclosed block's duration (ms) to phase `name` of the current request."""
+    record = _CURRENT.get()
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = record["phases"]
+        phases[name] = phases.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def count(name: str, n: int = 1) -> None:
+    record = _CURRENT.get()
+    if record is not None:
+        record["counters"][name] = record["counters"].get(name, 0) + n
+
+
+def finish(record: dict, path: str) -> str:
+    """Close the record, add it to the aggregate and return the Server-Timing header value."""
+    total = (time.perf_counter() - record["started"]) * 1000
+    phases = dict(record["phases"])
+    counters = record["counters"]
+    if "translate" not in phases and any(k.startswith("translate_") for k in counters):
+        # Cache hits only: still report the counters under the translate metric
+        phases["translate"] = 0.0
+    phases["total"] = total
+    with _LOCK:
+        samples = _SAMPLES.get(path)
+        if samples is None:
+            if len(_SAMPLES) >= TIMING_MAX_KEYS:
+                path = "other"
+                samples = _SAMPLES.get(path)
+            if samples is None:
+                samples = _SAMPLES[path] = deque(maxlen=TIMING_WINDOW)
+        samples.append((phases, dict(counters)))
+    parts = []
+    for name, dur in phases.items():
+        desc = ""
+        if name == "translate" and counters:
+            desc = ";desc=\"" + " ".join(
+                f"{k.split('_', 1)[1]}={v}" for k, v in counters.items() if k.startswith("translate_")
+            ) + "\""
+        parts.append(f"{name};dur={dur:.1f}{desc}")
+    return ", ".join(parts)
+
+
+def route_key(scope) -> str:
+    """Aggregate key for a request: its route template, or "unmatched" (404s, probes)."""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    regex = getattr(route, "path_regex", None)
+    if not template or regex is None:
+        return "unmatched"
+    # Routes of an included router may carry only their own part of the path
+    # ("/{news_id}" under "/images"); the rest of the request path is the prefix
+    path = scope.get("path", "")
+    for i in range(len(path)):
+        if (i == 0 or path[i] == "/") and regex.match(path[i:]):
+            return path[:i] + template
+    return template
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def breakdown() -> dict:
+    """Per route: request count, and avg/p50/p95/max per phase plus summed counters."""
+    with _LOCK:
+        snapshot = {path: list(samples) for path, samples in _SAMPLES.items()}
+    out = {}
+    for path, samples in snapshot.items():
+        names = sorted({name for phases, _ in samples for name in phases})
+        phases_out = {}
+        for name in names:
+            # Requests that skipped a phase count as 0 ms for it
+            values = [phases.get(name, 0.0) for phases, _ in samples]
+            phases_out[name] = {
+                "avg_ms": round(sum(values) / len(values), 2),
+                "p50_ms": round(_percentile(values, 50), 2),
+                "p95_ms": round(_percentile(values, 95), 2),
+                "max_ms": round(max(values), 2),
+            }
+        counters: dict[str, int] = {}
+        for _, c in samples:
+            for k, v in c.items():
+                counters[k] = counters.get(k, 0) + v
+        out[path] = {"requests": len(samples), "phases": phases_out, "counters": counters}
+    return out
@@ -0,0 +1,327 @@
+"""Translation provider router.
+
+Providers are tried in order of a rolling health score (latency EWMA
+weighted by error EWMA). A provider that is rate-limited, or keeps failing,
+is skipped for a cool-down instead of being retried on every call. When
+TRANSLATE_HEDGE_MS is set, a second provider is started if the first has
+not answered within that many milliseconds, and the first non-empty answer
+wins. Batches go to providers with native batch support (the Google v2 REST
+API takes many `q` values per request) in a single call.
+
+TRANSLATE_PROVIDERS selects and orders the backends, e.g.
+"deep,google_v2,gemini" (default) or "stub" for local testing.
+"""
+import html as _html
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger("app.translation")
+
+LANG_NAMES = {
+    "ta": "Tamil",
+    "en": "English",
+    "hi": "Hindi",
+    "kn": "Kannada",
+    "ml": "Malayalam",
+    "te": "Telugu",
+}
+
+TRANSLATE_PROVIDERS = os.getenv("TRANSLATE_PROVIDERS", "deep,google_v2,gemini")
+TRANSLATE_HEDGE_MS = int(os.getenv("TRANSLATE_HEDGE_MS", "0"))
+TRANSLATE_COOLDOWN_SECONDS = float(os.getenv("TRANSLATE_COOLDOWN_SECONDS", "300"))
+# Consecutive failures before a provider is put on cool-down
+TRANSLATE_MAX_FAILURES = int(os.getenv("TRANSLATE_MAX_FAILURES", "3"))
+_EWMA_ALPHA = 0.2
+# Latency assumed for a provider that has not answered successfully yet
+_LATENCY_PRIOR_MS = 1000.0
+
+
+class RateLimited(Exception):
+    """Provider reported quota exhaustion / HTTP 429."""
+
+
+class Provider:
+    name = "base"
+    # Most texts accepted in one call; 1 means the provider translates one text at a time
+    max_batch = 1
+    # Most characters across the texts of one call (None: no limit)
+    max_chars: int | None = None
+
+    def available(self) -> bool:
+        return True
+
+    def translate_batch(self, texts: list[str], lang: str) -> list[str]:
+        """Translations aligned with `texts`; "" where a text failed. Raises on provider errors."""
+        raise NotImplementedError
+
+
+class DeepTranslatorProvider(Provider):
+    name = "deep"
+
+    def __init__(self):
+        try:
+            from deep_translator import GoogleTranslator  # type: ignore
+            self._cls = GoogleTranslator
+        except Exception:
+            self._cls = None
+
+    def available(self) -> bool:
+        return self._cls is not None
+
+    def translate_batch(self, texts, lang):
+        out = self._cls(source="auto", target=lang).translate(texts[0])
+        return [out.strip() if isinstance(out, str) else ""]
+
+
+class GoogleV2Provider(Provider):
+    """Google Cloud Translation v2 REST API; up to 128 `q` values and 30k characters per request."""
+    name = "google_v2"
+    max_batch = 128
+    max_chars = 30000
+    URL = "https://translation.googleapis.com/language/translate/v2"
+
+    def __init__(self):
+        self.api_key = os.getenv("GOOGLE_TRANSLATE_API_KEY", "").strip()
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def translate_batch(self, texts, lang):
+        import requests
+        payload = [("q", t) for t in texts] + [
+            ("target", lang), ("format", "text"), ("model", "nmt"), ("key", self.api_key),
+        ]
+        r = requests.post(self.URL, data=payload, timeout=10 + len(texts) // 10)
+        if r.status_code == 429:
+            raise RateLimited(f"HTTP 429 from {self.name}")
+        r.raise_for_status()
+        tr_list = ((r.json() or {}).get("data") or {}).get("translations") or []
+        out = [_html.unescape(t.get("translatedText") or "").strip() for t in tr_list]
+        return (out + [""] * len(texts))[:len(texts)]
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+
+    def __init__(self):
+        try:
+            from google import genai  # type: ignore
+            self._genai = genai
+        except Exception:
+            self._genai = None
+        self.model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+
+    def available(self) -> bool:
+        return self._genai is not None
+
+    def translate_batch(self, texts, lang):
+        name = LANG_NAMES[lang]
+        prompt = (
+            f"Translate the following text into {name} only. "
+            f"Return strictly plain {name} with no extra notes, labels, or explanations.\n\n"
+            f"Text:\n{texts[0]}"
+        )
+        try:
+            resp = self._genai.Client().models.generate_content(model=self.model, contents=prompt)
+        except Exception as e:
+            msg = str(e)
+            if "RESOURCE_EXHAUSTED" in msg or "429" in msg:
+                raise RateLimited(msg)
+            raise
+        return [resp.text.strip() if resp and getattr(resp, "text", None) else ""]
+
+
+class StubProvider(Provider):
+    """Deterministic offline provider for local testing: "[lang] text"."""
+    name = "stub"
+    max_batch = 1000
+
+    def translate_batch(self, texts, lang):
+        delay = float(os.getenv("TRANSLATE_STUB_DELAY_MS", "0")) / 1000.0
+        if delay:
+            time.sleep(delay)
+        return [f"[{lang}] {t}" for t in texts]
+
+
+PROVIDER_CLASSES = {
+    "deep": DeepTranslatorProvider,
+    "google_v2": GoogleV2Provider,
+    "gemini": GeminiProvider,
+    "stub": StubProvider,
+}
+
+
+class _Health:
+    def __init__(self):
+        self.latency_ms: float | None = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, ok: bool, elapsed_ms: float, rate_limited: bool = False) -> None:
+        self.calls += 1
+        self.error_rate = (1 - _EWMA_ALPHA) * self.error_rate + _EWMA_ALPHA * (0.0 if ok else 1.0)
+        if ok:
+            # Only successful calls say how fast a provider is; failures often return instantly
+            self.latency_ms = elapsed_ms if self.latency_ms is None else (
+                (1 - _EWMA_ALPHA) * self.latency_ms + _EWMA_ALPHA * elapsed_ms
+            )
+            self.failures = 0
+            return
+        self.errors += 1
+        self.failures += 1
+        if rate_limited or self.failures >= TRANSLATE_MAX_FAILURES:
+            self.cooldown_until = time.time() + TRANSLATE_COOLDOWN_SECONDS
+
+    def score(self) -> float:
+        latency = self.latency_ms if self.latency_ms is not None else _LATENCY_PRIOR_MS
+        return latency * (1.0 + 4.0 * self.error_rate)
+
+
+def _chunks(indexes: list[int], texts: list[str], max_batch: int, max_chars: int | None):
+    """Split `indexes` into runs of at most `max_batch` texts and `max_chars` characters.
+    A single text longer than `max_chars` still goes out on its own."""
+    chunk: list[int] = []
+    size = 0
+    for i in indexes:
+        n = len(texts[i])
+        if chunk and (len(chunk) >= max_batch or (max_chars and size + n > max_chars)):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(i)
+        size += n
+    if chunk:
+        yield chunk
+
+
+class TranslationRouter:
+    def __init__(self, providers: list[Provider]):
+        self.providers = [p for p in providers if p.available()]
+        self.health = {p.name: _Health() for p in self.providers}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="translate")
+
+    def ranked(self) -> list[Provider]:
+        """Providers not on cool-down, best score first (configured order breaks ties)."""
+        now = time.time()
+        with self._lock:
+            ready = [(self.health[p.name].score(), i, p) for i, p in enumerate(self.providers)
+                     if self.health[p.name].cooldown_until <= now]
+        return [p for _, _, p in sorted(ready, key=lambda t: (t[0], t[1]))]
+
+    def _call(self, provider: Provider, texts: list[str], lang: str) -> list[str]:
+        start = time.perf_counter()
+        try:
+            out = provider.translate_batch(texts, lang)
+            ok = any(out)
+            rate_limited = False
+        except RateLimited as e:
+            logger.warning(f"Translation provider {provider.name} rate-limited; cooling down: {e}")
+            out, ok, rate_limited = [""] * len(texts), False, True
+        except Exception as e:
+            logger.debug(f"Translation provider {provider.name} failed: {e}")
+            out, ok, rate_limited = [""] * len(texts), False, False
+        with self._lock:
+            self.health[provider.name].record(ok, (time.perf_counter() - start) * 1000, rate_limited)
+        return out
+
+    def _hedged(self, providers: list[Provider], text: str, lang: str) -> str:
+        """Start the best provider; add the next one after the hedge delay. First answer wins."""
+        pending = {self._executor.submit(self._call, providers[0], [text], lang)}
+        rest = list(providers[1:])
+        timeout = TRANSLATE_HEDGE_MS / 1000.0
+        while pending:
+            done, pending = wait(pending, timeout=timeout if rest else None, return_when=FIRST_COMPLETED)
+            for f in done:
+                out = f.result()[0]
+                if out:
+                    return out
+            if rest and (not done or not pending):
+                pending.add(self._executor.submit(self._call, rest.pop(0), [text], lang))
+        return ""
+
+    def translate(self, text: str, lang: str) -> str:
+        lang = (lang or "").lower().strip()
+        if lang not in LANG_NAMES or not (text or "").strip():
+            return ""
+        providers = self.ranked()
+        if not providers:
+            return ""
+        if TRANSLATE_HEDGE_MS > 0 and len(providers) > 1:
+            return self._hedged(providers, text, lang)
+        for p in providers:
+            out = self._call(p, [text], lang)[0]
+            if out:
+                return out
+        return ""
+
+    def translate_many(self, texts: list[str], lang: str) -> list[str]:
+        """Translate many texts; each provider gets the still-missing ones in as few calls as it allows."""
+        lang = (lang or "").lower().strip()
+        results = [""] * len(texts)
+        if lang not in LANG_NAMES:
+            return results
+        todo = [i for i, t in enumerate(texts) if (t or "").strip()]
+        for p in self.ranked():
+            if not todo:
+                break
+            if p.max_batch == 1:
+                for i in todo:
+                    results[i] = self._call(p, [texts[i]], lang)[0]
+                    if self.health[p.name].cooldown_until > time.time():
+                        break
+            else:
+                for chunk in _chunks(todo, texts, p.max_batch, p.max_chars):
+                    for i, out in zip(chunk, self._call(p, [texts[i] for i in chunk], lang)):
+                        results[i] = out
+            todo = [i for i in todo if not results[i]]
+        return results
+
+    def stats(self) -> list[dict]:
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "provider": p.name,
+                    "latency_ms": round(h.latency_ms, 1) if h.latency_ms is not None else None,
+                    "error_rate": round(h.error_rate, 3),
+                    "calls": h.calls,
+                    "errors": h.errors,
+                    "cooldown_seconds": max(0, round(h.cooldown_until - now)),
+                }
+                for p in self.providers
+                for h in (self.health[p.name],)
+            ]
+
+
+_ROUTER: TranslationRouter | None = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_router() -> TranslationRouter:
+    global _ROUTER
+    with _ROUTER_LOCK:
+        if _ROUTER is None:
+            names = [n.strip() for n in TRANSLATE_PROVIDERS.split(",") if n.strip()]
+            providers = [PROVIDER_CLASSES[n]() for n in names if n in PROVIDER_CLASSES]
+            _ROUTER = TranslationRouter(providers)
+            logger.info(f"Translation providers: {[p.name for p in _ROUTER.providers] or 'none'}")
+        return _ROUTER
+
+
+def translate_text(text: str, target_lang: str) -> str:
+    """Translate arbitrary text to the target language code.
+    Supported: ta (Tamil), en (English), hi (Hindi), kn (Kannada), ml (Malayalam), te (Telugu)
+    Returns empty string on failure.
+    """
+    return get_router().translate(text, target_lang)
+
+
+def translate_many(texts: list[str], target_lang: str) -> list[str]:
+    """Batch form of translate_text; results align with `texts` ("" on failure)."""
+    return get_router().translate_many(texts, target_lang)
@@ -0,0 +1,207 @@
+"""Trending keywords over sliding windows of recent ingest.
+
+Keywords are pulled from each new article's title and description when it
+is stored (or when the hot index sees rows written by another process) and
+counted once per article into hourly buckets. Each bucket holds a
+Count-Min sketch for frequency estimates and a Space-Saving summary of its
+heavy hitters, so memory per hour is fixed however many distinct words
+arrive. /news/trending answers from memory: candidates are the heavy
+hitters of the buckets in the window, scored by their summed sketch
+estimates.
+
+Keywords are matched on the same prefix stem the summarizer uses, so
+"சென்னையில்" and "சென்னைக்கு" count as one; the shortest surface form seen
+is what gets displayed.
+"""
+import array
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from app.utils.text import STEM_LENGTH, STOPWORDS
+
+logger = logging.getLogger("app.trending")
+
+TRENDING_MAX_HOURS = int(os.getenv("TRENDING_MAX_HOURS", "24"))
+SKETCH_WIDTH = 2048
+SKETCH_DEPTH = 4
+HEAVY_HITTERS = 200
+# Article ids remembered to skip rows seen twice (store path and hot index sync)
+_SEEN_IDS_MAX = 20000
+
+_WORD = re.compile(r"[\u0b80-\u0bff]{3,}|[A-Za-z]{3,}")
+_ID, _TITLE, _DESCRIPTION, _CREATED = 0, 1, 2, 9
+_TAG = re.compile(r"<[^>]+>")
+
+
+class CountMinSketch:
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.rows = [array.array("I", bytes(4 * width)) for _ in range(depth)]
+
+    def _cells(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.width for i in range(self.depth))
+
+    def add(self, key: str, n: int = 1) -> None:
+        for row, cell in zip(self.rows, self._cells(key)):
+            row[cell] += n
+
+    def estimate(self, key: str) -> int:
+        return min(row[cell] for row, cell in zip(self.rows, self._cells(key)))
+
+
+class SpaceSaving:
+    """Top-k frequent keys with bounded memory (Metwally et al.)."""
+
+    def __init__(self, k: int = HEAVY_HITTERS):
+        self.k = k
+        self.counts: dict[str, int] = {}
+
+    def add(self, key: str, n: int = 1) -> None:
+        if key in self.counts:
+            self.counts[key] += n
+        elif len(self.counts) < self.k:
+            self.counts[key] = n
+        else:
+            victim = min(self.counts, key=self.counts.__getitem__)
+            floor = self.counts.pop(victim)
+            self.counts[key] = floor + n
+
+    def keys(self):
+        return self.counts.keys()
+
+
+class _Bucket:
+    __slots__ = ("hour", "sketch", "heavy", "articles")
+
+    def __init__(self, hour: datetime):
+        self.hour = hour
+        self.sketch = CountMinSketch()
+        self.heavy = SpaceSaving()
+        self.articles = 0
+
+
+_LOCK = threading.Lock()
+_BUCKETS: deque = deque()  # _Bucket, oldest first
+_SURFACE: dict[str, str] = {}
+_SEEN_IDS: set = set()
+_SEEN_ORDER: deque = deque()
+_WARMED = False
+
+
+def keywords(title: str | None, description: str | None) -> dict[str, str]:
+    """Distinct keyword stems of an article mapped to a surface form."""
+    text = f"{title or ''} {_TAG.sub(' ', description or '')}"
+    out: dict[str, str] = {}
+    for word in _WORD.findall(text):
+        word = word.lower()
+        if word in STOPWORDS:
+            continue
+        stem = word[:STEM_LENGTH]
+        if stem not in out or len(word) < len(out[stem]):
+            out[stem] = word
+    return out
+
+
+def _hour(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _bucket_for(hour: datetime) -> _Bucket | None:
+    """Bucket for `hour`, creating it (and expiring old ones) as needed. Caller holds _LOCK."""
+    newest = _BUCKETS[-1].hour if _BUCKETS else None
+    horizon = _hour(datetime.utcnow()) - timedelta(hours=TRENDING_MAX_HOURS - 1)
+    if hour < horizon:
+        return None
+    if newest is not None and hour <= newest:
+        for b in reversed(_BUCKETS):
+            if b.hour == hour:
+                return b
+            if b.hour < hour:
+                break
+        bucket = _Bucket(hour)
+        items = sorted(list(_BUCKETS) + [bucket], key=lambda b: b.hour)
+        _BUCKETS.clear()
+        _BUCKETS.extend(items)
+        return bucket
+    bucket = _Bucket(hour)
+    _BUCKETS.append(bucket)
+    expired = False
+    while _BUCKETS and _BUCKETS[0].hour < horizon:
+        _BUCKETS.popleft()
+        expired = True
+    if expired:
+        live = set().union(*(b.heavy.keys() for b in _BUCKETS))
+        for stem in [s for s in _SURFACE if s not in live]:
+            del _SURFACE[stem]
+    return bucket
+
+
+def observe(rows) -> int:
+    """Count keywords of rows (tuples in hot_index.COLUMNS order) not seen before."""
+    added = 0
+    with _LOCK:
+        for r in rows:
+            news_id = r[_ID]
+            if news_id in _SEEN_IDS:
+                continue
+            _SEEN_IDS.add(news_id)
+            _SEEN_ORDER.append(news_id)
+            if len(_SEEN_ORDER) > _SEEN_IDS_MAX:
+                _SEEN_IDS.discard(_SEEN_ORDER.popleft())
+            bucket = _bucket_for(_hour(r[_CREATED] or datetime.utcnow()))
+            if bucket is None:
+                continue
+            bucket.articles += 1
+            for stem, surface in keywords(r[_TITLE], r[_DESCRIPTION]).items():
+                bucket.sketch.add(stem)
+                bucket.heavy.add(stem)
+                known = _SURFACE.get(stem)
+                if known is None or len(surface) < len(known):
+                    _SURFACE[stem] = surface
+            added += 1
+    return added
+
+
+def warm() -> None:
+    """Fill the buckets from the articles of the last TRENDING_MAX_HOURS."""
+    global _WARMED
+    from sqlalchemy import select
+    from app.database import read_engine
+    from app.hot_index import COLUMNS
+    from app.models import News
+    since = _hour(datetime.utcnow()) - timedelta(hours=TRENDING_MAX_HOURS - 1)
+    with read_engine.connect() as conn:
+        result = conn.execution_options(yield_per=1000).execute(
+            select(*COLUMNS).where(News.created_at >= since).order_by(News.id)
+        )
+        count = sum(observe([tuple(r) for r in batch]) for batch in result.partitions())
+    _WARMED = True
+    logger.info(f"Trending warmed from {count} articles")
+
+
+def trending(window_hours: int, limit: int = 20) -> dict:
+    if not _WARMED:
+        warm()
+    window_hours = max(1, min(window_hours, TRENDING_MAX_HOURS))
+    start = _hour(datetime.utcnow()) - timedelta(hours=window_hours - 1)
+    with _LOCK:
+        buckets = [b for b in _BUCKETS if b.hour >= start]
+        candidates = set().union(*(b.heavy.keys() for b in buckets)) if buckets else set()
+        scored = [(sum(b.sketch.estimate(stem) for b in buckets), stem) for stem in candidates]
+        scored.sort(reverse=True)
+        return {
+            "window_hours": window_hours,
+            "articles": sum(b.articles for b in buckets),
+            "keywords": [
+                {"keyword": _SURFACE.get(stem, stem), "count": count}
+                for count, stem in scored[:limit]
+            ],
+        }
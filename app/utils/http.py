@@ -0,0 +1,38 @@
+import ipaddress
+import socket
+from urllib.parse import urlparse
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept-Language": "ta,en;q=0.8",
+}
+
+
+def referer_headers(url: str) -> dict:
+    """DEFAULT_HEADERS plus a same-site Referer, which reduces 403s on article pages."""
+    headers = dict(DEFAULT_HEADERS)
+    try:
+        parsed = urlparse(url)
+        headers["Referer"] = f"{parsed.scheme}://{parsed.netloc}/"
+    except Exception:
+        pass
+    return headers
+
+
+def check_public_url(url: str) -> None:
+    """Raise ValueError unless `url` is http(s) and its host resolves only to
+    public addresses. Used before fetching URLs that came from scraped pages,
+    so they cannot reach loopback, private or link-local (metadata) services."""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError(f"refusing non-http(s) URL {url!r}")
+    try:
+        infos = socket.getaddrinfo(parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80))
+    except socket.gaierror as e:
+        raise ValueError(f"cannot resolve {parsed.hostname}: {e}")
+    for info in infos:
+        ip = ipaddress.ip_address(info[4][0].split("%")[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"refusing non-public address {ip} for {parsed.hostname}")
@@ -0,0 +1,36 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def try_acquire(self, n: float = 1.0) -> float:
+        """Take `n` tokens if available and return 0; otherwise return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= n:
+                self._tokens -= n
+                return 0.0
+            return (n - self._tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def acquire(self, n: float = 1.0) -> None:
+        """Block until `n` tokens are available (requests larger than `burst` wait for a full bucket)."""
+        n = min(n, self.burst)
+        while True:
+            wait_s = self.try_acquire(n)
+            if not wait_s:
+                return
+            time.sleep(min(wait_s, 1.0))
@@ -0,0 +1,13 @@
+"""Term rules shared by the summarizer and trending keywords.
+
+Kept free of heavy imports so the API process can load trending without
+pulling in the summarizer's NumPy path.
+"""
+
+# Code points kept per term; Tamil vowel signs count, so this is ~3-4 letters
+STEM_LENGTH = 6
+STOPWORDS = {
+    "மற்றும்", "இந்த", "அந்த", "என்று", "என", "ஒரு", "இது", "அது", "மேலும்", "உள்ள",
+    "என்ற", "பல", "அவர்", "அவர்கள்", "இருந்து", "போது", "வரை", "பின்னர்", "தான்", "கூறினார்",
+    "the", "a", "an", "and", "of", "to", "in", "is", "for", "on", "with", "that", "was",
+}
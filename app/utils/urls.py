@@ -0,0 +1,72 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click, never select the article
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "yclid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "referrer", "cmpid", "ito", "ncid", "ocid", "_ga",
+    "amp", "outputtype",
+}
+_TRACKING_PREFIXES = ("utm_", "at_", "ns_", "pk_", "mtm_")
+_AMP_CACHE = re.compile(r"^[a-z0-9-]+\.cdn\.ampproject\.org$")
+_CANONICAL_LINK = re.compile(
+    r"<link\b(?=[^>]*\brel=[\"']?canonical[\"'\s>])[^>]*\bhref=[\"']([^\"']+)[\"']",
+    re.IGNORECASE,
+)
+
+
+def _strip_amp(path: str) -> str:
+    if path.endswith("/amp") or path.endswith("/amp/"):
+        path = path[: path.rstrip("/").rfind("/amp")] or "/"
+    elif path.startswith("/amp/"):
+        path = path[4:]
+    elif path.endswith(".amp"):
+        path = path[:-4]
+    elif path.endswith(".amp.html"):
+        path = path[:-9] + ".html"
+    return path.replace("/amp/", "/")
+
+
+def canonicalize(url: str) -> str:
+    """Stable key for an article URL: https, lower-case host without www.,
+    no default port, tracking parameters, AMP variants, fragment or trailing slash."""
+    if not url:
+        return url
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    if parts.scheme not in ("http", "https", ""):
+        return url.strip()
+    host = (parts.hostname or "").lower()
+    path = parts.path or "/"
+    # Google AMP cache: https://www-site-com.cdn.ampproject.org/c/s/www.site.com/path
+    if _AMP_CACHE.match(host):
+        rest = re.sub(r"^/(?:[a-z]/)+(?:s/)?", "", path)
+        host, _, path = rest.partition("/")
+        host = host.lower()
+        path = "/" + path
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("amp."):
+        host = host[4:]
+    port = parts.port
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    path = _strip_amp(re.sub(r"/{2,}", "/", path))
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith(_TRACKING_PREFIXES)
+    ]
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+def canonical_link(html: bytes | str) -> str | None:
+    """href of <link rel="canonical"> in the page head, if any."""
+    if isinstance(html, bytes):
+        html = html[:200_000].decode("utf-8", "ignore")
+    head = html.split("</head>", 1)[0]
+    m = _CANONICAL_LINK.search(head)
+    return m.group(1).strip() if m else None
@@ -0,0 +1,71 @@
+"""Benchmark the fast feed parser against feedparser on recorded feeds.
+
+    python bench_feed_parser.py --record   # download every RSS_FEEDS_ALL feed into fixtures/feeds/
+    python bench_feed_parser.py            # compare both parsers on the recorded files
+"""
+import os
+import re
+import sys
+import time
+import feedparser
+import requests
+from app.feed_parser import FastParseError, parse_feed
+from app.tamil_scraper import DEFAULT_HEADERS, RSS_FEEDS_ALL, extract_entry_link
+
+FIXTURE_DIR = os.path.join("fixtures", "feeds")
+
+
+def slug(url: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9]+", "_", url.split("://", 1)[-1]).strip("_")[:120] + ".xml"
+
+
+def record():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for source, urls in RSS_FEEDS_ALL.items():
+        for url in urls:
+            try:
+                r = requests.get(url, headers=DEFAULT_HEADERS, timeout=20)
+                with open(os.path.join(FIXTURE_DIR, slug(url)), "wb") as f:
+                    f.write(r.content)
+                print(f"{source}: {url} -> HTTP {r.status_code}, {len(r.content)} bytes")
+            except Exception as e:
+                print(f"{source}: {url} -> failed: {e}")
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def bench():
+    files = sorted(os.listdir(FIXTURE_DIR)) if os.path.isdir(FIXTURE_DIR) else []
+    if not files:
+        print(f"No fixtures in {FIXTURE_DIR}; run with --record first.")
+        return
+    total_fast = total_fp = 0.0
+    print(f"{'feed':60} {'entries':>9} {'feedparser ms':>14} {'fast ms':>8} {'speedup':>8} links")
+    for name in files:
+        with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+            data = f.read()
+        t_fp, fp = best_of(lambda: feedparser.parse(data).entries)
+        try:
+            t_fast, fast = best_of(lambda: parse_feed(data))
+        except FastParseError as e:
+            print(f"{name[:60]:60} {'-':>9} {t_fp * 1000:14.2f} {'fallback':>8}  ({e})")
+            total_fast += t_fp
+            total_fp += t_fp
+            continue
+        same = [extract_entry_link(e) for e in fp] == [extract_entry_link(e) for e in fast]
+        total_fast += t_fast
+        total_fp += t_fp
+        print(f"{name[:60]:60} {len(fast):>4}/{len(fp):<4} {t_fp * 1000:14.2f} {t_fast * 1000:8.2f} "
+              f"{t_fp / t_fast if t_fast else 0:7.1f}x {'same' if same else 'DIFFERENT'}")
+    print(f"total: feedparser {total_fp * 1000:.1f} ms, fast {total_fast * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    record() if "--record" in sys.argv else bench()
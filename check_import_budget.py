@@ -0,0 +1,49 @@
+"""Check that importing the API app stays cheap.
+
+Fails if `import app.main` pulls in the scraping/LLM stack or takes longer
+than IMPORT_BUDGET_MS. Run from the repository root:
+
+    python check_import_budget.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "2000"))
+# Modules only the scheduler/scraper should load
+HEAVY_MODULES = (
+    "app.tamil_scraper", "feedparser", "bs4", "requests",
+    "google.genai", "deep_translator", "PIL", "numpy", "apscheduler",
+)
+
+PROBE = f"""
+import json, sys, time
+t = time.perf_counter()
+import app.main
+ms = (time.perf_counter() - t) * 1000
+print(json.dumps({{"ms": ms, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def main() -> int:
+    env = dict(os.environ, ENABLE_SCHEDULER="0")
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, env=env)
+    if out.returncode != 0:
+        print(out.stderr)
+        return 1
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    ok = True
+    if result["loaded"]:
+        print(f"❌ import app.main loaded heavy modules: {', '.join(result['loaded'])}")
+        ok = False
+    if result["ms"] > IMPORT_BUDGET_MS:
+        print(f"❌ import app.main took {result['ms']:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+        ok = False
+    if ok:
+        print(f"✅ import app.main took {result['ms']:.0f} ms, no heavy modules loaded")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,22 @@
-from collections import Counter
+import sys
+from sqlalchemy import func
 from app.database import SessionLocal
 from app.models import News
+from app import stats
 
+# Reads the maintained aggregates; pass --exact to count with a GROUP BY instead
 session = SessionLocal()
 try:
-    rows = session.query(News.source, News.url).all()
-    c = Counter(src for src, _ in rows)
-    print('Total rows:', len(rows))
-    for src, n in c.most_common():
+    if "--exact" in sys.argv:
+        counts = session.query(News.source, func.count(News.id)).group_by(News.source).order_by(func.count(News.id).desc()).all()
+    else:
+        counts = [(s["source"], s["total"]) for s in stats.stats(session)["sources"]]
+    print('Total rows:', sum(n for _, n in counts))
+    for src, n in counts:
         print(f'{src}: {n}')
     # Show a few sample URLs per source
-    for src in list(c.keys())[:5]:
-        urls = [u for s,u in rows if s==src][:5]
+    for src, _ in counts[:5]:
+        urls = [u for (u,) in session.query(News.url).filter(News.source == src).limit(5)]
         print(f'Examples for {src}:')
         for u in urls:
             print('  ', u)
@@ -1,4 +1,5 @@
 import React from 'react'
+import { imageUrl } from '../lib/api'
 
 export default function NewsCard({ item, variant = 'list' }) {
   const date = item.published_at || item.created_at
@@ -18,7 +19,9 @@ export default function NewsCard({ item, variant = 'list' }) {
     }
   }, [d])
 
-  const [imgOk, setImgOk] = React.useState(true)
+  // proxy thumbnail first, then the publisher's original, then the placeholder
+  const [imgStage, setImgStage] = React.useState(0)
+  const imgSrc = imgStage === 0 ? imageUrl(item.id, variant === 'grid' ? 640 : 320) : item.image_url
   const [expanded, setExpanded] = React.useState(false)
 
   const relTimeTa = (dt) => {
@@ -74,13 +77,13 @@ export default function NewsCard({ item, variant = 'list' }) {
   return (
     <article className={`news-card ${variant}`}>
       <a href={item.url} target="_blank" rel="noreferrer" className="thumb-wrap">
-        {item.image_url && imgOk ? (
+        {item.image_url && imgStage < 2 ? (
           <img
             className={`thumb ${variant}`}
-            src={item.image_url}
+            src={imgSrc}
             alt={item.title}
             loading="lazy"
-            onError={() => setImgOk(false)}
+            onError={() => setImgStage((s) => s + 1)}
           />
         ) : (
           <div className="thumb placeholder" aria-hidden="true"></div>
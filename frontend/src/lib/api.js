@@ -24,6 +24,11 @@ export function getNews(limit = 50, lang = 'ta') {
   return http(`/news/?${p.toString()}`)
 }
 
+// Resized, cached copy of an article image served by the backend image proxy
+export function imageUrl(id, width = 640) {
+  return `${base}/images/${id}?w=${width}`
+}
+
 export function triggerFetch() {
   return http('/admin/fetch', { method: 'POST' })
 }
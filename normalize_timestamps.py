@@ -1,8 +1,11 @@
 import logging
+import sys
 from datetime import timezone
 from typing import Optional
 
-from app.database import SessionLocal
+from sqlalchemy import text
+
+from app.database import BACKFILL_BATCH, SessionLocal, engine, id_ranges
 from app.models import News
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s: %(message)s")
@@ -18,7 +21,26 @@ def make_utc(dt) -> Optional[object]:
     except Exception:
         return dt
 
-def main():
+def normalize_sql(batch_size: int = BACKFILL_BATCH) -> int:
+    """Backfill published_at from created_at with one UPDATE per id range.
+    Timestamps are stored as naive UTC, so the per-row UTC conversion of the
+    ORM path changes nothing here and is not repeated."""
+    updated = 0
+    with engine.connect() as conn:
+        for lo, hi in id_ranges(conn, batch_size):
+            res = conn.execute(
+                text(
+                    "UPDATE news SET published_at = created_at "
+                    "WHERE id BETWEEN :lo AND :hi AND published_at IS NULL AND created_at IS NOT NULL"
+                ),
+                {"lo": lo, "hi": hi},
+            )
+            conn.commit()
+            updated += max(res.rowcount or 0, 0)
+    return updated
+
+def normalize_orm():
+    """Row-by-row fallback (python normalize_timestamps.py --orm)."""
     db = SessionLocal()
     updated = 0
     try:
@@ -48,5 +70,16 @@ def main():
     finally:
         db.close()
 
+def main():
+    if "--orm" in sys.argv:
+        normalize_orm()
+        return
+    try:
+        updated = normalize_sql()
+        logger.info(f"✅ Normalization complete. Rows updated: {updated}")
+    except Exception as e:
+        logger.error(f"❌ Failed to normalize timestamps: {e}")
+        raise
+
 if __name__ == "__main__":
     main()
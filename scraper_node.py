@@ -0,0 +1,56 @@
+"""Run a standalone scraper node that shares RSS_FEEDS with other nodes.
+
+Each node heartbeats, claims the feeds it owns on the consistent-hash ring
+(see app/sharding.py) and polls only those. Start several on one machine to
+try it out, all pointing at the same DATABASE_URL:
+
+    SCRAPER_NODE_ID=a python scraper_node.py
+    SCRAPER_NODE_ID=b python scraper_node.py
+    python scraper_node.py --once      # one cycle, then exit
+"""
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault("SCRAPER_SHARDING", "1")
+
+from app.database import Base, SessionLocal, engine, ensure_schema
+from app import models  # noqa: F401  (registers tables)
+from app import sharding
+from app.scheduler import _schedule_minutes, job
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s: %(message)s")
+logger = logging.getLogger("scraper_node")
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    ensure_schema()
+    interval = _schedule_minutes() * 60
+    logger.info(f"🚀 Scraper node {sharding.NODE_ID} polling every {interval}s")
+    stop_heartbeats = sharding.start_heartbeats()
+    try:
+        while True:
+            started = time.time()
+            try:
+                job()
+            except Exception as e:
+                logger.error(f"❌ Cycle failed: {e}")
+            if "--once" in sys.argv:
+                break
+            time.sleep(max(1.0, interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_heartbeats.set()
+        db = SessionLocal()
+        try:
+            sharding.leave(db)
+        finally:
+            db.close()
+        logger.info(f"👋 Node {sharding.NODE_ID} left the ring")
+
+
+if __name__ == "__main__":
+    main()
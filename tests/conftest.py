@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app binds its engine at import time; point it at a throwaway SQLite file
+_TMP = tempfile.mkdtemp(prefix="tamil-news-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_TMP, "test.db")
+os.environ["CONTENT_STORE_DIR"] = os.path.join(_TMP, "content")
+os.environ["SCRAPE_PARSE_WORKERS"] = "0"
+os.environ["ENABLE_SCHEDULER"] = "0"
+os.environ.pop("SKIP_SUMMARY", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables."""
+    from app.database import Base, SessionLocal, engine
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
@@ -0,0 +1,179 @@
+import asyncio
+import json
+
+import pytest
+
+from app import admission
+
+
+def _scope(path="/news/", query=b"", xff=None, client="10.0.0.1"):
+    headers = [(b"x-forwarded-for", xff.encode())] if xff else []
+    return {"type": "http", "method": "GET", "path": path, "query_string": query,
+            "headers": headers, "client": (client, 50000)}
+
+
+class _App:
+    """Inner ASGI app that can be held open to fill a class's slots."""
+
+    def __init__(self):
+        self.release = None
+
+    async def __call__(self, scope, receive, send):
+        if self.release is not None:
+            await self.release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _request(middleware, scope):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    await middleware(scope, receive, send)
+    start = sent[0]
+    headers = dict(start["headers"])
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], headers.get(b"retry-after"), body
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Per-client buckets on, fresh gates and buckets for every test."""
+    def configure(rate=1.0, burst=3.0, trust_proxy=False, hops=1, gates=None):
+        monkeypatch.setattr(admission, "ADMISSION_CONTROL", True)
+        monkeypatch.setattr(admission, "_RATE_LIMITING", rate is not None)
+        monkeypatch.setattr(admission, "ADMISSION_RATE", rate or 0.0)
+        monkeypatch.setattr(admission, "ADMISSION_BURST", burst)
+        monkeypatch.setattr(admission, "ADMISSION_TRUST_PROXY", trust_proxy)
+        monkeypatch.setattr(admission, "ADMISSION_PROXY_HOPS", hops)
+        monkeypatch.setattr(admission, "_CLIENTS", admission.OrderedDict())
+        fresh = {name: admission._Gate(limit, queue) for name, (limit, queue, _) in admission.CLASSES.items()}
+        fresh.update(gates or {})
+        monkeypatch.setattr(admission, "_GATES", fresh)
+        return fresh
+    return configure
+
+
+def test_classify():
+    assert admission.classify("/admin/stats", b"") == "admin"
+    assert admission.classify("/images/12", b"w=320") == "images"
+    assert admission.classify("/news/", b"lang=en") == "translate"
+    assert admission.classify("/news/", b"lang=en&fields=id,title") == "read"
+    assert admission.classify("/news/", b"") == "read"
+
+
+def test_forged_forwarded_for_lands_in_the_same_bucket(limits):
+    limits(rate=0.001, burst=3, trust_proxy=True)
+    mw = admission.AdmissionControl(_App())
+
+    async def go():
+        statuses = []
+        for i in range(5):
+            # Client-chosen leading entry; the proxy appends the address it saw
+            scope = _scope(xff=f"198.51.100.{i}, 203.0.113.7", client="10.0.0.2")
+            statuses.append((await _request(mw, scope))[0])
+        return statuses
+
+    assert _run(go()) == [200, 200, 200, 429, 429]
+    assert list(admission._CLIENTS) == ["203.0.113.7"]
+
+
+def test_client_key_counts_trusted_hops_from_the_right(limits):
+    limits(trust_proxy=True, hops=2)
+    assert admission._client_key(_scope(xff="1.1.1.1, 203.0.113.7, 10.0.0.9")) == "203.0.113.7"
+    # Fewer entries than trusted proxies: the header was not built by them
+    assert admission._client_key(_scope(xff="1.1.1.1", client="10.0.0.3")) == "10.0.0.3"
+    limits(trust_proxy=False)
+    assert admission._client_key(_scope(xff="1.1.1.1", client="10.0.0.3")) == "10.0.0.3"
+
+
+def test_rate_limit_returns_429_with_retry_after(limits):
+    limits(rate=1.0, burst=1.0)
+    mw = admission.AdmissionControl(_App())
+
+    async def go():
+        first = await _request(mw, _scope())
+        second = await _request(mw, _scope())
+        return first, second
+
+    first, second = _run(go())
+    assert first[0] == 200
+    assert second[0] == 429 and second[1] == b"1"
+    assert json.loads(second[2]) == {"detail": "Too many requests"}
+
+
+def test_retry_after_is_bounded_for_tiny_rates(limits):
+    limits(rate=1e-9, burst=1.0)
+    mw = admission.AdmissionControl(_App())
+
+    async def go():
+        await _request(mw, _scope())
+        return await _request(mw, _scope())
+
+    status, retry_after, _ = _run(go())
+    assert status == 429 and retry_after == b"3600"
+
+
+def test_cost_above_burst_is_charged_as_a_full_bucket(limits):
+    # A translating read costs 5 tokens; with a burst of 2 it must still be servable
+    limits(rate=1.0, burst=2.0)
+    mw = admission.AdmissionControl(_App())
+    status, _, _ = _run(_request(mw, _scope(query=b"lang=en")))
+    assert status == 200
+
+
+def test_without_per_client_limits_only_class_limits_apply(limits):
+    limits(rate=None)
+    mw = admission.AdmissionControl(_App())
+
+    async def go():
+        return [(await _request(mw, _scope()))[0] for _ in range(50)]
+
+    assert set(_run(go())) == {200}
+    assert len(admission._CLIENTS) == 0
+
+
+def test_full_class_sheds_with_503_and_leaves_other_classes_alone(limits, monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_QUEUE_TIMEOUT", 0.05)
+    limits(rate=None, gates={"translate": admission._Gate(1, 1)})
+    app = _App()
+    mw = admission.AdmissionControl(app)
+
+    async def go():
+        app.release = asyncio.Event()
+        holder = asyncio.create_task(_request(mw, _scope(query=b"lang=en")))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(_request(mw, _scope(query=b"lang=hi")))
+        await asyncio.sleep(0.01)
+        # Slot taken and queue full: shed at once
+        overflow = await _request(mw, _scope(query=b"lang=te"))
+        # The queued request gives up after ADMISSION_QUEUE_TIMEOUT
+        timed_out = await queued
+        app.release.set()
+        read = await _request(mw, _scope())
+        return overflow, timed_out, await holder, read
+
+    overflow, timed_out, held, read = _run(go())
+    assert overflow[0] == 503 and int(overflow[1]) >= 1
+    assert json.loads(overflow[2]) == {"detail": "Server busy, retry later"}
+    assert timed_out[0] == 503
+    assert held[0] == 200 and read[0] == 200
+    stats = admission.stats()["classes"]["translate"]
+    assert stats["shed"] == 2 and stats["admitted"] == 1
+
+
+def test_503_retry_after_follows_service_time(limits):
+    gate = admission._Gate(2, 10)
+    gate.service_s = 3.0
+    gate.waiting = 3
+    # (waiting + 1) * service time / slots
+    assert gate.retry_after() == 6
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+from collections import OrderedDict
+
+import pytest
+
+from app import content_store
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Another process that stores one article and keeps its segment open until stdin closes
+WRITER = """
+import sys
+from app import content_store
+content_store.put("https://other.example.com/a", "other process text")
+print("ready", flush=True)
+sys.stdin.read()
+content_store.put("https://other.example.com/b", "written after the other store evicted")
+print(content_store.get_text("https://other.example.com/b"), flush=True)
+"""
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(content_store, "CONTENT_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(content_store, "CONTENT_SEGMENT_BYTES", 4096)
+    monkeypatch.setattr(content_store, "CONTENT_STORE_MAX_BYTES", 16384)
+    for name, value in (("_INDEX", {}), ("_SCANNED", {}), ("_MAPS", {}), ("_ACTIVE", None),
+                        ("_SIZE", 0), ("_LOADED", False)):
+        monkeypatch.setattr(content_store, name, value)
+    yield content_store
+    if content_store._ACTIVE is not None:
+        content_store._ACTIVE[1].close()
+
+
+def _fill(store, prefix, n):
+    for i in range(n):
+        store.put(f"https://example.com/{prefix}/{i}", os.urandom(600).hex())
+
+
+def test_roundtrip_and_lookup_by_url_variant(store):
+    store.put("https://www.example.com/a?utm_source=x", "தமிழ் செய்தி", canonical="https://example.com/a")
+    assert store.get_text("https://example.com/a") == "தமிழ் செய்தி"
+    assert store.get_canonical("http://example.com/a/") == "https://example.com/a"
+    assert store.get_text("https://example.com/missing") is None
+
+
+def test_eviction_keeps_segments_other_processes_still_write(store, tmp_path):
+    env = dict(os.environ, CONTENT_STORE_DIR=str(tmp_path), CONTENT_SEGMENT_BYTES="4096")
+    other = subprocess.Popen([sys.executable, "-c", WRITER], cwd=ROOT, env=env,
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert other.stdout.readline().strip() == "ready"
+        (other_segment,) = os.listdir(tmp_path)
+        # Far past the budget: every sealed segment of ours goes, theirs stays
+        _fill(store, "mine", 120)
+        segments = os.listdir(tmp_path)
+        assert other_segment in segments
+        assert len(segments) < 120 * 1200 // 4096
+        assert store.get_text("https://other.example.com/a") == "other process text"
+        out, _ = other.communicate("", timeout=30)
+        assert out.strip() == "written after the other store evicted"
+    finally:
+        if other.poll() is None:
+            other.kill()
+
+
+def test_segment_of_a_finished_writer_can_be_evicted(store, tmp_path):
+    env = dict(os.environ, CONTENT_STORE_DIR=str(tmp_path), CONTENT_SEGMENT_BYTES="4096")
+    subprocess.run([sys.executable, "-c", WRITER], cwd=ROOT, env=env, input="", text=True,
+                   capture_output=True, check=True, timeout=30)
+    (other_segment,) = os.listdir(tmp_path)
+    _fill(store, "mine", 120)
+    assert other_segment not in os.listdir(tmp_path)
@@ -0,0 +1,36 @@
+from app import crud, stats
+from app.models import News, NewsSummary, TranslationStats
+
+
+def _news(db, n):
+    for i in range(n):
+        db.add(News(title=f"t{i}", url=f"https://example.com/{i}", source="Test", language="ta"))
+    db.commit()
+    return [row.id for row in db.query(News).order_by(News.id)]
+
+
+def _totals(db):
+    return {s.lang: s.total for s in db.query(TranslationStats)}
+
+
+def test_bulk_set_summaries_counts_only_inserts(db):
+    a, b = _news(db, 2)
+    crud.bulk_set_summaries(db, [
+        {"news_id": a, "lang": "en", "text": "one", "backend": "stub"},
+        {"news_id": b, "lang": "en", "text": "two", "backend": "stub"},
+    ])
+    db.commit()
+    assert _totals(db) == {"en": 2}
+
+    # One overwrite and one new language
+    written = crud.bulk_set_summaries(db, [
+        {"news_id": a, "lang": "en", "text": "one again", "backend": "stub"},
+        {"news_id": a, "lang": "hi", "text": "ek", "backend": "stub"},
+    ])
+    db.commit()
+    assert written == 2
+    assert _totals(db) == {"en": 2, "hi": 1}
+    assert db.get(NewsSummary, (a, "en")).text == "one again"
+    # Nothing for reconcile to correct
+    stats.reconcile(db)
+    assert _totals(db) == {"en": 2, "hi": 1}
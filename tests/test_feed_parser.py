@@ -0,0 +1,118 @@
+import calendar
+import time
+
+import feedparser
+import pytest
+
+from app import feed_parser, parse_pool
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"
+     xmlns:content="http://purl.org/rss/1.0/modules/content/" xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel><title>செய்திகள்</title>
+<item>
+  <title>மோடி &amp; ஸ்டாலின் சந்திப்பு</title>
+  <link>https://example.com/news/1</link>
+  <description><![CDATA[<p>CDATA உள்ளடக்கம் <b>முக்கிய</b> செய்தி</p>]]></description>
+  <pubDate>Mon, 19 Oct 2026 10:30:00 +0530</pubDate>
+  <guid>news-1</guid>
+  <media:content url="https://img.example.com/1.jpg" medium="image"/>
+</item>
+<item>
+  <title>&#x0BA4;மிழ் &quot;மேற்கோள்&quot;</title>
+  <link>https://example.com/news/2</link>
+  <description>சென்னை மழை &amp; வெள்ளம்</description>
+  <dc:date>2026-10-19T05:00:00Z</dc:date>
+  <enclosure url="https://img.example.com/2.jpg" type="image/jpeg" length="1"/>
+</item>
+<item>
+  <title>Group media</title>
+  <link>https://example.com/news/3</link>
+  <pubDate>Sun, 18 Oct 2026 23:59:59 GMT</pubDate>
+  <media:group><media:content url="https://img.example.com/3.jpg"/><media:thumbnail url="https://img.example.com/3t.jpg"/></media:group>
+  <content:encoded><![CDATA[<p>Full body</p>]]></content:encoded>
+</item>
+</channel></rss>""".encode("utf-8")
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom</title>
+<entry><title>Atom one</title><link rel="alternate" href="https://example.com/atom/1"/><id>urn:1</id>
+  <published>2026-10-19T08:15:00+05:30</published><updated>2026-10-19T09:00:00Z</updated><summary>s</summary></entry>
+<entry><title>Atom two</title><link href="https://example.com/atom/2"/><id>urn:2</id>
+  <updated>2026-10-18T22:00:00Z</updated></entry>
+</feed>""".encode("utf-8")
+
+
+def _timestamp(entry):
+    # What the scraper keys on (parse_pool.parse_feed): published, else updated
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    return calendar.timegm(parsed) if parsed else None
+
+
+def _view(entry):
+    return {
+        "title": entry.get("title"),
+        "link": entry.get("link"),
+        "id": entry.get("id"),
+        "timestamp": _timestamp(entry),
+        "media": [m["url"] for m in entry.get("media_content") or []],
+        "enclosures": [e["href"] for e in entry.get("enclosures") or []],
+    }
+
+
+@pytest.mark.parametrize("data", [RSS, ATOM], ids=["rss", "atom"])
+def test_matches_feedparser_on_scraper_fields(data):
+    fast = feed_parser.parse_feed(data)
+    slow = feedparser.parse(data).entries
+    assert [_view(e) for e in fast] == [_view(e) for e in slow]
+
+
+def test_cdata_entities_and_dates():
+    first, second, third = feed_parser.parse_feed(RSS)
+    assert first["title"] == "மோடி & ஸ்டாலின் சந்திப்பு"
+    assert first["summary"] == "<p>CDATA உள்ளடக்கம் <b>முக்கிய</b> செய்தி</p>"
+    assert second["title"] == 'தமிழ் "மேற்கோள்"'
+    assert second["summary"] == "சென்னை மழை & வெள்ளம்"
+    # +0530 and Z both end up as UTC struct_times, like feedparser's
+    assert calendar.timegm(first["published_parsed"]) == calendar.timegm((2026, 10, 19, 5, 0, 0))
+    assert calendar.timegm(second["published_parsed"]) == calendar.timegm((2026, 10, 19, 5, 0, 0))
+    assert third["media_thumbnail"] == [{"url": "https://img.example.com/3t.jpg"}]
+    assert third["content"][0]["value"] == "<p>Full body</p>"
+
+
+def test_stops_after_a_run_of_old_items():
+    items = "".join(
+        f"<item><title>{i}</title><link>https://example.com/{i}</link>"
+        f"<pubDate>Mon, 19 Oct 2026 {23 - i:02d}:00:00 GMT</pubDate></item>"
+        for i in range(10)
+    )
+    data = f"<rss version='2.0'><channel>{items}</channel></rss>".encode()
+    # Same clock as the scraper's LAST_PUBDATE: mktime of the item's struct_time
+    since = time.mktime(feed_parser.parse_feed(data)[3]["published_parsed"])
+    entries = feed_parser.parse_feed(data, since=since)
+    # Items 0-2 are newer; 3 is equal, 4 and 5 older: three stale in a row ends the read
+    assert [e["title"] for e in entries] == ["0", "1", "2", "3", "4", "5"]
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"<!DOCTYPE html><html><body>Not a feed</body></html>",
+    b"<html><head></head></html>",
+    b"<rss version='2.0'><channel><item><title>AT&T</title></item></channel></rss>",
+    b"<rss version='2.0'><channel><item><title>unclosed</channel></rss>",
+])
+def test_rejects_what_it_cannot_parse(data):
+    with pytest.raises(feed_parser.FastParseError):
+        feed_parser.parse_feed(data)
+
+
+def test_malformed_feed_falls_back_to_feedparser():
+    data = (
+        b"<rss version='2.0'><channel><item><title>AT&T deal</title>"
+        b"<link>https://example.com/att</link></item></channel></rss>"
+    )
+    with pytest.raises(feed_parser.FastParseError):
+        feed_parser.parse_feed(data)
+    entries = parse_pool._entries(data, None, fast=True)
+    assert [e["link"] for e in entries] == ["https://example.com/att"]
+    assert entries[0]["title"].startswith("AT&T")
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app import hot_index
+from app.database import engine
+
+
+@pytest.fixture
+def index(db, monkeypatch):
+    monkeypatch.setattr(hot_index, "HOT_INDEX_CHECK_SECONDS", 0)
+    monkeypatch.setattr(hot_index, "HOT_INDEX_OVERLAP_SECONDS", 30)
+    hot_index.invalidate()
+    yield hot_index
+    hot_index.invalidate()
+
+
+def _insert(id, title, created, updated=None, source="Test"):
+    """Write a row the way another process would: straight to the table, no push()."""
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO news (id, title, url, source, language, created_at, updated_at) "
+                "VALUES (:id, :title, :url, :source, 'ta', :created, :updated)"
+            ),
+            {"id": id, "title": title, "url": f"https://example.com/{id}", "source": source,
+             "created": created, "updated": updated or created},
+        )
+
+
+def _titles(rows):
+    return [r[1] for r in rows]
+
+
+def test_sync_picks_up_rows_inserted_by_other_writers(index):
+    now = datetime.utcnow()
+    _insert(1, "first", now - timedelta(hours=2))
+    assert _titles(index.latest(10)) == ["first"]
+
+    _insert(2, "second", now - timedelta(hours=1))
+    assert _titles(index.latest(10)) == ["second", "first"]
+    assert _titles(index.latest(10, "Test")) == ["second", "first"]
+
+
+def test_sync_picks_up_lower_id_committed_late(index):
+    old = datetime.utcnow() - timedelta(hours=3)
+    _insert(1, "a", old)
+    _insert(3, "c", old + timedelta(minutes=2))
+    assert _titles(index.latest(10)) == ["c", "a"]
+
+    # id 2 was assigned before id 3 but commits after the index saw id 3, with an
+    # updated_at outside the overlap window: only the id-window count reveals it
+    _insert(2, "b", old + timedelta(minutes=1))
+    assert _titles(index.latest(10)) == ["c", "b", "a"]
+
+
+def test_sync_picks_up_out_of_band_updates(index):
+    old = datetime.utcnow() - timedelta(hours=3)
+    _insert(1, "a", old)
+    _insert(2, "b", old + timedelta(minutes=1))
+    assert _titles(index.latest(10)) == ["b", "a"]
+
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE news SET title = 'a2', updated_at = :now WHERE id = 1"),
+            {"now": datetime.utcnow()},
+        )
+    assert _titles(index.latest(10)) == ["b", "a2"]
+
+
+def test_update_committed_late_with_older_timestamp(index):
+    old = datetime.utcnow() - timedelta(hours=3)
+    _insert(1, "a", old)
+    assert _titles(index.latest(10)) == ["a"]
+
+    # Two writers: the later updated_at commits first and moves the marker...
+    now = datetime.utcnow()
+    _insert(2, "b", old + timedelta(minutes=1), updated=now)
+    assert _titles(index.latest(10)) == ["b", "a"]
+    # ...then the earlier one lands, below the marker but inside the overlap window
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE news SET title = 'a2', updated_at = :ts WHERE id = 1"),
+            {"ts": now - timedelta(seconds=1)},
+        )
+    assert _titles(index.latest(10)) == ["b", "a2"]
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_api_import_stays_light(tmp_path):
+    # .env may point at PostgreSQL; the probe must not need a driver or a server
+    env = dict(os.environ, DATABASE_URL="sqlite:///" + str(tmp_path / "import.db"))
+    out = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "check_import_budget.py")],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert "heavy modules:" not in out.stdout, out.stdout
+    assert out.returncode == 0, out.stdout + out.stderr
+    assert "no heavy modules loaded" in out.stdout
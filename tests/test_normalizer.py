@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app import normalizer as normalizer_module
+from app.normalizer import EntryNormalizer, _MAX_MISSES
+
+
+def _entry(i, dated=True):
+    entry = {"title": f"t{i}", "link": f"https://example.com/{i}", "description": "d"}
+    if dated:
+        entry["published"] = "Mon, 19 Oct 2026 10:30:00 +0530"
+    return entry
+
+
+@pytest.fixture
+def learned(monkeypatch):
+    """Count how often a profile is (re)learned."""
+    calls = []
+    real = normalizer_module._learn
+
+    def learn(entry):
+        calls.append(entry.get("link"))
+        return real(entry)
+
+    monkeypatch.setattr(normalizer_module, "_learn", learn)
+    return calls
+
+
+def test_compiled_profile_extracts_fields(learned):
+    n = EntryNormalizer()
+    item = n.normalize("S", _entry(1))
+    assert item["url"] == "https://example.com/1"
+    assert item["published_at"] == datetime(2026, 10, 19, 5, 0, tzinfo=timezone.utc)
+    assert n.profile("S") == {"link": "link", "image": None, "date": "published", "date_format": "rfc822"}
+    n.normalize("S", _entry(2))
+    assert len(learned) == 1
+
+
+def test_occasional_misses_keep_the_profile(learned):
+    n = EntryNormalizer()
+    n.normalize("S", _entry(0))
+    for i in range(1, 4 * _MAX_MISSES):
+        # Every other entry has an unparseable date
+        entry = _entry(i)
+        if i % 2:
+            entry["published"] = "yesterday"
+        n.normalize("S", entry)
+    assert len(learned) == 1
+
+
+def test_misses_in_a_row_drop_the_profile(learned):
+    n = EntryNormalizer()
+    n.normalize("S", _entry(0))
+    for i in range(1, _MAX_MISSES + 1):
+        entry = _entry(i)
+        entry["published"] = "yesterday"
+        n.normalize("S", entry)
+    assert n.profile("S") is None
+    n.normalize("S", _entry(99))
+    assert len(learned) == 2
+
+
+def test_dateless_source_keeps_its_profile(learned):
+    n = EntryNormalizer()
+    for i in range(4 * _MAX_MISSES):
+        item = n.normalize("S", _entry(i, dated=False))
+        assert item["url"] == f"https://example.com/{i}"
+        assert item["published_at"] is not None
+    assert n.profile("S")["date"] is None
+    assert len(learned) == 1
@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import summarizer, tamil_scraper
+from app.models import News, SummaryCache
+from app.utils.urls import canonicalize
+
+ARTICLE = (
+    "முதல்வர் மு.க.ஸ்டாலின் இன்று சென்னையில் புதிய மேம்பாலத்தை திறந்து வைத்தார். "
+    "எதிர்க்கட்சித் தலைவர் எடப்பாடி கே.பழனிசாமி இந்த திட்டம் தாமதமானது என்று விமர்சித்தார். "
+    "இசையமைப்பாளர் ஏ.ஆர்.ரஹ்மான் விழாவில் கலந்து கொண்டார். "
+    "மேம்பாலம் போக்குவரத்து நெரிசலை குறைக்கும் என அதிகாரிகள் தெரிவித்தனர்."
+)
+GEMINI_SUMMARY = "சென்னையில் புதிய மேம்பாலம் திறக்கப்பட்டது. இது போக்குவரத்து நெரிசலை குறைக்கும்."
+
+
+def test_initials_do_not_split_sentences():
+    sentences = summarizer.split_sentences(ARTICLE)
+    assert len(sentences) == 4
+    assert sentences[0].startswith("முதல்வர் மு.க.ஸ்டாலின் இன்று")
+    assert "எடப்பாடி கே.பழனிசாமி இந்த" in sentences[1]
+    assert "ஏ.ஆர்.ரஹ்மான் விழாவில்" in sentences[2]
+
+
+def test_sentence_end_without_space_still_splits():
+    assert summarizer.split_sentences("சென்னையில் மழை பெய்தது.பள்ளிகளுக்கு விடுமுறை.") == [
+        "சென்னையில் மழை பெய்தது.",
+        "பள்ளிகளுக்கு விடுமுறை.",
+    ]
+
+
+def test_summary_keeps_names_whole():
+    summary = summarizer.summarize_text(ARTICLE, max_sentences=3, max_chars=1000)
+    assert summary == (
+        "முதல்வர் மு.க.ஸ்டாலின் இன்று சென்னையில் புதிய மேம்பாலத்தை திறந்து வைத்தார். "
+        "எதிர்க்கட்சித் தலைவர் எடப்பாடி கே.பழனிசாமி இந்த திட்டம் தாமதமானது என்று விமர்சித்தார். "
+        "மேம்பாலம் போக்குவரத்து நெரிசலை குறைக்கும் என அதிகாரிகள் தெரிவித்தனர்."
+    )
+    all_sentences = summarizer.summarize_text(ARTICLE, max_sentences=4, max_chars=1000)
+    for name in ("மு.க.ஸ்டாலின்", "கே.பழனிசாமி", "ஏ.ஆர்.ரஹ்மான்"):
+        assert name in all_sentences
+
+
+class _FakeModels:
+    def __init__(self, text=None, error=None):
+        self.text = text
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, model, contents, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise RuntimeError(self.error)
+        return SimpleNamespace(text=self.text)
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    def install(text=None, error=None):
+        models = _FakeModels(text, error)
+        fake = SimpleNamespace(Client=lambda: SimpleNamespace(models=models))
+        monkeypatch.setattr(tamil_scraper, "genai", fake)
+        monkeypatch.setattr(tamil_scraper, "_GENAI_AVAILABLE", True)
+        monkeypatch.setattr(tamil_scraper, "_QUOTA_EXHAUSTED_UNTIL", 0.0)
+        monkeypatch.setattr(tamil_scraper.time, "sleep", lambda s: None)
+        return models
+    return install
+
+
+def _add(db, url, summary):
+    db.add(News(title="t", url=url, canonical_url=canonicalize(url), source="Test", language="ta", summary=summary))
+    db.commit()
+
+
+def test_summarize_with_gemini_returns_first_answer(gemini):
+    models = gemini(text=GEMINI_SUMMARY)
+    assert tamil_scraper.summarize_with_gemini(ARTICLE) == GEMINI_SUMMARY
+    assert models.calls == 1
+
+
+def test_upgrade_replaces_draft_and_caches_by_content(gemini, db):
+    models = gemini(text=GEMINI_SUMMARY)
+    draft = summarizer.summarize_text(ARTICLE)
+    _add(db, "https://example.com/a", draft)
+    _add(db, "https://example.org/b", draft)
+
+    pending = [
+        ("https://example.com/a", ARTICLE, canonicalize("https://example.com/a")),
+        ("https://example.org/b", ARTICLE, canonicalize("https://example.org/b")),
+    ]
+    assert tamil_scraper.upgrade_summaries(pending, db) == 2
+    # Same text, so the second article came from the cache
+    assert models.calls == 1
+    assert db.get(SummaryCache, summarizer.content_hash(ARTICLE)).summary == GEMINI_SUMMARY
+    assert {n.summary for n in db.query(News)} == {GEMINI_SUMMARY}
+
+
+def test_upgrade_stops_asking_after_repeated_failures(gemini, db):
+    models = gemini(error="backend unavailable")
+    pending = []
+    for i in range(5):
+        url = f"https://example.com/{i}"
+        _add(db, url, "draft")
+        pending.append((url, f"{ARTICLE} {i}", canonicalize(url)))
+
+    assert tamil_scraper.upgrade_summaries(pending, db) == 0
+    # Three attempts for each of the first UPGRADE_MAX_MISSES articles, none after
+    assert models.calls == 3 * tamil_scraper.UPGRADE_MAX_MISSES
+    assert {n.summary for n in db.query(News)} == {"draft"}
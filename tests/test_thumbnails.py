@@ -0,0 +1,106 @@
+import ipaddress
+import socket
+
+import pytest
+import requests
+
+from app import thumbnails
+from app.utils.http import check_public_url
+
+
+@pytest.fixture
+def resolve(monkeypatch):
+    """Resolve hostnames from a fixed table instead of DNS."""
+    table = {}
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        try:
+            ip = ipaddress.ip_address(host)
+        except ValueError:
+            if host not in table:
+                raise socket.gaierror("unknown host")
+            ip = ipaddress.ip_address(table[host])
+        family = socket.AF_INET6 if ip.version == 6 else socket.AF_INET
+        return [(family, socket.SOCK_STREAM, 6, "", (str(ip), port))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    return table
+
+
+class _Response:
+    def __init__(self, status=200, headers=None, body=b""):
+        self.status_code = status
+        self.headers = headers or {}
+        self.body = body
+        self.is_redirect = status in (301, 302, 303, 307, 308)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(self.status_code)
+
+    def iter_content(self, chunk_size):
+        yield self.body
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Serve canned responses by URL and record which URLs were requested."""
+    responses, seen = {}, []
+
+    def get(url, **kwargs):
+        assert kwargs.get("allow_redirects") is False
+        seen.append(url)
+        return responses[url]
+
+    monkeypatch.setattr(requests, "get", get)
+    return responses, seen
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1:8000/admin",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.5/x.jpg",
+    "http://[::1]/x.jpg",
+    "file:///etc/passwd",
+    "ftp://example.com/x.jpg",
+])
+def test_check_public_url_rejects_internal_targets(url, resolve):
+    with pytest.raises(ValueError, match="refusing"):
+        check_public_url(url)
+
+
+def test_check_public_url_rejects_names_resolving_inside(resolve):
+    resolve["images.example.com"] = "93.184.216.34"
+    resolve["internal.example.com"] = "192.168.1.10"
+    check_public_url("https://images.example.com/a.jpg")
+    with pytest.raises(ValueError, match="refusing"):
+        check_public_url("https://internal.example.com/a.jpg")
+
+
+def test_download_rechecks_redirect_targets(resolve, fetched):
+    resolve["images.example.com"] = "93.184.216.34"
+    responses, seen = fetched
+    responses["https://images.example.com/a.jpg"] = _Response(
+        302, {"location": "http://169.254.169.254/latest/meta-data/"}
+    )
+    with pytest.raises(ValueError, match="refusing"):
+        thumbnails._download("https://images.example.com/a.jpg")
+    assert seen == ["https://images.example.com/a.jpg"]
+
+
+def test_download_requires_image_content_type(resolve, fetched):
+    resolve["images.example.com"] = "93.184.216.34"
+    responses, _ = fetched
+    responses["https://images.example.com/a.jpg"] = _Response(200, {"content-type": "text/html"}, b"<html>")
+    with pytest.raises(ValueError):
+        thumbnails._download("https://images.example.com/a.jpg")
+
+    responses["https://images.example.com/b.jpg"] = _Response(301, {"location": "/c.jpg"})
+    responses["https://images.example.com/c.jpg"] = _Response(200, {"content-type": "image/jpeg"}, b"\xff\xd8jpeg")
+    assert thumbnails._download("https://images.example.com/b.jpg") == b"\xff\xd8jpeg"
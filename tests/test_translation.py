@@ -0,0 +1,129 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import translation
+from app.translation import Provider, RateLimited, TranslationRouter
+
+
+class _Fake(Provider):
+    def __init__(self, name, delay=0.0, error=None, max_batch=1, max_chars=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.max_batch = max_batch
+        self.max_chars = max_chars
+        self.calls = []
+
+    def translate_batch(self, texts, lang):
+        self.calls.append(list(texts))
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [f"{self.name}:{t}" for t in texts]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable wall clock for cool-downs; perf_counter stays real."""
+    now = [1000.0]
+    monkeypatch.setattr(translation, "time", SimpleNamespace(
+        time=lambda: now[0], perf_counter=time.perf_counter, sleep=time.sleep,
+    ))
+    return now
+
+
+def test_rate_limited_provider_cools_down_then_returns(clock, monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATE_COOLDOWN_SECONDS", 60)
+    limited = _Fake("limited", error=RateLimited("429"))
+    backup = _Fake("backup")
+    router = TranslationRouter([limited, backup])
+
+    assert router.translate("வணக்கம்", "en") == "backup:வணக்கம்"
+    assert router.ranked() == [backup]
+    assert router.translate("நன்றி", "en") == "backup:நன்றி"
+    assert len(limited.calls) == 1
+
+    clock[0] += 61
+    limited.error = None
+    assert limited in router.ranked()
+
+
+def test_repeated_failures_trigger_cool_down(clock, monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATE_MAX_FAILURES", 3)
+    flaky = _Fake("flaky", error=RuntimeError("boom"))
+    router = TranslationRouter([flaky])
+
+    for _ in range(2):
+        router.translate("a", "en")
+        assert router.ranked() == [flaky]
+    router.translate("a", "en")
+    assert router.ranked() == []
+    assert router.translate("a", "en") == ""
+    assert len(flaky.calls) == 3
+
+
+def test_unsampled_provider_does_not_outrank_a_measured_fast_one():
+    fast = _Fake("fast")
+    new = _Fake("new")
+    router = TranslationRouter([new, fast])
+    router.health["fast"].record(True, 50.0)
+    assert router.ranked() == [fast, new]
+    # Failures say nothing about speed: an instant error must not look fast
+    router.health["new"].record(False, 1.0)
+    assert router.ranked()[0] is fast
+    assert router.health["new"].latency_ms is None
+
+
+def test_hedge_starts_second_provider_when_first_is_slow(monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATE_HEDGE_MS", 50)
+    slow = _Fake("slow", delay=1.0)
+    quick = _Fake("quick")
+    router = TranslationRouter([slow, quick])
+
+    started = time.perf_counter()
+    assert router.translate("செய்தி", "en") == "quick:செய்தி"
+    assert time.perf_counter() - started < 0.8
+    assert len(slow.calls) == 1 and len(quick.calls) == 1
+
+
+def test_hedge_does_not_wait_after_a_fast_failure(monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATE_HEDGE_MS", 5000)
+    broken = _Fake("broken", error=RuntimeError("down"))
+    backup = _Fake("backup")
+    router = TranslationRouter([broken, backup])
+
+    started = time.perf_counter()
+    assert router.translate("செய்தி", "en") == "backup:செய்தி"
+    assert time.perf_counter() - started < 1.0
+
+
+def test_hedge_is_not_used_when_first_answers_in_time(monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATE_HEDGE_MS", 500)
+    first = _Fake("first")
+    second = _Fake("second")
+    router = TranslationRouter([first, second])
+    assert router.translate("செய்தி", "en") == "first:செய்தி"
+    assert second.calls == []
+
+
+def test_batches_respect_character_cap():
+    batcher = _Fake("batcher", max_batch=100, max_chars=10)
+    router = TranslationRouter([batcher])
+    texts = ["aaaa", "bbbb", "cccc", "x" * 25, "d"]
+    assert router.translate_many(texts, "en") == [f"batcher:{t}" for t in texts]
+    assert batcher.calls == [["aaaa", "bbbb"], ["cccc"], ["x" * 25], ["d"]]
+
+
+def test_translate_many_falls_back_for_missing_items():
+    primary = _Fake("primary", max_batch=10)
+    fallback = _Fake("fallback")
+    original = primary.translate_batch
+    primary.translate_batch = lambda texts, lang: [
+        "" if t == "b" else out for t, out in zip(texts, original(texts, lang))
+    ]
+    router = TranslationRouter([primary, fallback])
+    assert router.translate_many(["a", "b", ""], "en") == ["primary:a", "fallback:b", ""]
+    assert fallback.calls == [["b"]]
@@ -0,0 +1,53 @@
+import pytest
+
+from app.utils.urls import canonical_link, canonicalize
+
+BASE = "https://example.com/news/tamilnadu/article-123"
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/news/tamilnadu/article-123",
+    "http://example.com/news/tamilnadu/article-123",
+    "https://www.example.com/news/tamilnadu/article-123",
+    "https://WWW.Example.COM/news/tamilnadu/article-123",
+    "https://example.com:443/news/tamilnadu/article-123",
+    "https://example.com/news/tamilnadu/article-123/",
+    "https://example.com//news//tamilnadu/article-123",
+    "https://example.com/news/tamilnadu/article-123#comments",
+    "https://example.com/news/tamilnadu/article-123?utm_source=twitter&utm_medium=social",
+    "https://example.com/news/tamilnadu/article-123?fbclid=abc&gclid=xyz&ref=home",
+    "https://example.com/news/tamilnadu/article-123?UTM_Campaign=x",
+    "https://example.com/news/tamilnadu/article-123/amp",
+    "https://amp.example.com/news/tamilnadu/article-123",
+    "https://www-example-com.cdn.ampproject.org/c/s/www.example.com/news/tamilnadu/article-123",
+    "  https://example.com/news/tamilnadu/article-123  ",
+])
+def test_variants_share_one_key(url):
+    assert canonicalize(url) == BASE
+
+
+def test_meaningful_query_is_kept_and_sorted():
+    assert canonicalize("https://example.com/view?id=7&utm_source=x&cat=2") == "https://example.com/view?cat=2&id=7"
+    assert canonicalize("https://example.com/view?id=7") != canonicalize("https://example.com/view?id=8")
+
+
+def test_path_case_and_custom_port_are_kept():
+    # Paths can be case-sensitive; only the host is folded
+    assert canonicalize("https://Example.com/News/A") == "https://example.com/News/A"
+    assert canonicalize("http://example.com:8080/a/") == "https://example.com:8080/a"
+
+
+def test_root_and_non_http_urls():
+    assert canonicalize("https://www.example.com") == "https://example.com/"
+    assert canonicalize("https://example.com/") == "https://example.com/"
+    assert canonicalize("mailto:editor@example.com") == "mailto:editor@example.com"
+    assert canonicalize("") == ""
+
+
+def test_canonical_link_reads_the_head_only():
+    html = (
+        '<html><head><link href="https://example.com/a" rel="canonical"></head>'
+        '<body><link rel="canonical" href="https://example.com/b"></body></html>'
+    )
+    assert canonical_link(html) == "https://example.com/a"
+    assert canonical_link(b"<html><head></head><body></body></html>") is None